@@ -2,14 +2,16 @@
 Calculator Application
 """
 
+import atexit
 import os
-import pkgutil
-import importlib
 import logging.config
 import sys
+import time
+from collections import ChainMap
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
-from app.commands import CommandHandler, Command
+from app.commands import CommandHandler, LazyCommand
 from app.commands.calculator import (
     AddCommand, SubtractCommand, MultiplyCommand, DivideCommand
 )
@@ -17,36 +19,126 @@ from app.commands.history_commands import (
     HistoryCommand, ClearHistoryCommand, DeleteHistoryCommand
 )
 from app.commands.menu_command import MenuCommand
+from app.commands.bulk_command import BulkCommand
+from app.commands.expression import EvalCommand
+from app.commands.aggregate import AggregateCommand, REDUCERS
+from app.commands.cache_command import CacheCommand
+from app.commands.workers_command import WorkersCommand
+from app.commands.stats_command import StatsCommand
+from app.command_executor import CommandExecutor, CommandCancelled
+from app.command_metrics import CommandProfiler
 from app.history_manager import HistoryManager
+from app.result_cache import ResultCache
+from app.plugin_registry import PluginRegistry
+from app.session_snapshot import SessionSnapshot
+
+
+class Session:
+    """State kept per client: the previous result that `ans` stands for.
+
+    The REPL and batch runs use the app's own session; the servers give
+    each connection (or HTTP request) its own, so clients never see each
+    other's results. Only the app's own session is `console`: output a
+    command prints itself reaches no client, so the others may not use a
+    command's `console_options`.
+    """
+    __slots__ = ('last_result', 'console')
+
+    def __init__(self, console=False):
+        self.last_result = None
+        self.console = console
 
 
 class App:
     """This is the main class of the calculator application."""
 
+    HEAVY_MODULES = ('pandas', 'numpy')
+    ANS = 'ans'  # stands for the previous result in command arguments
+
     def __init__(self):
-        os.makedirs('logs', exist_ok=True)
-        os.makedirs('data', exist_ok=True)
-        os.makedirs('app/plugins', exist_ok=True)
-
-        self.configure_logging()
-        load_dotenv()
-        self.settings = self.load_environment_variables()
-        self.settings.setdefault('ENVIRONMENT', 'PRODUCTION')
-
-        self.command_handler = CommandHandler()
-        self.history_manager = HistoryManager()
-        self.register_calculator_commands()
-        self.register_history_commands()
-        self.load_plugins()
-        self.register_command_menu()
+        self.startup_timings = []
+
+        with self.startup_phase('directories'):
+            for directory in ('logs', 'data'):
+                if not os.path.isdir(directory):
+                    os.makedirs(directory, exist_ok=True)
+
+        with self.startup_phase('logging'):
+            load_dotenv()  # LOG_* settings may come from .env
+            self.log_listener = self.configure_logging()
+        with self.startup_phase('environment'):
+            self.settings = self.load_environment_variables()
+            self.settings.setdefault('ENVIRONMENT', 'PRODUCTION')
+            self.pipeline_steps = (
+                self.settings.get('PIPELINE_HISTORY', 'final').lower() == 'steps'
+            )
+            self.session = Session(console=True)
+        with self.startup_phase('snapshot'):
+            self.session_snapshot, snapshot = self.read_session_snapshot()
+        self.plugin_state = None  # (signature, commands) of the plugins found
+
+        with self.startup_phase('commands'):
+            self.history_manager = HistoryManager(
+                self.settings.get('HISTORY_BACKEND'),
+                self.settings.get('HISTORY_DURABILITY'),
+            )
+            self.command_handler = CommandHandler(
+                self.history_manager, self.create_result_cache(),
+                self.create_executor(),
+            )
+            self.command_handler.profiler = self.create_profiler()
+            if snapshot:
+                self.history_manager.restore_state(
+                    snapshot.get('history_digest'), self.session_snapshot.read_history
+                )
+            self.register_calculator_commands()
+            self.register_history_commands()
+        with self.startup_phase('plugins'):
+            self.load_plugins(snapshot and snapshot.get('plugins'))
+            self.register_command_menu()
+        # what the snapshot held, to tell at exit whether it needs rewriting
+        self.snapshot_baseline = snapshot and (
+            (snapshot.get('plugins') or {}).get('signature'), self.history_manager.version
+        )
+        self.metrics_textfile = self.create_metrics_textfile()
 
         logging.info(
             "Registered commands: %s",
             list(self.command_handler.commands.keys()),
         )
 
+    @contextmanager
+    def startup_phase(self, name):
+        """Records how long one phase of start-up takes."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings.append((name, time.perf_counter() - started))
+
+    def startup_report(self, import_seconds=None):
+        """Formats the start-up time breakdown for `--profile-startup`."""
+        phases = list(self.startup_timings)
+        if import_seconds is not None:
+            phases.insert(0, ('import app', import_seconds))
+        lines = ["Startup profile:"]
+        lines += [f"  {name:<14}{seconds * 1000:9.2f} ms" for name, seconds in phases]
+        total = sum(seconds for _, seconds in phases)
+        lines.append(f"  {'total':<14}{total * 1000:9.2f} ms")
+        loaded = [name for name in self.HEAVY_MODULES if name in sys.modules]
+        lines.append(f"  heavy modules loaded: {', '.join(loaded) or 'none'}")
+        return "\n".join(lines)
+
     def configure_logging(self):
-        """Logs in terminal."""
+        """Logs in terminal.
+
+        With LOG_QUEUE=1 the configured handlers are moved behind a queue
+        and written from a listener thread (see `app.log_pipeline`).
+        LOG_RATE_LIMIT caps records per second per logger and
+        LOG_SAMPLE_EVERY keeps one record in N, for the loggers listed in
+        LOG_SAMPLE_LOGGERS (comma-separated; all loggers when unset).
+        Returns the queue listener, or None.
+        """
         logging_conf_path = 'logging.conf'
         if os.path.exists(logging_conf_path):
             logging.config.fileConfig(
@@ -57,11 +149,32 @@ class App:
                 level=logging.INFO,
                 format='%(asctime)s - %(levelname)s - %(message)s',
             )
+        listener = None
+        if os.environ.get('LOG_QUEUE', '').lower() in ('1', 'true', 'yes'):
+            from app.log_pipeline import install_queue_logging
+            try:
+                rate = float(os.environ.get('LOG_RATE_LIMIT', 0)) or None
+                sample_every = int(os.environ.get('LOG_SAMPLE_EVERY', 1))
+            except ValueError as e:
+                logging.warning("Invalid logging setting: %s", e)
+                rate, sample_every = None, 1
+            sample_loggers = [
+                name.strip() for name in os.environ.get('LOG_SAMPLE_LOGGERS', '').split(',')
+                if name.strip()
+            ]
+            listener = install_queue_logging(
+                rate=rate, sample_every=sample_every, sample_loggers=sample_loggers
+            )
         logging.info("Logging configured.")
+        return listener
 
     def load_environment_variables(self):
-        """Load environment variables."""
-        settings = {key: value for key, value in os.environ.items()}
+        """Load environment variables.
+
+        Returns a view over `os.environ` rather than a copy; defaults set on
+        it are kept in the application's own layer.
+        """
+        settings = ChainMap({}, os.environ)
         logging.info("Environment variables loaded.")
         return settings
 
@@ -69,40 +182,145 @@ class App:
         """Get environment variable."""
         return self.settings.get(env_var, None)
 
-    def load_plugins(self):
-        """Plugin loader."""
+    def create_result_cache(self):
+        """Builds the result cache for pure commands from the settings.
+
+        RESULT_CACHE_SIZE bounds the number of entries (0 disables the
+        cache) and RESULT_CACHE_TTL, in seconds, expires old entries.
+        """
+        try:
+            maxsize = int(self.settings.get('RESULT_CACHE_SIZE', 1024))
+            ttl = float(self.settings.get('RESULT_CACHE_TTL', 0)) or None
+        except ValueError as e:
+            logging.warning("Invalid result cache setting: %s", e)
+            maxsize, ttl = 1024, None
+        if maxsize <= 0:
+            return None
+        return ResultCache(maxsize, ttl)
+
+    def create_executor(self):
+        """Builds the executor for off-thread commands from the settings.
+
+        EXECUTOR_THREADS and EXECUTOR_PROCESSES size the thread and process
+        pools; unset, they follow the number of CPUs.
+        """
+        try:
+            threads = int(self.settings.get('EXECUTOR_THREADS', 0))
+            processes = int(self.settings.get('EXECUTOR_PROCESSES', 0))
+        except ValueError as e:
+            logging.warning("Invalid executor setting: %s", e)
+            threads = processes = 0
+        return CommandExecutor(threads or None, processes or None)
+
+    def create_profiler(self):
+        """Builds the slow-command profiler if PROFILE_SLOW_COMMANDS_MS is set.
+
+        Commands slower than that many milliseconds are profiled with
+        cProfile on every PROFILE_SAMPLE_EVERY-th later call (1 by default);
+        profiles go to PROFILE_DIR (logs/profiles by default).
+        """
+        threshold = self.settings.get('PROFILE_SLOW_COMMANDS_MS')
+        if not threshold:
+            return None
+        try:
+            threshold = float(threshold) / 1000
+            sample_every = int(self.settings.get('PROFILE_SAMPLE_EVERY', 1))
+        except ValueError as e:
+            logging.warning("Invalid profiler setting: %s", e)
+            return None
+        logging.info("Profiling commands slower than %.1f ms.", threshold * 1000)
+        return CommandProfiler(
+            threshold, self.settings.get('PROFILE_DIR', 'logs/profiles'), sample_every
+        )
+
+    def create_metrics_textfile(self):
+        """Starts the textfile-collector exporter if METRICS_TEXTFILE is set.
+
+        The file is rewritten every METRICS_INTERVAL seconds (15 by default).
+        """
+        path = self.settings.get('METRICS_TEXTFILE')
+        if not path:
+            return None
+        from app.metrics_exporter import MetricsTextfile
+        try:
+            interval = float(self.settings.get('METRICS_INTERVAL', 15))
+        except ValueError as e:
+            logging.warning("Invalid metrics setting: %s", e)
+            interval = 15.0
+        logging.info("Writing metrics to %s every %gs.", path, interval)
+        return MetricsTextfile(self, path, interval).start()
+
+    def read_session_snapshot(self):
+        """Opens the session snapshot if SESSION_SNAPSHOT is set.
+
+        Returns the `SessionSnapshot` (saved again at exit) and the state it
+        holds, or (None, None) when snapshots are off.
+        """
+        path = self.settings.get('SESSION_SNAPSHOT')
+        if not path:
+            return None, None
+        session_snapshot = SessionSnapshot(path)
+        atexit.register(self.save_session_snapshot)
+        return session_snapshot, session_snapshot.read()
+
+    def save_session_snapshot(self):
+        """Writes the plugin registry and the parsed history to the snapshot.
+
+        Skipped when neither the plugins nor the history changed since the
+        snapshot was read, so a session that at most read the history pays
+        nothing at exit.
+        """
+        if self.session_snapshot is None:
+            return
+        plugins, signature = None, None
+        if self.plugin_state is not None:
+            signature, commands = self.plugin_state
+            plugins = {'signature': signature, 'commands': commands}
+        history = self.history_manager
+        if self.snapshot_baseline == (signature, history.version) and (
+                history.restored or not history.is_loaded):
+            logging.info("Session snapshot %s is up to date.", self.session_snapshot.path)
+            return
+        try:
+            self.session_snapshot.write(plugins, self.history_manager.export_state())
+        except (OSError, ValueError) as e:
+            logging.warning("Could not write session snapshot: %s", e)
+            return
+        logging.info("Session snapshot written to %s.", self.session_snapshot.path)
+
+    def load_plugins(self, snapshot=None):
+        """Plugin loader.
+
+        Command names come from the session snapshot when the plugin files
+        are unchanged since it was written, otherwise from the cached plugin
+        manifest; each plugin module is only imported the first time one of
+        its commands runs. Commands that are already registered are left
+        untouched.
+        """
         plugins_package = 'app.plugins'
-        plugins_path = os.path.join(os.path.dirname(__file__), "plugins") 
+        plugins_path = os.path.join(os.path.dirname(__file__), "plugins")
 
         logging.info("Loading plugins from: %s", plugins_path)
 
         if not os.path.exists(plugins_path):
             logging.warning("Plugins directory %s not found.", plugins_path)
             return
-        for _, plugin_name, is_pkg in pkgutil.iter_modules([plugins_path]):
-            logging.info("Found plugin: %s (is_pkg=%s)", plugin_name, is_pkg)
-            if is_pkg:
-                try:
-                    plugin_module = importlib.import_module(
-                        f'{plugins_package}.{plugin_name}'
-                    )
-                    self.register_plugin_commands(plugin_module, plugin_name)
-                except ImportError as e:
-                    logging.error(
-                        "Error importing plugin %s: %s", plugin_name, e
-                    )
-
-    def register_plugin_commands(self, plugin_module, plugin_name):
-        """Function to register plugin commands."""
-        for item_name in dir(plugin_module):
-            item = getattr(plugin_module, item_name)
-            if isinstance(item, type) and issubclass(item, Command) and \
-                    item is not Command:
-                self.command_handler.register_command(plugin_name, item())
-                logging.info(
-                    "Command %s from plugin %s registered.",
-                    plugin_name, plugin_name,
-                )
+        registry = PluginRegistry(plugins_path, plugins_package)
+        signature = registry.signature()
+        if snapshot and snapshot.get('signature') == signature:
+            commands = snapshot['commands']
+            logging.info("Plugin commands restored from session snapshot.")
+        else:
+            commands = registry.discover(signature)
+        self.plugin_state = (signature, commands)
+        for plugin_name, entry in commands.items():
+            if plugin_name in self.command_handler.commands:
+                continue
+            self.command_handler.register_command(
+                plugin_name, LazyCommand(entry['module'], entry['class'])
+            )
+            logging.info("Command %s from plugin %s registered.",
+                         plugin_name, plugin_name)
 
     def register_command_menu(self):
         """Registers the 'menu' command properly."""
@@ -117,21 +335,43 @@ class App:
         self.command_handler.register_command("sub", SubtractCommand())
         self.command_handler.register_command("mul", MultiplyCommand())
         self.command_handler.register_command("div", DivideCommand())
+        self.command_handler.register_command(
+            "bulk", BulkCommand(self.command_handler)
+        )
+        self.command_handler.register_command(
+            "cache", CacheCommand(self.command_handler)
+        )
+        self.command_handler.register_command(
+            "workers", WorkersCommand(self.command_handler)
+        )
+        self.command_handler.register_command(
+            "stats", StatsCommand(self.command_handler)
+        )
+        for reducer in REDUCERS:
+            self.command_handler.register_command(reducer, AggregateCommand(reducer))
+        eval_command = EvalCommand(self.command_handler)
+        self.command_handler.register_command("eval", eval_command)
+        self.command_handler.register_command("calc", eval_command)
         logging.info("Calculator commands registered successfully.")
 
     def register_history_commands(self):
-        """Registers history-related commands."""
-        self.command_handler.register_command("history", HistoryCommand())
-        self.command_handler.register_command("clrhis", ClearHistoryCommand())
-        self.command_handler.register_command("delhis", DeleteHistoryCommand())
+        """Registers history-related commands on the shared history manager."""
+        history_manager = self.command_handler.history_manager
+        self.command_handler.register_command(
+            "history", HistoryCommand(history_manager)
+        )
+        self.command_handler.register_command(
+            "clrhis", ClearHistoryCommand(history_manager)
+        )
+        self.command_handler.register_command(
+            "delhis", DeleteHistoryCommand(history_manager)
+        )
 
     def show_history(self, *args):
-        """Displays calculation history."""
-        history_df = self.history_manager.get_history()
-        if history_df.empty:
-            print("No history available.")
-        else:
-            print(history_df.to_string(index=True))
+        """Displays calculation history, paged like the `history` command."""
+        output = self.command_handler.execute_command("history", *args)
+        if output is not None:
+            print(output)
 
     def clear_history(self, *args):
         """Clears calculation history."""
@@ -152,9 +392,195 @@ class App:
         except ValueError:
             print("Error: Index must be a number.")
 
+    @property
+    def last_result(self):
+        """The previous result of the app's own session."""
+        return self.session.last_result
+
+    def run_command(self, command_name, args, pending=None, session=None):
+        """Executes a command and saves its result to history.
+
+        The result is saved right away, or appended to `pending` as
+        (operation, operands, result) so the caller can commit results as a
+        group. It becomes `ans` for `session` (by default the app's own).
+        Outside the console session, the command's `console_options` raise
+        ValueError. Errors from `CommandHandler.execute_command` propagate.
+        """
+        session = session or self.session
+        self.check_console_options(command_name, args, session)
+        result = self.command_handler.execute_command(command_name, *args)
+        if result is None:
+            return None
+        self._remember(result, session)
+        if self.command_handler.commands[command_name].record_history:
+            if pending is None:
+                started = time.perf_counter()
+                self.history_manager.save_operation(command_name, args, result)
+                self.command_handler.metrics.observe(
+                    command_name, 'persist', time.perf_counter() - started
+                )
+            else:
+                pending.append((command_name, args, result))
+        return result
+
+    def commit_history(self, pending):
+        """Saves results collected by `run_command` with a single write.
+
+        Each command is charged an equal share of the write as its
+        'persist' latency.
+        """
+        if not pending:
+            return
+        started = time.perf_counter()
+        self.history_manager.save_operations(pending)
+        share = (time.perf_counter() - started) / len(pending)
+        for command_name, _, _ in pending:
+            if command_name in self.command_handler.commands:  # not 'pipeline'
+                self.command_handler.metrics.observe(command_name, 'persist', share)
+
+    def run_pipeline(self, text, pending=None, session=None):
+        """Runs a pipeline such as `add 2 3 | mul 4 | div 2`.
+
+        Each stage after the first receives the previous stage's result as
+        its first argument, unless it refers to it explicitly as `ans`.
+        Results are passed on as numbers, not re-parsed from text. The
+        pipeline is saved to history with one write: a single 'pipeline'
+        entry holding the whole line and its final result, or, with
+        PIPELINE_HISTORY=steps, one entry per stage. As in `run_command`,
+        records go to `pending` instead when it is given, and `ans` is
+        taken from and kept in `session`.
+        """
+        session = session or self.session
+        stages = [stage.split() for stage in text.split('|')]
+        if not all(stages):
+            raise ValueError("Invalid pipeline: empty stage.")
+        commands = self.command_handler.commands
+        for name, *args in stages:
+            if name not in commands:
+                raise ValueError(f"No such command: {name}")
+            self.check_console_options(name, args, session)
+
+        steps = []
+        value = session.last_result
+        for position, (name, *args) in enumerate(stages):
+            if position and value is None:
+                raise ValueError(
+                    f"Invalid pipeline: {stages[position - 1][0]} returned no result."
+                )
+            if position and self.ANS not in args:
+                args.insert(0, value)
+            args = self.resolve_ans(args, value)
+            value = self.command_handler.execute_command(name, *args)
+            steps.append((name, args, value))
+        if value is None:
+            return None
+        self._remember(value, session)
+
+        recorded = [step for step in steps if commands[step[0]].record_history]
+        if not recorded:
+            return value
+        if not self.pipeline_steps:
+            recorded = [('pipeline', [" | ".join(" ".join(stage) for stage in stages)], value)]
+        if pending is not None:
+            pending.extend(recorded)
+            return value
+        started = time.perf_counter()
+        self.history_manager.save_operations(recorded)
+        share = (time.perf_counter() - started) / len(steps)
+        for name, _, _ in steps:
+            self.command_handler.metrics.observe(name, 'persist', share)
+        return value
+
+    def check_console_options(self, command_name, args, session):
+        """Rejects options that print to the terminal outside the console."""
+        command = self.command_handler.commands.get(command_name)
+        if session.console or command is None:
+            return
+        for arg in args:
+            if arg in command.console_options:
+                raise ValueError(
+                    f"'{command_name} {arg}' prints to the server's terminal "
+                    "and is not available here."
+                )
+
+    def resolve_ans(self, args, value):
+        """Replaces `ans` in `args` with `value`, the previous result."""
+        if self.ANS not in args:
+            return args
+        if value is None:
+            raise ValueError("No previous result for 'ans'.")
+        return [value if arg == self.ANS else arg for arg in args]
+
+    @staticmethod
+    def _remember(result, session):
+        """Keeps numeric results for `ans`."""
+        if isinstance(result, (int, float)) and not isinstance(result, bool):
+            session.last_result = result
+
+    def execute_request(self, request, pending=None, session=None):
+        """Runs a `{"command": ..., "args": [...]}` request for the servers.
+
+        Returns `{"ok": True, "result": ...}` or `{"ok": False, "error": ...}`;
+        an `id` in the request is echoed back. Results are saved, and kept
+        for `session`, as in `run_command`.
+        """
+        response = {}
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get('command'), str):
+                raise ValueError("Request must be an object with a 'command'.")
+            if 'id' in request:
+                response['id'] = request['id']
+            command_name = request['command']
+            args = request.get('args', [])
+            if not isinstance(args, list):
+                raise ValueError("'args' must be a list.")
+            try:
+                result = self.run_command(
+                    command_name, [str(arg) for arg in args], pending, session
+                )
+            except KeyError:
+                raise ValueError(f"No such command: {command_name}")
+            response.update(ok=True, result=result)
+        except (ValueError, ZeroDivisionError, CommandCancelled) as e:
+            logging.error("%s: %s", type(e).__name__, e)
+            response.update(ok=False, error=str(e))
+        return response
+
+    def process_line(self, cmd_input, pending=None, session=None):
+        """Runs one line of input and returns the text to show, if any.
+
+        `ans` in the arguments stands for the previous result in `session`
+        (by default the app's own), and a line containing `|` is run as a
+        pipeline (see `run_pipeline`). See `run_command` for how results are
+        saved.
+        """
+        session = session or self.session
+        command_parts = cmd_input.split()
+        if not command_parts:
+            return None
+
+        command_name = command_parts[0]
+        args = command_parts[1:]
+
+        try:
+            if '|' in cmd_input:
+                result = self.run_pipeline(cmd_input, pending, session)
+            else:
+                args = self.resolve_ans(args, session.last_result)
+                result = self.run_command(command_name, args, pending, session)
+        except KeyError:
+            logging.error("Unknown command: %s", command_name)
+            return f"No such command: {command_name}"
+        except (ValueError, ZeroDivisionError, CommandCancelled) as ve:
+            logging.error("%s: %s", type(ve).__name__, ve)
+            return f"Error: {ve}"
+
+        if result is None:
+            return None
+        return f"Result: {result}"
+
     def start(self):
         """Function when starting application."""
-        self.load_plugins()
         logging.info("Application started. Type 'exit' to exit.")
         try:
             while True:
@@ -163,29 +589,9 @@ class App:
                     logging.info("Application exit.")
                     sys.exit(0)
 
-                command_parts = cmd_input.split()
-                if not command_parts:
-                    continue
-
-                command_name = command_parts[0]
-                args = command_parts[1:]
-
-                try:
-                    # Ensure arguments are passed correctly
-                    result = self.command_handler.execute_command(
-                        command_name, *args
-                    )
-                    if result is not None:
-                        print(f"Result: {result}")
-                        self.history_manager.save_operation(
-                            command_name, args, result
-                        )
-                except KeyError:
-                    logging.error("Unknown command: %s", command_name)
-                    print(f"No such command: {command_name}")
-                except ValueError as ve:
-                    logging.error("ValueError: %s", ve)
-                    print(f"Error: {ve}")
+                output = self.process_line(cmd_input)
+                if output is not None:
+                    print(output)
 
         except KeyboardInterrupt:
             logging.info("Application interrupted and exiting gracefully.")
@@ -193,7 +599,73 @@ class App:
         except ValueError as ve:
             logging.error("ValueError: %s", ve)
             print(f"Error: {ve}")
+        finally:
+            self.command_handler.executor.shutdown(wait=False)
+            self.history_manager.close()  # flush queued history records
+            if self.metrics_textfile is not None:
+                self.metrics_textfile.stop()
+            if self.log_listener is not None:
+                from app.log_pipeline import uninstall_queue_logging
+                uninstall_queue_logging()  # write out queued records
+
+    def run_batch(self, stream, out=None, commit_every=1000):
+        """Runs commands from `stream` without prompting.
+
+        Output is written in chunks and history is committed every
+        `commit_every` results instead of once per line; whatever is
+        pending is still committed and written if the batch is interrupted
+        or fails. Blank lines and lines starting with '#' are skipped;
+        'exit' stops the batch early.
+        Returns the number of commands processed.
+        """
+        out = out or sys.stdout
+        pending, buffer = [], []
+        count = 0
+        started = time.perf_counter()
 
+        def commit():
+            if pending:
+                self.commit_history(pending)
+                pending.clear()
+
+        try:
+            for line in stream:
+                cmd_input = line.strip()
+                if not cmd_input or cmd_input.startswith('#'):
+                    continue
+                if cmd_input.lower() == 'exit':
+                    break
+                command = self.command_handler.commands.get(cmd_input.split()[0])
+                if getattr(command, 'history_manager', None) is not None:
+                    commit()  # history commands must see every earlier result
+                    if buffer:  # and may print directly, so keep output in order
+                        out.write("\n".join(buffer) + "\n")
+                        buffer.clear()
+                output = self.process_line(cmd_input, pending)
+                count += 1
+                if output is not None:
+                    buffer.append(output)
+                if len(pending) >= commit_every:
+                    commit()
+                if len(buffer) >= commit_every:
+                    out.write("\n".join(buffer) + "\n")
+                    buffer.clear()
+        finally:
+            # also on Ctrl-C or an unexpected error: keep what already ran
+            commit()
+            if buffer:
+                out.write("\n".join(buffer) + "\n")
+            out.flush()
+
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed > 0 else float('inf')
+        logging.info("Batch processed %d commands in %.3fs", count, elapsed)
+        print(
+            f"Processed {count} commands in {elapsed:.3f}s "
+            f"({rate:.0f} commands/s)",
+            file=sys.stderr,
+        )
+        return count
 
 if __name__ == "__main__":
     app = App()
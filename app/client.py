@@ -0,0 +1,132 @@
+"""
+client.py
+
+A small blocking client for `CalculatorServer`, plus a load test.
+
+Usage:
+    with CalculatorClient(port=8765) as client:
+        client.execute("add", 1, 2)                      # 3.0
+        client.execute_many([("add", [1, 2]), ("mul", [3, 4])])
+
+    python -m app.client --clients 16 --requests 2000
+"""
+
+import argparse
+import itertools
+import json
+import socket
+import threading
+import time
+
+
+class CalculatorError(Exception):
+    """Raised when the server reports a failed command."""
+
+
+class CalculatorClient:
+    """Sends JSON-line requests to a calculator server."""
+
+    def __init__(self, host='127.0.0.1', port=8765, unix_path=None, timeout=30):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self.sock.makefile('r', encoding='utf-8')
+        self._ids = itertools.count()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the connection."""
+        self._reader.close()
+        self.sock.close()
+
+    def execute(self, command, *args):
+        """Run one command and return its result."""
+        return self.execute_many([(command, args)])[0]
+
+    def execute_many(self, calls):
+        """Pipeline several (command, args) calls and return their results."""
+        payload = "".join(
+            json.dumps({'id': next(self._ids), 'command': command, 'args': list(args)}) + "\n"
+            for command, args in calls
+        )
+        self.sock.sendall(payload.encode('utf-8'))
+        results = []
+        for _ in calls:
+            response = json.loads(self._reader.readline())
+            if not response.get('ok'):
+                raise CalculatorError(response.get('error'))
+            results.append(response['result'])
+        return results
+
+
+def load_test(host='127.0.0.1', port=8765, unix_path=None, clients=8,
+              requests=1000, pipeline=1, command='add', args=(1, 2)):
+    """Hammer a server from `clients` threads and report throughput.
+
+    Each client sends `requests` commands, `pipeline` at a time. Returns a
+    dict with the total request count, elapsed seconds, requests per second
+    and p50/p99 per-batch latency in milliseconds.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            with CalculatorClient(host, port, unix_path) as client:
+                local = []
+                for _ in range(0, requests, pipeline):
+                    started = time.perf_counter()
+                    client.execute_many([(command, args)] * pipeline)
+                    local.append(time.perf_counter() - started)
+            with lock:
+                latencies.extend(local)
+        except (OSError, CalculatorError) as e:
+            with lock:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(latencies) * pipeline
+
+    def percentile(p):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    return {
+        'requests': total,
+        'errors': len(errors),
+        'seconds': elapsed,
+        'requests_per_second': total / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calculator server load test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--pipeline", type=int, default=1)
+    options = parser.parse_args()
+    report = load_test(options.host, options.port, options.unix, options.clients,
+                       options.requests, options.pipeline)
+    print(json.dumps(report, indent=2))
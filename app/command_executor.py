@@ -0,0 +1,201 @@
+"""
+command_executor.py
+
+This module runs commands according to their execution policy so that slow
+or CPU-bound commands do not have to run on the REPL thread.
+
+Policies (set with `Command.execution`):
+    - inline: run on the calling thread (the default).
+    - thread: run on a shared thread pool; suits commands that wait on
+      files or the network.
+    - process: run on a shared process pool; suits CPU-bound commands,
+      which can then use more than one core. The command and its
+      arguments must be picklable.
+
+A command may also set `Command.timeout` in seconds. The caller stops
+waiting once it expires and gets a `CommandTimeout`; an inline command with
+a timeout is run on the thread pool so it can be abandoned. A queued
+command is cancelled outright. A running process-pool command is stopped
+by terminating the pool's workers (any other command running there fails
+too); a running thread cannot be stopped, so it finishes in the
+background and its result is discarded. Pressing Ctrl-C while waiting
+cancels the command the same way and raises `CommandCancelled`.
+
+Classes:
+    - CommandExecutor: Owns the worker pools and their utilization figures.
+    - CommandCancelled / CommandTimeout: Raised when a command is abandoned.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import (
+    BrokenExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+)
+
+INLINE, THREAD, PROCESS = 'inline', 'thread', 'process'
+POLICIES = (INLINE, THREAD, PROCESS)
+
+
+class CommandCancelled(RuntimeError):
+    """Raised when a running command is cancelled before it finishes."""
+
+
+class CommandTimeout(CommandCancelled):
+    """Raised when a command runs longer than its timeout."""
+
+
+def _timed_execute(command, args):
+    """Worker entry point: run the command and report how long it took."""
+    started = time.perf_counter()
+    result = command.execute(*args)
+    return result, time.perf_counter() - started
+
+
+class CommandExecutor:
+    """Runs commands inline, on a thread pool or on a process pool.
+
+    Pools are created on first use, so an application whose commands all
+    run inline never starts a worker.
+    """
+
+    def __init__(self, max_threads=None, max_processes=None):
+        cpus = os.cpu_count() or 1
+        self.max_workers = {
+            THREAD: max_threads or min(32, cpus + 4),
+            PROCESS: max_processes or cpus,
+        }
+        self._pools = {}
+        self._started = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            policy: {
+                'submitted': 0, 'completed': 0, 'failed': 0,
+                'timeouts': 0, 'cancelled': 0, 'in_flight': 0,
+                'busy_seconds': 0.0,
+            }
+            for policy in (THREAD, PROCESS)
+        }
+
+    def _pool(self, policy):
+        with self._lock:
+            pool = self._pools.get(policy)
+            if pool is None:
+                if policy == PROCESS:
+                    # imported here so start-up does not pay for multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+                    pool = ProcessPoolExecutor(self.max_workers[PROCESS])
+                else:
+                    pool = ThreadPoolExecutor(
+                        self.max_workers[THREAD], thread_name_prefix='command'
+                    )
+                self._pools[policy] = pool
+                self._started.setdefault(policy, time.monotonic())
+                logging.info("Started %s pool with %d workers.",
+                             policy, self.max_workers[policy])
+            return pool
+
+    def submit(self, command, args, policy=THREAD):
+        """Queue a command on a pool; the future resolves to (result, seconds)."""
+        if policy not in (THREAD, PROCESS):
+            raise ValueError(f"Unknown execution policy: {policy}")
+        future = self._pool(policy).submit(_timed_execute, command, args)
+        stats = self._stats[policy]
+        with self._lock:
+            stats['submitted'] += 1
+            stats['in_flight'] += 1
+        future.add_done_callback(lambda done: self._record(policy, done))
+        return future
+
+    def _record(self, policy, future):
+        stats = self._stats[policy]
+        with self._lock:
+            stats['in_flight'] -= 1
+            if future.cancelled():
+                stats['cancelled'] += 1
+            elif future.exception() is not None:
+                stats['failed'] += 1
+            else:
+                stats['completed'] += 1
+                stats['busy_seconds'] += future.result()[1]
+
+    def run(self, command, args, policy=None, timeout=None):
+        """Run a command under its policy and timeout and return its result.
+
+        Raises:
+            CommandTimeout: If the command outlives its timeout.
+            CommandCancelled: If the wait is interrupted with Ctrl-C.
+            ValueError: If the process pool broke while running it.
+        """
+        policy = policy or command.execution
+        timeout = command.timeout if timeout is None else timeout
+        if policy == INLINE:
+            if timeout is None:
+                return command.execute(*args)
+            policy = THREAD
+
+        future = self.submit(command, args, policy)
+        try:
+            return future.result(timeout)[0]
+        except FutureTimeout:
+            with self._lock:
+                self._stats[policy]['timeouts'] += 1
+            self.cancel(future, policy)
+            raise CommandTimeout(f"Command timed out after {timeout:g}s.")
+        except KeyboardInterrupt:
+            self.cancel(future, policy)
+            raise CommandCancelled("Command cancelled.")
+        except BrokenExecutor as e:  # BrokenProcessPool; our thread pools cannot break
+            self._discard(PROCESS)
+            raise ValueError(f"Worker process failed: {e}")
+
+    def cancel(self, future, policy):
+        """Cancel a queued command, or stop the workers running it."""
+        if future.cancel() or future.done():
+            return
+        if policy == PROCESS:
+            self._terminate(PROCESS)
+        else:
+            logging.warning("Abandoned a running command; its thread keeps "
+                            "running until the command returns.")
+
+    def _discard(self, policy):
+        with self._lock:
+            return self._pools.pop(policy, None)
+
+    def _terminate(self, policy):
+        pool = self._discard(policy)
+        if pool is None:
+            return
+        # ProcessPoolExecutor has no public way to stop running workers
+        # before Python 3.14, so terminate its processes directly.
+        processes = list((getattr(pool, '_processes', None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        logging.warning("Terminated %d %s workers.", len(processes), policy)
+
+    def stats(self):
+        """Per-pool counters plus the share of worker time spent busy."""
+        now = time.monotonic()
+        report = {}
+        with self._lock:
+            for policy, stats in self._stats.items():
+                workers = self.max_workers[policy]
+                uptime = now - self._started[policy] if policy in self._started else 0.0
+                capacity = workers * uptime
+                report[policy] = dict(
+                    stats,
+                    workers=workers,
+                    running=policy in self._pools,
+                    utilization=stats['busy_seconds'] / capacity if capacity else 0.0,
+                )
+        return report
+
+    def shutdown(self, wait=True):
+        """Stop every pool, cancelling commands that have not started."""
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,206 @@
+"""
+command_metrics.py
+
+This module records where time goes in a session: per-command call and
+error counts plus latency histograms for the three stages of a call —
+argument parsing, execution and history persistence.
+
+Histograms use fixed bucket bounds (1-2.5-5 steps from 1 microsecond to
+10 seconds), so recording is a bisect and an increment, memory per command
+is constant, and percentiles are estimated by interpolating inside the
+bucket that holds them.
+
+Classes:
+    - LatencyHistogram: Fixed-bucket latency histogram with percentiles.
+    - CommandMetrics: Per-command counters and per-stage histograms.
+    - CommandProfiler: Runs commands that were slow under cProfile and
+      saves the profiles.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+
+BUCKETS = tuple(
+    round(mantissa * 10.0 ** exponent, 12)
+    for exponent in range(-6, 1)
+    for mantissa in (1, 2.5, 5)
+) + (10.0,)
+STAGES = ('parse', 'execute', 'persist')
+_bisect = bisect.bisect_left
+
+
+class LatencyHistogram:
+    """Counts observations, in seconds, per fixed bucket."""
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # the last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        """Record one observation."""
+        self.counts[_bisect(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Estimate the `fraction` (0-1) quantile; 0.0 when empty."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / count
+                return min(estimate, self.max)
+            seen += count
+        return self.max
+
+    def summary(self):
+        """Count, mean, p50/p95/p99 and max, in seconds."""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+        }
+
+
+class CommandMetrics:
+    """Call counts, error counts and stage latencies for every command.
+
+    Calls are recorded from more than one thread (the servers persist
+    history on their own threads, and the HTTP API handles each request
+    on a thread of its own), so recording, taking a snapshot and resetting
+    all share one lock. Each recording holds it only for a few increments.
+    """
+
+    def __init__(self):
+        self._commands = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, name):
+        """The entry for `name`, created if needed; call with the lock held."""
+        entry = self._commands.get(name)
+        if entry is None:
+            entry = self._commands[name] = {
+                'calls': 0, 'errors': 0,
+                **{stage: LatencyHistogram() for stage in STAGES},
+            }
+        return entry
+
+    def observe(self, name, stage, seconds):
+        """Record the latency of one stage of a call."""
+        with self._lock:
+            self._entry(name)[stage].observe(seconds)
+
+    def record_call(self, name, parse_seconds, execute_seconds):
+        """Record a successful call's parse and execute latencies at once."""
+        with self._lock:
+            entry = self._entry(name)
+            entry['calls'] += 1
+            entry['parse'].observe(parse_seconds)
+            entry['execute'].observe(execute_seconds)
+
+    def error(self, name):
+        """Count a call that raised."""
+        with self._lock:
+            entry = self._entry(name)
+            entry['calls'] += 1
+            entry['errors'] += 1
+
+    def snapshot(self):
+        """A copy of every command's counters and histograms."""
+        with self._lock:
+            snapshot = {}
+            for name, entry in self._commands.items():
+                copy = dict(entry)
+                for stage in STAGES:
+                    histogram = LatencyHistogram()
+                    histogram.counts = list(entry[stage].counts)
+                    histogram.count = entry[stage].count
+                    histogram.total = entry[stage].total
+                    histogram.max = entry[stage].max
+                    copy[stage] = histogram
+                snapshot[name] = copy
+            return snapshot
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._commands.clear()
+
+
+class CommandProfiler:
+    """Profiles commands that have run longer than a threshold.
+
+    A call slower than `threshold` seconds marks its command as slow; from
+    then on every `sample_every`-th call of that command runs under
+    cProfile, and profiles of calls that are again over the threshold are
+    written to `directory` as `<command>-<time>.prof` (open them with
+    `pstats` or snakeviz) with the top functions logged. Commands that run
+    on a worker pool are profiled on the waiting thread only.
+    """
+
+    def __init__(self, threshold, directory="logs/profiles", sample_every=1):
+        self.threshold = threshold
+        self.directory = directory
+        self.sample_every = max(1, sample_every)
+        self.saved = []
+        self._slow = {}  # command name -> calls since it was marked slow
+        self._lock = threading.Lock()
+
+    def run(self, name, func, *args):
+        """Call `func(*args)`, profiling it if `name` is due for a sample."""
+        with self._lock:
+            calls = self._slow.get(name)
+            sample = calls is not None and calls % self.sample_every == 0
+            if calls is not None:
+                self._slow[name] = calls + 1
+        if not sample:
+            started = time.perf_counter()
+            result = func(*args)
+            if time.perf_counter() - started > self.threshold:
+                with self._lock:
+                    self._slow.setdefault(name, 0)
+            return result
+
+        import cProfile
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler is already active
+            return func(*args)
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            if elapsed > self.threshold:
+                self._save(name, profile, elapsed)
+
+    def _save(self, name, profile, elapsed):
+        import io
+        import pstats
+
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.directory, f"{name}-{stamp}-{len(self.saved)}.prof")
+        profile.dump_stats(path)
+        self.saved.append(path)
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).sort_stats('cumulative').print_stats(10)
+        logging.warning("Command %s took %.1f ms; profile saved to %s\n%s",
+                        name, elapsed * 1000, path, report.getvalue())
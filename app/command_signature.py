@@ -0,0 +1,106 @@
+"""
+command_signature.py
+
+This module describes the arguments a command accepts. A `Signature` lists
+the type of each positional argument and, optionally, the type of any
+further arguments; `CommandHandler` compiles it once, when the command is
+registered, into a converter that checks the argument count and converts
+every argument in a single pass on each call.
+
+Examples:
+    Signature(varargs=float)              any number of floats (the default)
+    Signature(varargs=float, min_args=1)  at least one float
+    Signature(int)                        exactly one integer
+    Signature(varargs=str)                raw strings
+    Signature()                           no arguments
+
+Classes:
+    - Signature: Argument types and arity of a command.
+"""
+
+import sys
+
+TYPE_NAMES = {float: "a number", int: "an integer", str: "a string"}
+
+
+def _arguments(count):
+    return f"{count} argument" + ("" if count == 1 else "s")
+
+
+class Signature:
+    """Argument types and arity of a command."""
+    __slots__ = ('params', 'varargs', 'min_args')
+
+    def __init__(self, *params, varargs=None, min_args=None):
+        self.params = params
+        self.varargs = varargs
+        self.min_args = len(params) if min_args is None else min_args
+
+    @property
+    def max_args(self):
+        """The most arguments accepted, or None without a limit."""
+        return None if self.varargs is not None else len(self.params)
+
+    def check_count(self, name, count):
+        """Raise ValueError unless `count` arguments are acceptable."""
+        if count < self.min_args or (self.max_args is not None and count > self.max_args):
+            raise ValueError(f"Invalid input: {name} takes {self.describe_count()}, got {count}.")
+
+    def describe_count(self):
+        """The accepted number of arguments in words, e.g. 'at least 1 argument'."""
+        low, high = self.min_args, self.max_args
+        if high is None:
+            return f"at least {_arguments(low)}" if low else "any number of arguments"
+        if low == high:
+            return _arguments(low) if low else "no arguments"
+        return f"{low} to {high} arguments"
+
+    def compile(self, name):
+        """Build the converter for command `name`.
+
+        The converter takes the raw argument tuple and returns the converted
+        tuple, raising ValueError with a message naming the bad argument.
+        """
+        params, varargs = self.params, self.varargs
+        low = self.min_args
+        high = self.max_args if varargs is None else sys.maxsize
+
+        def check_count(count):
+            if not low <= count <= high:
+                self.check_count(name, count)
+
+        if not params and varargs is str:
+            def convert_strings(args):
+                check_count(len(args))
+                return tuple(map(str, args))  # str() returns strings as they are
+            return convert_strings
+
+        if not params and varargs is float:
+            def convert_floats(args):
+                check_count(len(args))
+                try:
+                    return tuple(map(float, args))
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid input: Arguments must be numbers. Got: {args}")
+            return convert_floats
+
+        def convert(args):
+            check_count(len(args))
+            converted = []
+            for position, arg in enumerate(args):
+                kind = params[position] if position < len(params) else varargs
+                try:
+                    converted.append(kind(arg))
+                except (TypeError, ValueError):
+                    raise ValueError(
+                        f"Invalid input: argument {position + 1} of {name} must be "
+                        f"{TYPE_NAMES.get(kind, kind.__name__)}. Got: {arg}"
+                    )
+            return tuple(converted)
+        return convert
+
+    def __repr__(self):
+        parts = [kind.__name__ for kind in self.params]
+        if self.varargs is not None:
+            parts.append(f"*{self.varargs.__name__}")
+        return f"Signature({', '.join(parts)})"
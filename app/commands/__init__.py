@@ -7,6 +7,7 @@ and a `CommandHandler` class for managing and executing registered commands.
 
 Classes:
     - Command: Abstract base class for all commands.
+    - LazyCommand: Placeholder for a command whose module is imported on first use.
     - CommandHandler: Manages the registration and execution of commands.
 
 Usage:
@@ -15,32 +16,196 @@ Usage:
     dynamically using `CommandHandler.execute_command()`.
 
 """
+import importlib
+import logging
+import time
 from abc import ABC, abstractmethod
+from app.result_cache import MISSING
+from app.command_executor import CommandExecutor, INLINE
+from app.command_metrics import CommandMetrics
+from app.command_signature import Signature
 
 class Command(ABC):
-    """Command object"""
+    """Command object
+
+    `signature` declares the arguments a command takes (see
+    `app.command_signature`); by default any number of floats. The handler
+    checks and converts the arguments against it before each call, so
+    `execute` receives them ready to use.
+    A command may also provide `execute_vectorized(block)`, taking a 2-D
+    NumPy array with one row of operands per call and returning an array of
+    results plus a boolean mask of rows that could not be evaluated.
+    Commands whose result depends only on their arguments set `pure = True`
+    so the handler may serve repeated calls from its result cache, and
+    commands whose output should not be saved to the calculation history
+    set `record_history = False`. `execution` picks where the command runs
+    ('inline', 'thread' or 'process') and `timeout`, in seconds, bounds how
+    long the caller waits for it; see `app.command_executor`.
+    `console_options` lists options that make the command print straight
+    to the terminal; the servers reject calls that use them.
+    """
+    signature = Signature(varargs=float)
+    pure = False
+    record_history = True
+    console_options = frozenset()
+    execution = INLINE
+    timeout = None
+
     @abstractmethod
     def execute(self, *args):
         """General execution function"""
         pass
 
+class LazyCommand(Command):
+    """Stands in for a plugin command until it is first executed."""
+    def __init__(self, module_name: str, class_name: str):
+        self.module_name = module_name
+        self.class_name = class_name
+
+    def load(self):
+        """Import the plugin module and instantiate the real command."""
+        module = importlib.import_module(self.module_name)
+        return getattr(module, self.class_name)()
+
+    def execute(self, *args):
+        """Load the real command and execute it."""
+        return self.load().execute(*args)
+
 class CommandHandler:
-    """Handles command execution dynamically."""
-    def __init__(self):
+    """Handles command execution dynamically.
+
+    The handler also carries the application's shared `HistoryManager` so
+    that history-aware commands all operate on the same in-memory state,
+    and an optional `ResultCache` that memoizes pure commands. Commands
+    are run through a `CommandExecutor`, which honors their execution
+    policy and timeout. Every call is recorded in `metrics`, how long each
+    lazy plugin took to import in `plugin_load_seconds`, and when a
+    `CommandProfiler` is set as `profiler`, slow commands are profiled.
+    Each command's signature is compiled into an argument converter when
+    it is registered (or, for lazy plugins, when it is loaded).
+    """
+    def __init__(self, history_manager=None, result_cache=None, executor=None):
         self.commands = {}
+        self.converters = {}  # command name -> compiled argument converter
+        self.history_manager = history_manager
+        self.result_cache = result_cache
+        self.executor = executor or CommandExecutor()
+        self.metrics = CommandMetrics()
+        self.profiler = None
+        self.plugin_load_seconds = {}  # plugin command -> import time
 
     def register_command(self, command_name: str, command: Command):
-        """Register a command with the handler."""
+        """Register a command with the handler and compile its signature."""
         self.commands[command_name] = command
+        self.converters[command_name] = command.signature.compile(command_name)
+
+    def get_command(self, command_name: str):
+        """Return a registered command, importing lazy plugins on first use."""
+        command = self.commands[command_name]
+        if isinstance(command, LazyCommand):
+            started = time.perf_counter()
+            try:
+                command = command.load()
+            except (ImportError, AttributeError) as e:
+                logging.error("Error importing plugin %s: %s", command_name, e)
+                raise ValueError(f"Plugin {command_name} could not be loaded: {e}")
+            self.plugin_load_seconds[command_name] = time.perf_counter() - started
+            self.register_command(command_name, command)
+            logging.info("Plugin command %s loaded.", command_name)
+        return command
+
+    def convert_args(self, command_name: str, args):
+        """Check and convert `args` against the command's signature.
+
+        Raises:
+            ValueError: If the count or an argument does not fit.
+        """
+        self.get_command(command_name)  # lazy plugins declare theirs on load
+        return self.converters[command_name](args)
 
     def execute_command(self, command_name: str, *args):
-        """Execute a registered command if it exists."""
+        """Execute a registered command if it exists.
+
+        The time spent converting arguments and executing the command, and
+        any failure, are recorded in `metrics`.
+        """
         if command_name in self.commands:
+            started = time.perf_counter()
             try:
-                # ✅ Convert arguments to numbers (floats) before execution
-                converted_args = [float(arg) for arg in args]
-                return self.commands[command_name].execute(*converted_args)
-            except ValueError:
-                raise ValueError(f"Invalid input: Arguments must be numbers. Got: {args}")
+                command = self.get_command(command_name)
+                args = self.converters[command_name](args)
+                parsed = time.perf_counter()
+                result = self._execute(command_name, command, args)
+            except Exception:
+                self.metrics.error(command_name)
+                raise
+            self.metrics.record_call(
+                command_name, parsed - started, time.perf_counter() - parsed
+            )
+            return result
         else:
             raise KeyError(f"No such command: {command_name}")
+
+    def _execute(self, command_name, command, args):
+        """Serve pure commands from the result cache when possible.
+
+        Arguments are already converted, so '2' and '2.0' share an entry.
+        """
+        if not (command.pure and self.result_cache is not None):
+            return self._call(command_name, command, args)
+        key = (command_name, args)
+        result = self.result_cache.get(key)
+        if result is MISSING:
+            result = self._call(command_name, command, args)
+            self.result_cache.put(key, result)
+        return result
+
+    def _call(self, command_name, command, args):
+        if self.profiler is not None:
+            return self.profiler.run(command_name, self._run, command, args)
+        return self._run(command, args)
+
+    def _run(self, command, args):
+        if command.execution == INLINE and command.timeout is None:
+            return command.execute(*args)
+        return self.executor.run(command, args)
+
+    def execute_many(self, command_name: str, rows):
+        """Evaluate a command over a 2-D block of operands, one row per call.
+
+        Commands with `execute_vectorized` evaluate the whole block at once;
+        others fall back to one `execute` call per row. Returns a float
+        array of results and a boolean mask of rows that could not be
+        evaluated (missing operands, division by zero, ...), whose results
+        are NaN.
+        """
+        import numpy as np
+
+        if command_name not in self.commands:
+            raise KeyError(f"No such command: {command_name}")
+        command = self.get_command(command_name)
+        try:
+            block = np.asarray(rows, dtype=float)
+        except ValueError:
+            raise ValueError("Invalid input: Operands must be numbers.")
+        if block.ndim != 2 or block.shape[1] == 0:
+            raise ValueError("Invalid input: Operands must be a 2-D block.")
+        command.signature.check_count(command_name, block.shape[1])
+
+        missing = np.isnan(block).any(axis=1)
+        if hasattr(command, 'execute_vectorized'):
+            results, invalid = command.execute_vectorized(block)
+            results = np.asarray(results, dtype=float)
+            invalid = invalid | missing
+        else:
+            results = np.full(len(block), np.nan)
+            invalid = missing.copy()
+            for i, row in enumerate(block):
+                if invalid[i]:
+                    continue
+                try:
+                    results[i] = command.execute(*row)
+                except (ValueError, TypeError, ZeroDivisionError):
+                    invalid[i] = True
+        results[invalid] = np.nan
+        return results, invalid
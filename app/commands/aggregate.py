@@ -0,0 +1,315 @@
+"""
+aggregate.py
+
+This module defines streaming reduction commands that read their numbers
+from files or stdin instead of the command line, so inputs of any size can
+be reduced in constant memory.
+
+Usage:
+    sum <path>...       Numbers may be separated by whitespace, commas or
+    mean <path>...      newlines; '-' reads stdin. Several paths are
+    var <path>...       reduced together.
+    min <path>...
+    max <path>...
+    product <path>...
+
+Input is read in fixed-size chunks and each chunk is parsed into a NumPy
+array, reduced, and dropped. Sums are compensated: each chunk is summed
+with `math.fsum` and the chunk totals are accumulated exactly, so no
+precision is lost to running error; a chunk whose sum overflows part way
+is added one number at a time, and a running total past the float range
+is carried on exactly as a fraction. `var` (the sample variance) merges
+per-chunk means and squared deviations with Chan's parallel update of
+Welford's method, and `product` accumulates in log space, keeping the
+base-2 exponent as an exact integer, so long products neither overflow
+nor underflow before the end.
+
+Classes:
+    - SumReducer, MeanReducer, VarianceReducer, MinReducer, MaxReducer,
+      ProductReducer: Mergeable accumulators fed one chunk at a time.
+    - AggregateCommand: Runs one reducer over files or stdin.
+"""
+
+import math
+import sys
+from fractions import Fraction
+
+from app.commands import Command
+from app.command_signature import Signature
+
+CHUNK_SIZE = 1 << 20  # characters read per chunk
+
+
+def iter_chunks(stream, chunk_size=CHUNK_SIZE):
+    """Yield the numbers in a text stream as float arrays, chunk by chunk.
+
+    Raises:
+        ValueError: If the stream contains something that is not a number.
+    """
+    import numpy as np
+
+    carry = ""
+    while True:
+        text = stream.read(chunk_size)
+        if not text:
+            break
+        text = carry + text.replace(",", " ")
+        tokens = text.split()
+        # A number may continue in the next chunk unless the chunk ends in a separator.
+        carry = tokens.pop() if tokens and not text[-1].isspace() else ""
+        if tokens:
+            yield _to_array(np, tokens)
+    if carry:
+        yield _to_array(np, [carry])
+
+
+def _to_array(np, tokens):
+    try:
+        return np.array(tokens, dtype=float)
+    except ValueError:
+        bad = next(token for token in tokens if not _is_number(token))
+        raise ValueError(f"Invalid input: not a number: {bad!r}")
+
+
+def _is_number(token):
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+class ExactSum:
+    """Exact running sum of floats (Shewchuk's partials, as in math.fsum)."""
+    __slots__ = ('partials', 'special', 'exact')
+
+    def __init__(self):
+        self.partials = []
+        self.special = 0.0  # infinities and NaNs, which the partials cannot hold
+        self.exact = None  # the sum as a Fraction once it has left the float range
+
+    def add(self, x):
+        """Add one float without rounding error."""
+        if not math.isfinite(x):
+            self.special += x
+            return
+        if self.exact is not None:
+            self.exact += Fraction(x)
+            return
+        i = 0
+        for j, y in enumerate(self.partials):
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            if math.isinf(hi):
+                # partials[:i], x, y and partials[j + 1:] still sum exactly
+                rest = self.partials[:i] + [x, y] + self.partials[j + 1:]
+                self.exact = sum(map(Fraction, rest), Fraction(0))
+                self.partials = []
+                return
+            lo = y - (hi - x)
+            if lo:
+                self.partials[i] = lo
+                i += 1
+            x = hi
+        self.partials[i:] = [x]
+
+    def value(self):
+        """The sum, correctly rounded."""
+        if self.special != 0.0 or math.isnan(self.special):
+            return self.special
+        if self.exact is not None:
+            try:
+                return float(self.exact)
+            except OverflowError:
+                return math.inf if self.exact > 0 else -math.inf
+        return math.fsum(self.partials)
+
+
+class SumReducer:
+    """Compensated sum."""
+
+    def __init__(self):
+        self.total = ExactSum()
+        self.count = 0
+
+    def update(self, chunk):
+        """Add a chunk of numbers."""
+        try:
+            self.total.add(math.fsum(chunk))
+        except OverflowError:  # an intermediate sum left the float range
+            for value in chunk.tolist():
+                self.total.add(value)
+        self.count += len(chunk)
+
+    def result(self):
+        """The sum; 0.0 for no input."""
+        return self.total.value()
+
+
+class MeanReducer(SumReducer):
+    """Arithmetic mean from the compensated sum."""
+
+    def result(self):
+        """The mean."""
+        if not self.count:
+            raise ValueError("Invalid input: no numbers to average.")
+        total = self.total
+        if total.exact is not None and total.special == 0.0:
+            mean = total.exact / self.count  # the sum left the float range
+            try:
+                return float(mean)
+            except OverflowError:
+                return math.inf if mean > 0 else -math.inf
+        return total.value() / self.count
+
+
+class VarianceReducer:
+    """Sample variance via Chan's parallel merge of Welford accumulators."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+
+    def update(self, chunk):
+        """Merge a chunk's count, mean and squared deviations."""
+        n = len(chunk)
+        if not n:
+            return
+        try:
+            chunk_mean = math.fsum(chunk) / n
+        except OverflowError:
+            chunk_mean = float(sum(map(Fraction, chunk.tolist())) / n)
+        deviations = chunk - chunk_mean
+        chunk_m2 = float((deviations * deviations).sum())
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        # weights first, so huge deltas do not overflow on the way
+        self.mean += delta * (n / total)
+        self.m2 += chunk_m2
+        if self.count:
+            self.m2 += delta * (self.count * n / total) * delta
+        self.count = total
+
+    def result(self):
+        """The sample variance."""
+        if self.count < 2:
+            raise ValueError("Invalid input: variance needs at least two numbers.")
+        return self.m2 / (self.count - 1)
+
+
+class MinReducer:
+    """Smallest number."""
+    pick = staticmethod(min)
+
+    def __init__(self):
+        self.value = None
+
+    def update(self, chunk):
+        """Compare a chunk's extreme with the best so far."""
+        if len(chunk):
+            best = float(self.pick(chunk.min(), chunk.max()))
+            self.value = best if self.value is None else self.pick(self.value, best)
+
+    def result(self):
+        """The extreme value."""
+        if self.value is None:
+            raise ValueError("Invalid input: no numbers given.")
+        return self.value
+
+
+class MaxReducer(MinReducer):
+    """Largest number."""
+    pick = staticmethod(max)
+
+
+class ProductReducer:
+    """Product kept as a mantissa and an exact base-2 exponent.
+
+    This is log-space accumulation with the integer part of the log kept
+    exactly: the exponents of the factors are summed as Python ints and
+    only mantissas in [0.5, 1) are multiplied, so the running product can
+    neither overflow nor underflow, and small products stay exact.
+    """
+    BLOCK = 512  # 0.5 ** 512 is still a normal float
+
+    def __init__(self):
+        self.mantissa = 1.0
+        self.exponent = 0
+
+    def update(self, chunk):
+        """Fold a chunk's mantissas and exponents in."""
+        import numpy as np
+
+        mantissas, exponents = np.frexp(chunk)
+        self.exponent += int(exponents.sum(dtype=np.int64))
+        for start in range(0, len(mantissas), self.BLOCK):
+            block = float(np.prod(mantissas[start:start + self.BLOCK]))
+            self.mantissa, shift = math.frexp(self.mantissa * block)
+            self.exponent += shift
+
+    def result(self):
+        """The product; 1.0 for no input, ±inf or ±0.0 beyond float range."""
+        if not self.mantissa or not math.isfinite(self.mantissa):
+            return self.mantissa
+        if self.exponent < -1100:
+            return math.copysign(0.0, self.mantissa)
+        try:
+            return math.ldexp(self.mantissa, self.exponent)
+        except OverflowError:
+            return math.copysign(math.inf, self.mantissa)
+
+
+REDUCERS = {
+    'sum': SumReducer,
+    'mean': MeanReducer,
+    'var': VarianceReducer,
+    'min': MinReducer,
+    'max': MaxReducer,
+    'product': ProductReducer,
+}
+
+
+class AggregateCommand(Command):
+    """Command to reduce the numbers in files or stdin to one value.
+
+    It runs on the thread pool so a long read can be interrupted with
+    Ctrl-C.
+    """
+    signature = Signature(varargs=str)
+    execution = "thread"
+
+    def __init__(self, reducer):
+        """Stores the name of the reduction to run (a key of REDUCERS)."""
+        self.name = reducer
+        self.reducer_class = REDUCERS[reducer]
+
+    def execute(self, *args):
+        """Executes the reduction.
+        Args:
+            *args (str): Paths of files to read, or '-' for stdin.
+        Returns:
+            float: The reduced value.
+        Raises:
+            ValueError: If no input is given, a file cannot be read or it
+                holds something that is not a number.
+        """
+        if not args:
+            raise ValueError(f"Usage: {self.name} <path|->...")
+        reducer = self.reducer_class()
+        for path in args:
+            if path == "-":
+                self._reduce(reducer, sys.stdin)
+                continue
+            try:
+                with open(path, encoding="utf-8") as stream:
+                    self._reduce(reducer, stream)
+            except OSError as e:
+                raise ValueError(f"Cannot read {path}: {e.strerror}")
+        return reducer.result()
+
+    @staticmethod
+    def _reduce(reducer, stream):
+        for chunk in iter_chunks(stream):
+            reducer.update(chunk)
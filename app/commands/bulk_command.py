@@ -0,0 +1,64 @@
+"""
+bulk_command.py
+
+This module defines the `BulkCommand`, which evaluates a calculator command
+over every row of a CSV file in one vectorized pass.
+
+Usage:
+    bulk <command> <input.csv> [output.csv]
+
+    Every numeric column of the input is treated as one operand, so a file
+    with columns `a,b` evaluated with `div` computes `a / b` for each row;
+    other columns (IDs, labels) are carried through untouched.
+    The results are written back as a `Result` column, next to an `Invalid`
+    column flagging rows that could not be evaluated (e.g. zero divisors).
+"""
+import logging
+import os
+from app.commands import Command
+from app.command_signature import Signature
+
+class BulkCommand(Command):
+    """Command to evaluate another command over a CSV block of operands."""
+    signature = Signature(varargs=str)
+    OUTPUT_COLUMNS = ("Result", "Invalid")
+
+    def __init__(self, command_handler):
+        """Stores reference to command handler to run the bulk evaluation."""
+        self.command_handler = command_handler
+
+    def execute(self, *args):
+        """Evaluates the command and writes the result column.
+        Args:
+            *args (str): The command name, the input CSV path and an
+                optional output path (defaults to the input file).
+        Returns:
+            str: A summary of the evaluated rows.
+        """
+        if len(args) not in (2, 3):
+            return "Usage: bulk <command> <input.csv> [output.csv]"
+        command_name, input_path = args[0], args[1]
+        output_path = args[2] if len(args) == 3 else input_path
+        if not os.path.exists(input_path):
+            return f"Error: File '{input_path}' not found."
+
+        import pandas as pd
+        frame = pd.read_csv(input_path)
+        operands = frame.select_dtypes("number").drop(
+            columns=list(self.OUTPUT_COLUMNS), errors="ignore"
+        )
+        results, invalid = self.command_handler.execute_many(
+            command_name, operands.to_numpy(dtype=float)
+        )
+        frame["Result"] = results
+        frame["Invalid"] = invalid
+        frame.to_csv(output_path, index=False)
+
+        logging.info(
+            "Bulk %s evaluated %d rows from %s (%d invalid).",
+            command_name, len(frame), input_path, int(invalid.sum()),
+        )
+        return (
+            f"Evaluated {len(frame)} rows with {command_name} "
+            f"({int(invalid.sum())} invalid) -> {output_path}"
+        )
@@ -0,0 +1,45 @@
+"""
+cache_command.py
+
+This module defines the `CacheCommand`, which reports on and manages the
+result cache that `CommandHandler` keeps for pure commands.
+
+Usage:
+    cache stats    Show size, hit rate and evictions.
+    cache clear    Drop every cached result.
+"""
+from app.commands import Command
+from app.command_signature import Signature
+
+class CacheCommand(Command):
+    """Command to inspect or clear the result cache."""
+    signature = Signature(varargs=str)
+    record_history = False
+
+    def __init__(self, command_handler):
+        """Stores reference to command handler to reach its result cache."""
+        self.command_handler = command_handler
+
+    def execute(self, *args):
+        """Executes the cache command.
+        Args:
+            *args (str): 'stats' (default) or 'clear'.
+        Returns:
+            str: Cache statistics or a confirmation message.
+        """
+        cache = self.command_handler.result_cache
+        action = args[0] if args else "stats"
+        if cache is None:
+            return "Result cache is disabled."
+        if action == "clear":
+            cache.clear()
+            return "Result cache cleared."
+        if action != "stats":
+            return "Usage: cache stats|clear"
+        stats = cache.stats()
+        return (
+            f"Result cache: size {stats['size']}/{stats['maxsize']}, "
+            f"hits {stats['hits']}, misses {stats['misses']}, "
+            f"hit rate {stats['hit_rate']:.1%}, "
+            f"evictions {stats['evictions']}, expirations {stats['expirations']}"
+        )
@@ -12,7 +12,10 @@ Classes:
 
 Usage:
     These command classes are designed to be used with a `CommandHandler` 
-    that dynamically registers and executes commands.
+    that dynamically registers and executes commands and converts their
+    arguments to floats. Each also implements
+    `execute_vectorized` so `CommandHandler.execute_many` can evaluate a
+    whole block of operand rows with NumPy.
 
 Example:
     add = AddCommand()
@@ -20,9 +23,12 @@ Example:
 """
 
 from app.commands import Command
+from app.command_signature import Signature
 
 class AddCommand(Command):
     """Command to perform addition of multiple numbers."""
+    pure = True
+
     def execute(self, *args):
         """Executes the addition command.
         Args:
@@ -32,8 +38,16 @@ class AddCommand(Command):
         """
         return sum(args)
 
+    def execute_vectorized(self, block):
+        """Sums every row of a 2-D operand block."""
+        import numpy as np
+        return np.add.reduce(block, axis=1), np.zeros(len(block), dtype=bool)
+
 class SubtractCommand(Command):
     """Command to perform subtraction of multiple numbers."""
+    pure = True
+    signature = Signature(varargs=float, min_args=1)
+
     def execute(self, *args):
         """Executes the subtraction command.
         Args:
@@ -41,14 +55,20 @@ class SubtractCommand(Command):
         Returns:
             float: The result after sequential subtraction.
         """
-        numbers = list(map(float, args))
-        result = numbers[0]
-        for num in numbers[1:]:
+        result = args[0]
+        for num in args[1:]:
             result -= num
         return result
 
+    def execute_vectorized(self, block):
+        """Subtracts left to right along every row of a 2-D operand block."""
+        import numpy as np
+        return np.subtract.reduce(block, axis=1), np.zeros(len(block), dtype=bool)
+
 class MultiplyCommand(Command):
     """Command to perform multiplication of multiple numbers.""" 
+    pure = True
+
     def execute(self, *args):
         """Executes the multiplication command.
         Args:
@@ -56,14 +76,21 @@ class MultiplyCommand(Command):
         Returns:
             float: The product of all input numbers.
         """
-        numbers = list(map(float, args))
         result = 1
-        for num in numbers:
+        for num in args:
             result *= num
         return result
 
+    def execute_vectorized(self, block):
+        """Multiplies every row of a 2-D operand block."""
+        import numpy as np
+        return np.multiply.reduce(block, axis=1), np.zeros(len(block), dtype=bool)
+
 class DivideCommand(Command):
     """Command to perform division of multiple numbers, ensuring no division by zero."""
+    pure = True
+    signature = Signature(varargs=float, min_args=1)
+
     def execute(self, *args):
         """Executes the division command.
         Args:
@@ -73,10 +100,21 @@ class DivideCommand(Command):
         Raises:
             ZeroDivisionError: If division by zero is attempted.
         """
-        numbers = list(map(float, args))
-        if 0 in numbers[1:]:  # Prevent division by zero
+        if 0 in args[1:]:  # Prevent division by zero
             raise ZeroDivisionError("Cannot divide by zero.")
-        result = numbers[0]
-        for num in numbers[1:]:
+        result = args[0]
+        for num in args[1:]:
             result /= num
         return result
+
+    def execute_vectorized(self, block):
+        """Divides left to right along every row of a 2-D operand block.
+
+        Rows with a zero divisor are flagged in the returned mask instead of
+        raising, so the rest of the block is still evaluated.
+        """
+        import numpy as np
+        zero_divisor = (block[:, 1:] == 0).any(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            results = np.divide.reduce(block, axis=1)
+        return results, zero_divisor
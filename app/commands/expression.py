@@ -0,0 +1,165 @@
+"""
+expression.py
+
+This module defines the `EvalCommand`, which evaluates an infix expression
+such as `2*(3+4)/5` in a single dispatch instead of one command per step.
+
+Expressions are parsed with Python's `ast` module and compiled into a tree
+of closures. Compiled forms are kept in an LRU cache keyed by the
+expression text, so re-evaluating the same expression with different
+variable bindings skips parsing entirely.
+
+Supported syntax:
+    - Numbers, parentheses, `+ - * / // % **` (and `^` as power)
+    - Variables, bound as `name=value` arguments: `eval 2*x+1 x=3`
+    - Calls to pure registered commands: `eval square(3) + add(1, 2, 3)`
+
+Results must be real numbers: a power that would be complex, such as
+`(-8)**0.5`, and results too large for a float are errors, as are
+expressions nested too deeply to evaluate.
+
+Usage:
+    eval <expression> [name=value ...]
+    calc <expression> [name=value ...]
+"""
+import ast
+import operator
+import re
+from functools import lru_cache
+from app.commands import Command
+from app.command_signature import Signature
+
+def _power(base, exponent):
+    result = operator.pow(base, exponent)
+    if isinstance(result, complex):
+        raise ValueError(f"Invalid expression: {base}**{exponent} is not a real number.")
+    return result
+
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _power,
+    ast.BitXor: _power,
+}
+_UNARY_OPERATORS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+_BINDING = re.compile(r"^([A-Za-z_]\w*)=(.+)$")
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text):
+    """Compile `text` into a function of (variables, call).
+
+    `variables` maps names to values and `call(name, values)` runs a
+    registered command. Raises ValueError for syntax outside the
+    supported subset.
+    """
+    try:
+        tree = ast.parse(text.strip(), mode='eval')
+    except SyntaxError:
+        raise ValueError(f"Invalid expression: {text}")
+    return _compile(tree.body)
+
+
+def _compile(node):
+    """Turn one AST node into a closure."""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = float(node.value)
+        return lambda variables, call: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        def load(variables, call):
+            try:
+                return variables[name]
+            except KeyError:
+                raise ValueError(f"Unbound variable: {name}")
+        return load
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        apply = _BINARY_OPERATORS[type(node.op)]
+        left, right = _compile(node.left), _compile(node.right)
+        return lambda variables, call: apply(
+            left(variables, call), right(variables, call)
+        )
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        apply = _UNARY_OPERATORS[type(node.op)]
+        operand = _compile(node.operand)
+        return lambda variables, call: apply(operand(variables, call))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+            and not node.keywords:
+        name = node.func.id
+        args = [_compile(arg) for arg in node.args]
+        return lambda variables, call: call(
+            name, [arg(variables, call) for arg in args]
+        )
+
+    raise ValueError(f"Unsupported expression syntax: {type(node).__name__}")
+
+
+class EvalCommand(Command):
+    """Command to evaluate an infix expression in one step."""
+    signature = Signature(varargs=str)
+
+    def __init__(self, command_handler):
+        """Stores reference to command handler to resolve function calls."""
+        self.command_handler = command_handler
+
+    def execute(self, *args):
+        """Executes the expression command.
+        Args:
+            *args (str): Expression tokens, optionally followed by
+                `name=value` variable bindings.
+        Returns:
+            float: The value of the expression.
+        Raises:
+            ValueError: If the expression or a binding is invalid.
+        """
+        tokens, variables = [], {}
+        for arg in args:
+            binding = _BINDING.match(arg)
+            if binding and not binding.group(2).startswith('='):
+                try:
+                    variables[binding.group(1)] = float(binding.group(2))
+                except ValueError:
+                    raise ValueError(f"Invalid binding: {arg}")
+            else:
+                tokens.append(arg)
+        if not tokens:
+            raise ValueError("Usage: eval <expression> [name=value ...]")
+        return self.evaluate(" ".join(tokens), **variables)
+
+    def evaluate(self, expression, **variables):
+        """Evaluates `expression` with the given variable bindings."""
+        try:
+            return compile_expression(expression)(variables, self._call)
+        except OverflowError:
+            raise ValueError(f"Result too large: {expression}")
+        except (RecursionError, MemoryError):
+            # deep nesting exhausts the parser or the compiler's recursion
+            raise ValueError("Invalid expression: nested too deeply.")
+
+    def _call(self, name, values):
+        """Runs a registered command from inside an expression.
+
+        Only pure commands may be called, so evaluating an expression never
+        has side effects; the call goes through the handler, so its result
+        cache and metrics apply.
+        """
+        if name not in self.command_handler.commands:
+            raise ValueError(f"Unknown function: {name}")
+        if not self.command_handler.get_command(name).pure:
+            raise ValueError(f"Function {name} cannot be used in an expression.")
+        result = self.command_handler.execute_command(name, *values)
+        if isinstance(result, bool) or not isinstance(result, (int, float)):
+            raise ValueError(f"Function {name} did not return a number: {result}")
+        return result
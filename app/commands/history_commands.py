@@ -1,40 +1,180 @@
 """
 history_commands.py
 
-This module defines commands for managing and interacting with the calculation history. 
+This module defines commands for managing and interacting with the calculation history.
 It includes commands to view, clear, and delete history entries, utilizing the `HistoryManager`.
 
 Classes:
-    - HistoryCommand: Retrieves and displays the calculation history.
+    - HistoryCommand: Retrieves and displays the calculation history,
+      optionally filtered with `--op <command> --since <date> --limit <n>`,
+      paged with `--tail <n>`, `--page <k> [--size <n>]` or `--stream`,
+      or exports it with `export --format parquet|arrow [path]`.
     - ClearHistoryCommand: Clears the entire calculation history.
     - DeleteHistoryCommand: Deletes a specific entry from the history by index.
 
 Usage:
-    These command classes are designed to be used with a `CommandHandler`, 
-    allowing dynamic execution of history-related commands.
+    These command classes are designed to be used with a `CommandHandler`,
+    allowing dynamic execution of history-related commands. All of them
+    share the single `HistoryManager` owned by the application, so they see
+    the same state and never re-read the history file.
 """
 
+import sys
 from app.commands import Command
-from app.history_manager import HistoryManager
+from app.command_signature import Signature
+
+def parse_options(args, converters):
+    """Parses `--name value` pairs into a dict using per-option converters.
+
+    Options whose converter is `bool` are flags and take no value.
+
+    Raises:
+        ValueError: On unknown options, missing values or bad values.
+    """
+    options = {}
+    tokens = iter(args)
+    for token in tokens:
+        name = token[2:] if token.startswith("--") else None
+        if name not in converters:
+            raise ValueError(f"Unknown option: {token}")
+        if converters[name] is bool:
+            options[name] = True
+            continue
+        value = next(tokens, None)
+        if value is None:
+            raise ValueError(f"Option {token} needs a value.")
+        try:
+            options[name] = converters[name](value)
+        except ValueError:
+            raise ValueError(f"Invalid value for {token}: {value}")
+    return options
+
+def format_row(index, operation, operands, result, timestamp, width=40):
+    """Formats one history entry as a single fixed-width line."""
+    result = str(result).replace("\n", "\\n")
+    if len(result) > width:
+        result = result[:width - 3] + "..."
+    return f"{index:>8}  {operation:<10}  {operands:<24}  {result:<{width}}  {timestamp}"
 
 class HistoryCommand(Command):
-    """Command to retrieve and display the calculation history."""
+    """Command to retrieve and display the calculation history.
+
+    Its output is not itself saved to the history.
+    """
+    signature = Signature(varargs=str)
+    record_history = False
+    console_options = frozenset({"--stream"})
+    OPTIONS = {
+        "op": str, "since": str, "limit": int,
+        "tail": int, "page": int, "size": int, "stream": bool,
+    }
+    PAGE_SIZE = 20
+    FULL_VIEW_LIMIT = 1000
+    EXPORT_OPTIONS = {"format": str}
+    EXPORT_DIR = "data"
+
+    def __init__(self, history_manager):
+        """Stores the shared history manager and a cache of the rendered view."""
+        self.history_manager = history_manager
+        self._rendered = None
+        self._rendered_version = None
+
     def execute(self, *args):
         """Executes the command to retrieve history.
         Args:
-            *args: Unused arguments (included for compatibility).
+            *args (str): Optional filters (`--op <command>`,
+                `--since <YYYY-MM-DD[THH:MM:SS]>`, `--limit <n>`) or paging
+                options (`--tail <n>`, `--page <k>`, `--size <n>`,
+                `--stream`).
         Returns:
             str: A string representation of the calculation history.
                  If the history is empty, returns a message indicating so.
+                 Streaming prints page by page and returns None.
+        Raises:
+            ValueError: If an option is unknown or malformed.
         """
-        history_manager = HistoryManager()
-        history = history_manager.get_history()
-        if history.empty:
-            return "No history available."
-        return history.to_string(index=True)
+        if args and args[0] == "export":
+            return self.export(*args[1:])
+        options = parse_options(args, self.OPTIONS)
+        size = options.get("size", self.PAGE_SIZE)
+
+        if options.get("stream"):
+            self.stream(size)
+            return None
+        if "page" in options:
+            return self._render(
+                self.history_manager.page(options["page"], size),
+                f"No history entries on page {options['page']}.",
+            )
+        if {"op", "since", "limit"} & options.keys():
+            matches = self.history_manager.query(
+                operation=options.get("op"),
+                since=options.get("since"),
+                limit=options.get("limit", options.get("tail")),
+            )
+            return self._render(matches, "No matching history entries.")
+        if "tail" in options:
+            return self._render(
+                self.history_manager.tail(options["tail"]),
+                "No history available.",
+            )
+
+        version = self.history_manager.refresh()
+        if self._rendered_version != version:
+            self._rendered = self._render_default()
+            self._rendered_version = self.history_manager.version
+        return self._rendered
+
+    def _render_default(self):
+        """The whole history, or only its last page once it gets large."""
+        total = self.history_manager.count()
+        if total <= self.FULL_VIEW_LIMIT:
+            return self._render(
+                self.history_manager.get_history(), "No history available."
+            )
+        last_page = self.history_manager.tail(self.PAGE_SIZE)
+        return (
+            f"Showing the last {self.PAGE_SIZE} of {total} entries "
+            f"(use --page, --tail or --stream for more):\n"
+            + last_page.to_string(index=True)
+        )
+
+    @staticmethod
+    def _render(frame, empty_message):
+        if frame.empty:
+            return empty_message
+        return frame.to_string(index=True)
+
+    def stream(self, size, out=None):
+        """Prints the history `size` rows at a time without building it whole."""
+        out = out or sys.stdout
+        count = 0
+        for batch in self.history_manager.iter_rows(size):
+            out.write("\n".join(format_row(*row) for row in batch) + "\n")
+            count += len(batch)
+        if count == 0:
+            out.write("No history available.\n")
+        out.flush()
+
+    def export(self, *args):
+        """Exports the history: `export --format parquet|arrow [path]`."""
+        path = None
+        if args and not args[-1].startswith("--") and len(args) % 2 == 1:
+            path, args = args[-1], args[:-1]
+        fmt = parse_options(args, self.EXPORT_OPTIONS).get("format", "parquet")
+        if path is None:
+            path = f"{self.EXPORT_DIR}/history.{fmt}"
+        count = self.history_manager.export_history(path, fmt)
+        return f"Exported {count} history entries to {path}."
 
 class ClearHistoryCommand(Command):
     """Command to clear the entire calculation history."""
+    signature = Signature(varargs=str)
+
+    def __init__(self, history_manager):
+        """Stores the shared history manager."""
+        self.history_manager = history_manager
+
     def execute(self, *args):
         """Executes the command to clear history.
         Args:
@@ -42,29 +182,24 @@ class ClearHistoryCommand(Command):
         Returns:
             str: Confirmation message indicating the history has been cleared.
         """
-        history_manager = HistoryManager()
-        history_manager.clear_history()
+        self.history_manager.clear_history()
         return "Calculation history cleared."
 
 class DeleteHistoryCommand(Command):
     """Command to delete a specific calculation history entry by index."""
-    def execute(self, *args):
+    signature = Signature(int)
+
+    def __init__(self, history_manager):
+        """Stores the shared history manager."""
+        self.history_manager = history_manager
+
+    def execute(self, index):
         """Executes the command to delete a history entry.
         Args:
-            *args (str): A single argument representing the index of the entry to delete.
+            index (int): The index of the entry to delete.
         Returns:
             str: Success or error message indicating the result of the deletion.
-        Raises:
-            ValueError: If the provided index is not a valid number.
         """
-        if len(args) != 1:
-            return "Usage: delhis <index>"
-
-        try:
-            index = int(args[0])
-            history_manager = HistoryManager()
-            if history_manager.delete_history_entry(index):
-                return f"Deleted history entry {index}."
-            return f"No history entry at index {index}."
-        except ValueError:
-            return "Error: Index must be a number."
+        if self.history_manager.delete_history_entry(index):
+            return f"Deleted history entry {index}."
+        return f"No history entry at index {index}."
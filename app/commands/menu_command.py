@@ -5,9 +5,12 @@ This module defines include a REPL "Menu" command to list all available
 plugin commands, ensuring user discoverability and interaction.
 """
 from app.commands import Command
+from app.command_signature import Signature
 
 class MenuCommand(Command):
     """Command to list all available plugin commands."""
+    signature = Signature(varargs=str)
+
     def __init__(self, command_handler):
         """Stores reference to command handler to list available commands."""
         self.command_handler = command_handler
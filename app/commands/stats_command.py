@@ -0,0 +1,68 @@
+"""
+stats_command.py
+
+This module defines the `StatsCommand`, which shows the per-command call
+counts, error counts and latency percentiles recorded by `CommandHandler`.
+
+Usage:
+    stats          One line per command: calls, errors, and p50/p95/p99
+                   latencies for parsing, executing and saving to history.
+    stats reset    Forget everything recorded so far.
+"""
+from app.commands import Command
+from app.command_signature import Signature
+
+def format_latency(seconds):
+    """Render a latency in the most readable unit."""
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds * 1e6:.0f}us"
+
+class StatsCommand(Command):
+    """Command to display per-command latency statistics."""
+    signature = Signature(varargs=str)
+    record_history = False
+
+    def __init__(self, command_handler):
+        """Stores reference to command handler to reach its metrics."""
+        self.command_handler = command_handler
+
+    def execute(self, *args):
+        """Executes the stats command.
+        Args:
+            *args (str): Nothing, or 'reset'.
+        Returns:
+            str: A table of statistics per command, or a confirmation message.
+        """
+        metrics = self.command_handler.metrics
+        if args and args[0] == "reset":
+            metrics.reset()
+            return "Command statistics reset."
+        if args:
+            return "Usage: stats [reset]"
+        snapshot = metrics.snapshot()
+        if not snapshot:
+            return "No commands have run yet."
+
+        def percentiles(histogram):
+            if not histogram.count:
+                return "-"
+            summary = histogram.summary()
+            return "/".join(
+                format_latency(summary[key]) for key in ("p50", "p95", "p99")
+            )
+
+        lines = [
+            f"{'command':<10}{'calls':>8}{'errors':>8}  "
+            f"{'parse p50/p95/p99':<24}{'execute p50/p95/p99':<26}{'persist p50/p95/p99'}"
+        ]
+        for name, entry in sorted(snapshot.items()):
+            lines.append(
+                f"{name:<10}{entry['calls']:>8}{entry['errors']:>8}  "
+                f"{percentiles(entry['parse']):<24}"
+                f"{percentiles(entry['execute']):<26}"
+                f"{percentiles(entry['persist'])}"
+            )
+        return "\n".join(lines)
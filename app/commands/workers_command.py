@@ -0,0 +1,38 @@
+"""
+workers_command.py
+
+This module defines the `WorkersCommand`, which reports how busy the
+thread and process pools that run off-thread commands are.
+
+Usage:
+    workers    Show pool sizes, task counts, timeouts and utilization.
+"""
+from app.commands import Command
+from app.command_signature import Signature
+
+class WorkersCommand(Command):
+    """Command to report worker pool utilization."""
+    signature = Signature(varargs=str)
+    record_history = False
+
+    def __init__(self, command_handler):
+        """Stores reference to command handler to reach its executor."""
+        self.command_handler = command_handler
+
+    def execute(self, *args):
+        """Executes the workers command.
+        Returns:
+            str: One line of statistics per worker pool.
+        """
+        lines = []
+        for policy, stats in self.command_handler.executor.stats().items():
+            state = "running" if stats["running"] else "idle"
+            lines.append(
+                f"{policy} pool ({state}): {stats['workers']} workers, "
+                f"in flight {stats['in_flight']}, completed {stats['completed']}, "
+                f"failed {stats['failed']}, timeouts {stats['timeouts']}, "
+                f"cancelled {stats['cancelled']}, "
+                f"busy {stats['busy_seconds']:.3f}s, "
+                f"utilization {stats['utilization']:.1%}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,100 @@
+"""
+history_export.py
+
+Columnar export of the calculation history for offline analysis.
+
+The history is written as an Arrow table with typed columns instead of the
+text columns of the CSV journal:
+
+    Operation   dictionary<string>   interned command names
+    Operands    list<double>         one element per operand; tokens that
+                                     are not numbers are stored as nulls
+    Result      double               null when the result is not a number
+    ResultText  string               the result when it is not a number
+    Timestamp   timestamp[s]         null for entries saved before
+                                     timestamps were recorded
+
+Two file formats are supported: Parquet (compressed, for archiving) and
+the Arrow IPC file format (uncompressed, so reloads are memory-mapped and
+zero-copy). pyarrow is only imported when an export is requested.
+"""
+
+import os
+from datetime import datetime
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError(
+            "Parquet/Arrow export requires pyarrow: pip install pyarrow"
+        )
+    return pyarrow
+
+
+def _to_float(token):
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def format_for(path, fmt=None):
+    """Return the export format, inferring it from the extension if needed."""
+    if fmt is None:
+        extension = os.path.splitext(path)[1].lower()
+        fmt = next((name for name, ext in FORMATS.items() if ext == extension), None)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format. Choose from {tuple(FORMATS)}.")
+    return fmt
+
+
+def to_table(rows):
+    """Build an Arrow table from (operation, operands, result, timestamp) rows."""
+    pa = _require_pyarrow()
+    operations, operands, results, texts, timestamps = [], [], [], [], []
+    for operation, operand_text, result, timestamp in rows:
+        operations.append(operation)
+        operands.append([_to_float(token) for token in str(operand_text).split()])
+        number = result if isinstance(result, float) else _to_float(str(result))
+        results.append(number)
+        texts.append(None if number is not None else str(result))
+        timestamps.append(datetime.fromisoformat(timestamp) if timestamp else None)
+    return pa.table({
+        'Operation': pa.array(operations, pa.string()).dictionary_encode(),
+        'Operands': pa.array(operands, pa.list_(pa.float64())),
+        'Result': pa.array(results, pa.float64()),
+        'ResultText': pa.array(texts, pa.string()),
+        'Timestamp': pa.array(timestamps, pa.timestamp('s')),
+    })
+
+
+def write_table(table, path, fmt):
+    """Write `table` to `path` in the given format."""
+    pa = _require_pyarrow()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+def read_table(path, fmt=None):
+    """Read an exported history back as an Arrow table.
+
+    Arrow files are memory-mapped and their columns reference the mapped
+    pages directly; Parquet files are read through a memory map and decoded.
+    """
+    pa = _require_pyarrow()
+    fmt = format_for(path, fmt)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
@@ -1,46 +1,919 @@
 """
 history_manager.py
+
+`HistoryManager` is a facade over a pluggable history store. Two stores
+are provided:
+
+- `CsvHistoryStore` keeps the history in an append-only CSV journal: every
+  operation adds one record to the end of the file instead of rewriting it.
+  Deleting an entry appends a tombstone record naming the deleted row, and
+  the journal is compacted once tombstones outnumber live rows. The journal
+  is only parsed the first time the history is read, into a compact
+  column-wise `CompactRows` (see `app.history_rows`). Until then, paging
+  and streaming parse the journal as they go and keep only the rows they
+  return, and tailing reads it backwards from the end.
+- `SqliteHistoryStore` keeps it in an SQLite database in WAL mode, with
+  indexes on the operation and timestamp so filtered queries do not scan
+  the whole history.
+
+The backend is chosen with the HISTORY_BACKEND setting ('csv' or 'sqlite').
+With HISTORY_DURABILITY set to 'interval' or 'exit', saves are queued and
+committed in groups by a background `HistoryWriter`; reads flush the queue
+first, so they always see every saved record.
+pandas is only imported when a DataFrame view of the history is requested.
 """
 
+import csv
+import hashlib
+import io
+import itertools
 import os
-import pandas as pd
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+
+from app.command_metrics import LatencyHistogram
+from app.history_rows import CompactRows
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; appends are then unlocked
+    fcntl = None
+
+COLUMNS = ["Operation", "Operands", "Result", "Timestamp"]
+
+
+def _parse_result(value):
+    """Results are stored as text; restore numeric ones to floats."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def file_digest(path):
+    """(size, SHA-1 hex digest) of a file, or None if it does not exist."""
+    digest = hashlib.sha1()
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return size, digest.hexdigest()
+
+
+def normalize_timestamp(value):
+    """Validate an ISO 8601 date or datetime and return it in stored form."""
+    try:
+        return datetime.fromisoformat(value).isoformat(timespec='seconds')
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid timestamp: {value}. Use YYYY-MM-DD[THH:MM:SS].")
+
+
+class HistoryStore(ABC):
+    """Storage backend for the calculation history.
+
+    Rows are (operation, operands, result, timestamp) tuples, kept in the
+    order they were saved; an entry's index is its position in that order.
+    """
+
+    @abstractmethod
+    def append(self, records):
+        """Append rows to the end of the history."""
+
+    @abstractmethod
+    def rows(self):
+        """Return every live row, oldest first."""
+
+    @abstractmethod
+    def query(self, operation=None, since=None, limit=None):
+        """Return (index, *row) for rows matching the filters, oldest first.
+
+        `since` is a normalized timestamp; `limit` keeps the most recent
+        matches.
+        """
+
+    @abstractmethod
+    def slice(self, start, stop):
+        """Return (index, *row) for rows start..stop-1, oldest first."""
+
+    def iter_rows(self, batch_size):
+        """Yield lists of at most `batch_size` (index, *row) tuples."""
+        start = 0
+        while True:
+            batch = self.slice(start, start + batch_size)
+            if not batch:
+                return
+            yield batch
+            start += batch_size
+
+    def tail(self, count):
+        """Return (index, *row) for the last `count` rows, oldest first."""
+        total = len(self)
+        return self.slice(total - count, total)
+
+    def refresh(self):
+        """Pick up rows other processes wrote; return a token that changes
+        whenever that altered the rows, so cached views can be dropped."""
+        return 0
+
+    @abstractmethod
+    def delete(self, index):
+        """Delete the row at `index`; return False if there is none."""
+
+    @abstractmethod
+    def clear(self):
+        """Delete every row."""
+
+    @abstractmethod
+    def __len__(self):
+        """Number of live rows."""
+
+
+class CsvHistoryStore(HistoryStore):
+    """History kept in an append-only CSV journal.
+
+    Several processes may share one journal: every read and write holds an
+    advisory lock on `<path>.lock` (where `fcntl` is available), and records
+    other processes appended since our last look are replayed first, so row
+    ids and tombstones stay consistent between them.
+    """
+    TOMBSTONE = "__deleted__"
+    _TOMBSTONE_RECORD = re.compile(rb"\n" + re.escape(TOMBSTONE.encode()) + rb",(\d+)")
+    SCAN_BLOCK = 1 << 16  # bytes read at a time when the journal is not loaded
+
+    def __init__(self, path):
+        self.path = path
+        self._rows = None  # live rows as CompactRows, once loaded
+        self._next_id = 0
+        self._tombstones = 0
+        self._header_checked = False
+        self._seen = None  # (inode, size) of the journal as last read or written
+        self.generation = 0  # bumped whenever _sync picks up rows written elsewhere
+        self.restored = False  # whether the rows came from a session snapshot
+        self._pending_state = None  # (digest, read_state) to try on first read
+        self._lock_file = None
+        self._lock_depth = 0
+
+    @property
+    def is_loaded(self):
+        """Whether the journal has been parsed into memory yet."""
+        return self._rows is not None
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold the journal's advisory lock; re-entrant within a process."""
+        if fcntl is None:
+            yield
+            return
+        if self._lock_file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._lock_file = open(self.path + ".lock", 'a', encoding='utf-8')
+        if self._lock_depth == 0:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _identity(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size
+
+    def load(self):
+        """Parse the journal into memory, replaying tombstones."""
+        with self._file_lock():
+            self._pending_state, self.restored = None, False
+            self._rows, self._next_id, self._tombstones = CompactRows(), 0, 0
+            if os.path.exists(self.path):
+                with open(self.path, newline='', encoding='utf-8') as f:
+                    reader = csv.reader(f)
+                    header = next(reader, None)
+                    self._header_checked = header == COLUMNS
+                    self._replay(reader)
+            self._seen = self._identity()
+
+    def _replay(self, records):
+        """Apply journal records to the in-memory rows."""
+        deleted = set()
+        for record in records:
+            if not record:
+                continue
+            if record[0] == self.TOMBSTONE:
+                deleted.add(int(record[1]))
+                continue
+            self._rows.append(self._next_id, *self._fields(record))
+            self._next_id += 1
+        if deleted:
+            self._rows.remove_ids(deleted)
+            self._tombstones += len(deleted)
+
+    @staticmethod
+    def _fields(record):
+        """(operation, operands, result, timestamp) of a parsed row record."""
+        operation, operands, result, timestamp = (record + ["", "", ""])[:4]
+        return operation, operands, _parse_result(result), timestamp
+
+    def _open_scanned(self):
+        """Open the journal for a read that does not load it.
+
+        Returns (file, size, row_count, deleted), or None if there is no
+        journal: the open binary file, its size when scanned (later reads
+        stop there, so appends made meanwhile are ignored), the number of
+        row records and the row ids tombstones delete. The scan reads the
+        file once in fixed-size blocks and parses nothing: it tracks the
+        quote parity so that newlines inside quoted fields (multi-line
+        results) are not taken for record boundaries.
+        """
+        with self._file_lock():
+            try:
+                f = open(self.path, 'rb')
+            except FileNotFoundError:
+                return None
+            records, tombstones, deleted, quoted = 0, 0, set(), False
+            size = 0
+            while True:
+                block = f.read(self.SCAN_BLOCK)
+                if not block:
+                    break
+                block += f.readline()
+                size += len(block)
+                parts = block.split(b'"')
+                outside = parts[quoted::2]  # the parts not inside a quoted field
+                if not quoted:
+                    outside[0] = b"\n" + outside[0]  # a block starts a record
+                    records -= 1
+                for part in outside:
+                    records += part.count(b"\n")
+                    for match in self._TOMBSTONE_RECORD.finditer(part):
+                        tombstones += 1
+                        deleted.add(int(match.group(1)))
+                quoted ^= len(parts) % 2 == 0
+        if size:
+            records -= 1  # the header
+            f.seek(-1, os.SEEK_CUR)
+            if f.read(1) != b"\n":
+                records += 1  # a last record without its newline
+        return f, size, records - tombstones, deleted
+
+    def _parsed_records(self, f, size):
+        """Parse the records in the first `size` bytes of `f`, header skipped."""
+        def lines():
+            remaining = size
+            for line in f:
+                remaining -= len(line)
+                if remaining < 0:
+                    return
+                yield line.decode('utf-8')
+        f.seek(0)
+        reader = csv.reader(lines())
+        next(reader, None)
+        return reader
+
+    def _live_rows(self, f, size, deleted):
+        """Yield (index, *row) for every live row, reading forwards."""
+        index = row_id = 0
+        for record in self._parsed_records(f, size):
+            if not record or record[0] == self.TOMBSTONE:
+                continue
+            if row_id not in deleted:
+                yield (index, *self._fields(record))
+                index += 1
+            row_id += 1
+
+    def _last_rows(self, f, size, row_count, deleted, count):
+        """The last `count` live rows as (index, *row), reading backwards
+        from the end in blocks that double until they hold enough rows."""
+        live = row_count - len(deleted)
+        block = self.SCAN_BLOCK
+        while True:
+            start = max(size - block, 0)
+            f.seek(start)
+            data = f.read(size - start)
+            if start:
+                data = data[self._record_start(data):]
+                records = csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+            else:
+                records = self._parsed_records(f, size)
+            picked, row_id = [], row_count
+            for record in reversed(list(records)):
+                if not record or record[0] == self.TOMBSTONE:
+                    continue
+                row_id -= 1
+                if row_id not in deleted:
+                    picked.append(self._fields(record))
+                    if len(picked) == count:
+                        break
+            if len(picked) == count or not start:
+                picked.reverse()
+                return [(live - len(picked) + i, *row) for i, row in enumerate(picked)]
+            block *= 2
+
+    @staticmethod
+    def _record_start(data):
+        """Offset of the first record boundary in `data`, a block that ends
+        at a record boundary: a newline followed by an even number of
+        quotes. len(data) if there is none."""
+        quotes = data.count(b'"')
+        position = data.find(b"\n")
+        while position >= 0:
+            if (quotes - data.count(b'"', 0, position)) % 2 == 0:
+                return position + 1
+            position = data.find(b"\n", position + 1)
+        return len(data)
+
+    def _use_journal_lines(self):
+        """Whether reads should scan the journal rather than load it: only
+        while nothing is in memory and no snapshot is waiting to be used."""
+        return self._rows is None and self._pending_state is None
+
+    def _sync(self):
+        """Pick up changes other processes made since we last read or wrote."""
+        if self._rows is None:
+            return
+        identity = self._identity()
+        if identity == self._seen:
+            return
+        if identity is None or self._seen is None or identity[0] != self._seen[0] \
+                or identity[1] < self._seen[1]:
+            self.load()  # replaced by a compaction elsewhere
+            self.generation += 1
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._seen[1])
+            tail = f.read().decode('utf-8')
+        self._replay(csv.reader(io.StringIO(tail, newline='')))
+        self._seen = identity
+        self.generation += 1
+
+    def refresh(self):
+        if self._rows is not None:
+            with self._file_lock():
+                self._sync()
+        return self.generation
+
+    def _ensure_loaded(self):
+        with self._file_lock():
+            if self._rows is None:
+                if not self._restore_pending():
+                    self.load()
+            else:
+                self._sync()
+
+    def _ensure_current_header(self):
+        """Rewrite journals written before the Timestamp column existed."""
+        if self._header_checked:
+            return
+        if os.path.exists(self.path):
+            with open(self.path, newline='', encoding='utf-8') as f:
+                header = next(csv.reader(f), None)
+            if header is not None and header != COLUMNS:
+                self.compact()
+        self._header_checked = True
+
+    def _append_records(self, records):
+        """Append raw records to the journal, writing the header if needed."""
+        with self._file_lock():
+            self._sync()
+            self._ensure_current_header()
+            new_file = not os.path.exists(self.path)
+            if new_file:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(COLUMNS)
+                writer.writerows(records)
+            if self._rows is not None:
+                self._seen = self._identity()
+
+    def append(self, records):
+        with self._file_lock():
+            self._append_records(records)
+            if self._rows is not None:
+                for record in records:
+                    self._rows.append(self._next_id, *record)
+                    self._next_id += 1
+
+    def rows(self):
+        self._ensure_loaded()
+        return self._rows.rows()
+
+    def query(self, operation=None, since=None, limit=None):
+        self._ensure_loaded()
+        positions = self._rows.find(operation, since)
+        if limit:
+            positions = positions[-limit:]
+        return [(position, *self._rows.row(position)) for position in positions]
+
+    def slice(self, start, stop):
+        start = max(start, 0)
+        if self._use_journal_lines():
+            journal = self._open_scanned()
+            if journal is None:
+                return []
+            f, size, _, deleted = journal
+            with f:
+                return list(itertools.islice(self._live_rows(f, size, deleted), start, stop))
+        self._ensure_loaded()
+        return [
+            (index, *row)
+            for index, row in enumerate(self._rows.rows(start, stop), start)
+        ]
+
+    def tail(self, count):
+        if self._use_journal_lines():
+            journal = self._open_scanned()
+            if journal is None:
+                return []
+            f, size, row_count, deleted = journal
+            with f:
+                return self._last_rows(f, size, row_count, deleted, count)
+        return super().tail(count)
+
+    def iter_rows(self, batch_size):
+        if not self._use_journal_lines():
+            yield from super().iter_rows(batch_size)
+            return
+        journal = self._open_scanned()
+        if journal is None:
+            return
+        f, size, _, deleted = journal
+        with f:
+            rows = self._live_rows(f, size, deleted)
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    return
+                yield batch
+
+    def delete(self, index):
+        with self._file_lock():
+            self._ensure_loaded()
+            if index < 0 or index >= len(self._rows):
+                return False  # Entry does not exist
+            row_id = self._rows.pop(index)
+            self._append_records([(self.TOMBSTONE, row_id, "", "")])
+            self._tombstones += 1
+            if self._tombstones > len(self._rows):
+                self.compact()
+            return True
+
+    def clear(self):
+        with self._file_lock():
+            self._rows, self._seen = CompactRows(), self._identity()
+            self._pending_state = None
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal with only the live rows, dropping tombstones."""
+        with self._file_lock():
+            self._ensure_loaded()
+            tmp_path = self.path + ".tmp"
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                writer.writerows(self._rows.rows())
+            os.replace(tmp_path, self.path)
+            self._rows.renumber()
+            self._next_id = len(self._rows)
+            self._tombstones = 0
+            self._header_checked = True
+            self._seen = self._identity()
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._rows)
+
+    def export_state(self):
+        """The parsed journal and the digest of the file it was parsed from."""
+        with self._file_lock():
+            self._ensure_loaded()
+            return {
+                'digest': file_digest(self.path),
+                'rows': self._rows,
+                'next_id': self._next_id,
+                'tombstones': self._tombstones,
+                'header_checked': self._header_checked,
+            }
+
+    def restore_state(self, digest, read_state):
+        """Use an exported state for the first read if the journal still
+        has `digest` then.
+
+        Nothing is read or hashed here: `read_state()` is only called on
+        first read, and only once the journal's size, then its hash, match.
+        """
+        self._pending_state = (digest, read_state)
+
+    def _restore_pending(self):
+        """Adopt the pending exported state; returns whether it was used."""
+        if self._pending_state is None:
+            return False
+        digest, read_state = self._pending_state
+        self._pending_state = None
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = None
+        if size != digest[0] or file_digest(self.path) != digest:
+            return False
+        state = read_state()
+        if not state or state.get('digest') != digest:
+            return False
+        self._rows = state['rows']
+        self._next_id = state['next_id']
+        self._tombstones = state['tombstones']
+        self._header_checked = state['header_checked']
+        self._seen = self._identity()
+        self.restored = True
+        return True
+
+
+class SqliteHistoryStore(HistoryStore):
+    """History kept in an indexed SQLite database."""
+
+    def __init__(self, path):
+        import sqlite3
+
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                " id INTEGER PRIMARY KEY,"
+                " operation TEXT NOT NULL,"
+                " operands TEXT NOT NULL,"
+                " result,"
+                " timestamp TEXT NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_operation"
+                " ON history (operation, id)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_timestamp"
+                " ON history (timestamp)"
+            )
+
+    def append(self, records):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO history (operation, operands, result, timestamp)"
+                " VALUES (?, ?, ?, ?)",
+                records,
+            )
+
+    def rows(self):
+        return self.connection.execute(
+            "SELECT operation, operands, result, timestamp"
+            " FROM history ORDER BY id"
+        ).fetchall()
+
+    def query(self, operation=None, since=None, limit=None):
+        clauses, params = [], []
+        if operation is not None:
+            clauses.append("operation = ?")
+            params.append(operation)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        sql = "SELECT id, operation, operands, result, timestamp FROM history"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        matches = self.connection.execute(sql, params).fetchall()
+        matches.reverse()
+        positions = self._positions([row[0] for row in matches])
+        return [(position, *row[1:]) for position, row in zip(positions, matches)]
+
+    def slice(self, start, stop):
+        start = max(start, 0)
+        if stop <= start:
+            return []
+        matches = self.connection.execute(
+            "SELECT operation, operands, result, timestamp FROM history"
+            " ORDER BY id LIMIT ? OFFSET ?",
+            (stop - start, start),
+        ).fetchall()
+        return [(index, *row) for index, row in enumerate(matches, start)]
+
+    def iter_rows(self, batch_size):
+        cursor = self.connection.execute(
+            "SELECT operation, operands, result, timestamp"
+            " FROM history ORDER BY id"
+        )
+        index = 0
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield [(i, *row) for i, row in enumerate(batch, index)]
+            index += len(batch)
+
+    def _positions(self, row_ids):
+        """Indexes of rows given by ascending ids, i.e. how many rows were
+        saved before each.
+
+        One count up to the first id and one scan of the primary key from
+        the first id to the last, however many rows match.
+        """
+        if not row_ids:
+            return []
+        first, last = row_ids[0], row_ids[-1]
+        base = self.connection.execute(
+            "SELECT COUNT(*) FROM history WHERE id < ?", (first,)
+        ).fetchone()[0]
+        cursor = self.connection.execute(
+            "SELECT id FROM history WHERE id BETWEEN ? AND ? ORDER BY id", (first, last)
+        )
+        positions = []
+        wanted = iter(row_ids)
+        target = next(wanted)
+        for offset, (row_id,) in enumerate(cursor, base):
+            if row_id == target:
+                positions.append(offset)
+                target = next(wanted, None)
+                if target is None:
+                    break
+        return positions
+
+    def refresh(self):
+        # data_version changes when another connection commits, never for ours
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def delete(self, index):
+        if index < 0:
+            return False
+        row = self.connection.execute(
+            "SELECT id FROM history ORDER BY id LIMIT 1 OFFSET ?", (index,)
+        ).fetchone()
+        if row is None:
+            return False
+        with self.connection:
+            self.connection.execute("DELETE FROM history WHERE id = ?", row)
+        return True
+
+    def clear(self):
+        with self.connection:
+            self.connection.execute("DELETE FROM history")
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
 
 class HistoryManager:
-    """Manages the history of calculations using Pandas."""
+    """Manages the history of calculations using Pandas.
+
+    Store access is serialized with `lock`, so the manager can be shared
+    with background writer threads.
+    """
     HISTORY_FILE = "data/history.csv"
+    HISTORY_DB = "data/history.db"
+    BACKENDS = ('csv', 'sqlite')
+
+    def __init__(self, backend=None, durability=None, flush_interval_ms=None):
+        backend = (backend or os.environ.get('HISTORY_BACKEND') or 'csv').lower()
+        if backend not in self.BACKENDS:
+            raise ValueError(
+                f"Unknown history backend: {backend}. Choose from {self.BACKENDS}."
+            )
+        self.backend = backend
+        if backend == 'sqlite':
+            self.store = SqliteHistoryStore(self.HISTORY_DB)
+        else:
+            self.store = CsvHistoryStore(self.HISTORY_FILE)
+        self._frame = None
+        self.version = 0  # bumped on every write so views can be cached
+        self._store_token = self.store.refresh()  # as of the last refresh()
+        self.lock = threading.RLock()
+        self.write_latency = LatencyHistogram()  # one observation per store write
+        self.writer = None
+        durability = (durability or os.environ.get('HISTORY_DURABILITY') or 'always').lower()
+        if durability != 'always':
+            from app.history_writer import HistoryWriter
+            interval = flush_interval_ms or float(os.environ.get('HISTORY_FLUSH_MS', 100))
+            self.writer = HistoryWriter(self._write_records, durability, interval)
+
+    @property
+    def history(self):
+        """The history as a DataFrame, loaded on first access."""
+        return self.get_history()
+
+    @property
+    def is_loaded(self):
+        """Whether the history has been read into memory yet."""
+        return getattr(self.store, 'is_loaded', True)
+
+    @property
+    def restored(self):
+        """Whether the history was read from a session snapshot."""
+        return getattr(self.store, 'restored', False)
+
+    def _changed(self):
+        self._frame = None
+        self.version += 1
 
-    def __init__(self):
-        self.history = self.load_history()
+    def refresh(self):
+        """Pick up writes from other processes; returns the current version.
+
+        Views cached against `version` must call this before serving the
+        cache, since rows another process appends do not go through us.
+        """
+        self.flush()
+        with self.lock:
+            token = self.store.refresh()
+            if token != self._store_token:
+                self._store_token = token
+                self._changed()
+            return self.version
+
+    def flush(self):
+        """Write any records the background writer still has queued."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        """Flush queued records and stop the background writer."""
+        if self.writer is not None:
+            self.writer.close()
 
     def load_history(self):
-        """Load history from CSV file or create an empty dataframe."""
-        if os.path.exists(self.HISTORY_FILE):
-            return pd.read_csv(self.HISTORY_FILE)
-        return pd.DataFrame(columns=["Operation", "Operands", "Result"])
+        """(Re)load the history from its store and return it."""
+        self.flush()
+        with self.lock:
+            if hasattr(self.store, 'load'):
+                self.store.load()
+            self._changed()
+            return self.get_history()
 
     def save_operation(self, operation, operands, result):
         """Save a calculation to history."""
-        new_entry = pd.DataFrame([{
-            "Operation": operation,
-            "Operands": " ".join(map(str, operands)),
-            "Result": result
-        }])
-        self.history = pd.concat([self.history, new_entry], ignore_index=True)
-        self.history.to_csv(self.HISTORY_FILE, index=False)
+        self.save_operations([(operation, operands, result)])
+
+    def save_operations(self, operations):
+        """Save several calculations with a single write to the store."""
+        timestamp = datetime.now().isoformat(timespec='seconds')
+        records = [
+            (operation, " ".join(map(str, operands)), result, timestamp)
+            for operation, operands, result in operations
+        ]
+        if not records:
+            return
+        if self.writer is None:
+            self._write_records(records)
+            return
+        self.writer.submit(records)
+        with self.lock:
+            self._changed()
+
+    def _write_records(self, records):
+        started = time.perf_counter()
+        with self.lock:
+            self.store.append(records)
+            self._changed()
+            self.write_latency.observe(time.perf_counter() - started)
 
     def get_history(self):
         """Return the history as a DataFrame."""
-        return self.history
+        self.refresh()
+        with self.lock:
+            if self._frame is None:
+                import pandas as pd
+                self._frame = pd.DataFrame(self.store.rows(), columns=COLUMNS)
+            return self._frame
+
+    @staticmethod
+    def _frame_from(matches):
+        import pandas as pd
+        return pd.DataFrame(
+            [row[1:] for row in matches],
+            columns=COLUMNS,
+            index=[row[0] for row in matches],
+        )
+
+    def page(self, number, size):
+        """Return page `number` (1-based) of `size` entries as a DataFrame."""
+        return self._frame_from(self.page_rows(number, size))
+
+    def page_rows(self, number, size):
+        """Return page `number` (1-based) as a list of (index, *row) tuples."""
+        if number < 1 or size < 1:
+            raise ValueError("Page and page size must be positive numbers.")
+        start = (number - 1) * size
+        self.flush()
+        with self.lock:
+            return self.store.slice(start, start + size)
+
+    def tail(self, count):
+        """Return the last `count` entries as a DataFrame."""
+        if count < 1:
+            raise ValueError("Tail must be a positive number.")
+        self.flush()
+        with self.lock:
+            matches = self.store.tail(count)
+        return self._frame_from(matches)
+
+    def iter_rows(self, batch_size=500):
+        """Yield the history as lists of (index, *row), one batch at a time."""
+        self.flush()
+        return self.store.iter_rows(batch_size)
+
+    def query(self, operation=None, since=None, limit=None):
+        """Return matching entries as a DataFrame indexed by history position.
+
+        Args:
+            operation (str): Only entries for this command.
+            since (str): Only entries at or after this ISO date/datetime.
+            limit (int): Only the most recent `limit` matches.
+        """
+        if since is not None:
+            since = normalize_timestamp(since)
+        if limit is not None and limit <= 0:
+            raise ValueError("Limit must be a positive number.")
+        self.flush()
+        with self.lock:
+            matches = self.store.query(operation, since, limit)
+        return self._frame_from(matches)
+
+    def export_history(self, path, fmt=None):
+        """Write the history to a Parquet or Arrow file; returns the row count."""
+        from app import history_export
+        fmt = history_export.format_for(path, fmt)
+        self.flush()
+        with self.lock:
+            rows = self.store.rows()
+        history_export.write_table(history_export.to_table(rows), path, fmt)
+        return len(rows)
+
+    @staticmethod
+    def read_export(path, fmt=None):
+        """Load an exported history as a (memory-mapped) Arrow table."""
+        from app import history_export
+        return history_export.read_table(path, fmt)
 
     def clear_history(self):
         """Clear calculation history."""
-        self.history = pd.DataFrame(columns=["Operation", "Operands", "Result"])
-        self.history.to_csv(self.HISTORY_FILE, index=False)
+        self.flush()
+        with self.lock:
+            self.store.clear()
+            self._changed()
 
     def delete_history_entry(self, index):
         """Delete a specific history entry by index."""
-        if index < 0 or index >= len(self.history):
-            return False  # Entry does not exist
-        self.history = self.history.drop(index).reset_index(drop=True)
-        self.history.to_csv(self.HISTORY_FILE, index=False)
-        return True
+        self.flush()
+        with self.lock:
+            if not self.store.delete(index):
+                return False  # Entry does not exist
+            self._changed()
+            return True
+
+    def compact(self):
+        """Compact the store if it supports it (the CSV journal does)."""
+        if hasattr(self.store, 'compact'):
+            self.flush()
+            with self.lock:
+                self.store.compact()
+                self._changed()
+
+    def export_state(self):
+        """The loaded history for a session snapshot, or None if the store
+        has nothing worth keeping (SQLite needs no parsing, and a journal
+        that was never read needs no snapshot)."""
+        if not hasattr(self.store, 'export_state') or not self.is_loaded:
+            return None
+        self.flush()
+        with self.lock:
+            return self.store.export_state()
+
+    def restore_state(self, digest, read_state):
+        """Restore a history exported by `export_state` on first read, if
+        the journal still has `digest`; `read_state()` returns the state."""
+        if digest is None or not hasattr(self.store, 'restore_state'):
+            return
+        with self.lock:
+            self.store.restore_state(digest, read_state)
+
+    def count(self):
+        """Number of entries in the history."""
+        self.flush()
+        with self.lock:
+            return len(self.store)
@@ -0,0 +1,238 @@
+"""
+history_rows.py
+
+This module defines `CompactRows`, the in-memory form of the CSV history
+journal. Rather than one tuple of Python objects per entry, the history
+is kept column by column in flat arrays:
+
+- operation names and timestamps are interned: each distinct string is
+  stored once and rows hold a small integer code (`array('I')`);
+- numeric results live in an `array('d')`; the rare result that is not a
+  number is kept in a side table keyed by row id;
+- operands are packed, UTF-8 encoded, into one `bytearray`, with an
+  `array('q')` of offsets marking where each row's operands start;
+- row ids (the journal's record numbers, used by tombstones) are an
+  `array('q')`.
+
+Appending is amortized O(1) and a row costs a few dozen bytes however many
+rows there are. Rows are materialized as tuples, or as `HistoryRecord`
+views, only when they are read.
+
+Classes:
+    - HistoryRecord: A read-only view of one row.
+    - CompactRows: Column-wise storage of history rows.
+"""
+
+from array import array
+
+EXACT_INTS = 2 ** 53  # larger ints would lose digits as floats
+
+
+class _Interner:
+    """Maps strings to small integer codes and back."""
+    __slots__ = ('codes', 'values')
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        """The code for `value`, assigning a new one if needed."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class HistoryRecord:
+    """A read-only view of one row of `CompactRows`.
+
+    Its fields are read from the arrays on access, so a view costs the same
+    whatever the size of the row.
+    """
+    __slots__ = ('_rows', 'position')
+
+    def __init__(self, rows, position):
+        self._rows = rows
+        self.position = position
+
+    @property
+    def operation(self):
+        """Name of the command."""
+        return self._rows.operation_at(self.position)
+
+    @property
+    def operands(self):
+        """Operands as saved, separated by spaces."""
+        return self._rows.operands_at(self.position)
+
+    @property
+    def result(self):
+        """Result: a float, or whatever non-numeric value was saved."""
+        return self._rows.result_at(self.position)
+
+    @property
+    def timestamp(self):
+        """When the entry was saved, in ISO 8601 form."""
+        return self._rows.timestamp_at(self.position)
+
+    def astuple(self):
+        """The row as an (operation, operands, result, timestamp) tuple."""
+        return self._rows.row(self.position)
+
+    def __repr__(self):
+        return f"HistoryRecord({self.position}, {self.astuple()!r})"
+
+
+class CompactRows:
+    """History rows stored column-wise in arrays, oldest first."""
+
+    def __init__(self):
+        self._ids = array('q')
+        self._operations = _Interner()
+        self._operation_codes = array('I')
+        self._results = array('d')
+        self._other_results = {}  # row id -> result that is not a number
+        self._operands = bytearray()
+        self._offsets = array('q', [0])  # row i's operands: offsets[i]:offsets[i + 1]
+        self._timestamps = _Interner()
+        self._timestamp_codes = array('I')
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, position):
+        if not -len(self) <= position < len(self):
+            raise IndexError("history row out of range")
+        return HistoryRecord(self, position % len(self))
+
+    def __iter__(self):
+        return (HistoryRecord(self, position) for position in range(len(self)))
+
+    def append(self, row_id, operation, operands, result, timestamp):
+        """Add a row at the end."""
+        self._ids.append(row_id)
+        self._operation_codes.append(self._operations.code(operation))
+        if isinstance(result, float) or (type(result) is int and abs(result) <= EXACT_INTS):
+            self._results.append(result)
+        else:
+            self._results.append(0.0)
+            self._other_results[row_id] = result
+        self._operands += str(operands).encode('utf-8')
+        self._offsets.append(len(self._operands))
+        self._timestamp_codes.append(self._timestamps.code(timestamp))
+
+    def row_id(self, position):
+        """Journal record number of the row at `position`."""
+        return self._ids[position]
+
+    def operation_at(self, position):
+        """Operation of the row at `position`."""
+        return self._operations.values[self._operation_codes[position]]
+
+    def operands_at(self, position):
+        """Operands of the row at `position`."""
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return self._operands[start:end].decode('utf-8')
+
+    def result_at(self, position):
+        """Result of the row at `position`."""
+        row_id = self._ids[position]
+        if row_id in self._other_results:
+            return self._other_results[row_id]
+        return self._results[position]
+
+    def timestamp_at(self, position):
+        """Timestamp of the row at `position`."""
+        return self._timestamps.values[self._timestamp_codes[position]]
+
+    def row(self, position):
+        """The row at `position` as an (operation, operands, result, timestamp) tuple."""
+        return (self.operation_at(position), self.operands_at(position),
+                self.result_at(position), self.timestamp_at(position))
+
+    def rows(self, start=0, stop=None):
+        """Rows start..stop-1 as tuples."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        operations, operation_codes = self._operations.values, self._operation_codes
+        timestamps, timestamp_codes = self._timestamps.values, self._timestamp_codes
+        operands, offsets, results = self._operands, self._offsets, self._results
+        rows = [
+            (operations[operation_codes[position]],
+             operands[offsets[position]:offsets[position + 1]].decode('utf-8'),
+             results[position],
+             timestamps[timestamp_codes[position]])
+            for position in range(start, stop)
+        ]
+        if self._other_results:
+            for position in range(start, stop):
+                row_id = self._ids[position]
+                if row_id in self._other_results:
+                    row = rows[position - start]
+                    rows[position - start] = row[:2] + (self._other_results[row_id], row[3])
+        return rows
+
+    def find(self, operation=None, since=None):
+        """Positions of rows for `operation` saved at or after `since`."""
+        positions = range(len(self))
+        if operation is not None:
+            code = self._operations.codes.get(operation)
+            if code is None:
+                return []
+            codes = self._operation_codes
+            positions = [position for position in positions if codes[position] == code]
+        if since is not None:
+            # Compare each distinct timestamp once, not once per row.
+            recent = {code for code, value in enumerate(self._timestamps.values)
+                      if value >= since}
+            codes = self._timestamp_codes
+            positions = [position for position in positions if codes[position] in recent]
+        return list(positions)
+
+    def pop(self, position):
+        """Remove the row at `position`; returns its row id."""
+        row_id = self._ids.pop(position)
+        del self._operation_codes[position]
+        del self._results[position]
+        self._other_results.pop(row_id, None)
+        start, end = self._offsets[position], self._offsets[position + 1]
+        del self._operands[start:end]
+        del self._offsets[position + 1]
+        width = end - start
+        if width:
+            tail = self._offsets[position + 1:]
+            self._offsets[position + 1:] = array('q', [offset - width for offset in tail])
+        del self._timestamp_codes[position]
+        return row_id
+
+    def remove_ids(self, row_ids):
+        """Remove every row whose id is in `row_ids`, in one pass."""
+        kept = [position for position, row_id in enumerate(self._ids) if row_id not in row_ids]
+        if len(kept) == len(self):
+            return
+        ids, operation_codes = self._ids, self._operation_codes
+        results, timestamp_codes = self._results, self._timestamp_codes
+        operands, offsets = self._operands, self._offsets
+        self._ids = array('q', [ids[position] for position in kept])
+        self._operation_codes = array('I', [operation_codes[position] for position in kept])
+        self._results = array('d', [results[position] for position in kept])
+        self._timestamp_codes = array('I', [timestamp_codes[position] for position in kept])
+        self._operands = bytearray()
+        self._offsets = array('q', [0])
+        for position in kept:
+            self._operands += operands[offsets[position]:offsets[position + 1]]
+            self._offsets.append(len(self._operands))
+        self._other_results = {
+            row_id: value for row_id, value in self._other_results.items()
+            if row_id not in row_ids
+        }
+
+    def renumber(self):
+        """Give the rows ids 0..n-1, as after the journal is compacted."""
+        other = {
+            position: self._other_results[row_id]
+            for position, row_id in enumerate(self._ids) if row_id in self._other_results
+        }
+        self._ids = array('q', range(len(self)))
+        self._other_results = other
@@ -0,0 +1,101 @@
+"""
+history_writer.py
+
+This module defines the `HistoryWriter`, which takes history writes off the
+command path: records are queued in memory and a background thread commits
+them to the store in groups, one write per group.
+
+Durability policies (HISTORY_DURABILITY):
+    - always: no writer; every save is written before the command returns.
+    - interval: queued records are written every HISTORY_FLUSH_MS
+      milliseconds (100 by default).
+    - exit: queued records are only written when the application exits, or
+      when `max_pending` of them have piled up.
+
+Whatever the policy, `flush()` writes everything queued so far, and
+`close()` (also registered with `atexit`) flushes and stops the thread.
+Records are written in the order they were queued; if a background write
+fails they are kept and retried on the next flush.
+"""
+
+import atexit
+import logging
+import threading
+
+
+class HistoryWriter:
+    """Queues history records and commits them in groups."""
+    POLICIES = ('always', 'interval', 'exit')
+
+    def __init__(self, write, policy='interval', interval_ms=100, max_pending=10000):
+        if policy not in ('interval', 'exit'):
+            raise ValueError(
+                f"Unknown durability policy: {policy}. Choose from {self.POLICIES}."
+            )
+        self.write = write
+        self.policy = policy
+        self.interval = interval_ms / 1000 if policy == 'interval' else None
+        self.max_pending = max_pending
+        self.flushes = 0
+        self._pending = []
+        self._closed = False
+        self._wakeup = threading.Condition()
+        self._flush_lock = threading.Lock()  # keeps groups in queue order
+        self._thread = threading.Thread(
+            target=self._run, name='history-writer', daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def pending(self):
+        """Number of records waiting to be written."""
+        return len(self._pending)
+
+    def submit(self, records):
+        """Queue records for the next group commit."""
+        with self._wakeup:
+            if self._closed:
+                raise ValueError("History writer is closed.")
+            self._pending.extend(records)
+            if len(self._pending) >= self.max_pending:
+                self._wakeup.notify()
+
+    def flush(self):
+        """Write every queued record now, on the calling thread."""
+        with self._flush_lock:
+            with self._wakeup:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                self.write(batch)
+            except Exception:
+                with self._wakeup:
+                    self._pending[:0] = batch
+                raise
+            self.flushes += 1
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                if not self._closed:
+                    self._wakeup.wait(self.interval)
+                closed = self._closed
+            try:
+                self.flush()
+            except OSError as e:
+                logging.error("Could not save %d history records: %s", self.pending, e)
+            if closed:
+                return
+
+    def close(self):
+        """Flush queued records and stop the writer thread."""
+        with self._wakeup:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
@@ -0,0 +1,143 @@
+"""
+http_api.py
+
+This module exposes an `App` over a small JSON HTTP API built on the
+standard library's `http.server`, for tools that would rather speak HTTP
+than the line protocol of `app.server`.
+
+Endpoints:
+    - POST /execute: `{"command": "add", "args": [1, 2]}` is answered with
+      `{"ok": true, "result": 3.0}`, or `{"ok": false, "error": "..."}`
+      and status 400 on failure.
+    - POST /batch: a JSON array of such objects is answered with
+      `{"results": [...]}`, one response per item in order. Every item is
+      run first and their history records are then saved with a single
+      write, so a batch costs one history write however long it is.
+    - GET /history?page=<k>&size=<n>: one page of the history as
+      `{"page": k, "size": n, "total": ..., "entries": [...]}`.
+    - GET /metrics: the Prometheus metrics from `app.metrics_exporter`.
+
+Connections are kept alive (HTTP/1.1) and each one is served on its own
+thread; commands themselves run one at a time under a lock because the
+command handler and its result cache are not thread-safe.
+"""
+
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from app import Session
+from app.history_manager import COLUMNS
+from app.metrics_exporter import send_metrics
+
+
+class CalculatorRequestHandler(BaseHTTPRequestHandler):
+    """Routes HTTP requests to the server's `App`."""
+    protocol_version = "HTTP/1.1"
+    MAX_BODY = 10 * 1024 * 1024
+    PAGE_SIZE = 20
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Handle /execute and /batch."""
+        route = urlsplit(self.path).path
+        if route not in ('/execute', '/batch'):
+            self._send(404, {'ok': False, 'error': f"Not found: {route}"})
+            return
+        try:
+            body = self._read_json()
+        except ValueError as e:
+            self._send(400, {'ok': False, 'error': str(e)})
+            return
+        if route == '/execute':
+            response = self.server.execute([body])[0]
+            self._send(200 if response['ok'] else 400, response)
+        elif not isinstance(body, list):
+            self._send(400, {'ok': False, 'error': "Batch must be a JSON array."})
+        else:
+            self._send(200, {'results': self.server.execute(body)})
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle /history and /metrics."""
+        url = urlsplit(self.path)
+        if url.path == '/metrics':
+            send_metrics(self, self.server.app)
+            return
+        if url.path != '/history':
+            self._send(404, {'ok': False, 'error': f"Not found: {url.path}"})
+            return
+        query = parse_qs(url.query)
+        try:
+            number = int(query.get('page', ['1'])[0])
+            size = int(query.get('size', [str(self.PAGE_SIZE)])[0])
+            history_manager = self.server.app.history_manager
+            rows = history_manager.page_rows(number, size)
+            total = history_manager.count()
+        except ValueError as e:
+            self._send(400, {'ok': False, 'error': str(e)})
+            return
+        self._send(200, {
+            'page': number,
+            'size': size,
+            'total': total,
+            'entries': [
+                dict(zip(('Index',) + tuple(COLUMNS), row)) for row in rows
+            ],
+        })
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > self.MAX_BODY:
+            raise ValueError("Request body too large.")
+        try:
+            return json.loads(self.rfile.read(length) or b'null')
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logging.debug("HTTP %s - %s", self.address_string(), format % args)
+
+
+class CalculatorHTTPServer(ThreadingHTTPServer):
+    """A threaded HTTP server bound to one `App`."""
+    daemon_threads = True
+
+    def __init__(self, app, address=('127.0.0.1', 8080)):
+        super().__init__(address, CalculatorRequestHandler)
+        self.app = app
+        self.requests = 0
+        self._command_lock = threading.Lock()
+
+    def execute(self, requests):
+        """Run each request, then save all of their history records at once."""
+        pending, session = [], Session()  # `ans` only spans one HTTP request
+        with self._command_lock:
+            self.requests += len(requests)
+            responses = [
+                self.app.execute_request(request, pending, session) for request in requests
+            ]
+        if pending:
+            try:
+                self.app.commit_history(pending)
+            except OSError as e:
+                logging.error("Could not save %d history records: %s", len(pending), e)
+        return responses
+
+
+def serve_http(app, host='127.0.0.1', port=8080):
+    """Run a `CalculatorHTTPServer` until interrupted."""
+    with CalculatorHTTPServer(app, (host, port)) as server:
+        logging.info("HTTP API listening on %s", server.server_address[:2])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("HTTP API interrupted after %d requests.", server.requests)
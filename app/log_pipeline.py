@@ -0,0 +1,215 @@
+"""
+log_pipeline.py
+
+This module moves log output off the command path. With queue logging
+installed, the root logger's handlers (console, `logs/app.log`, ...) are
+replaced by a single `QueueHandler`: logging a record only appends it to a
+bounded in-memory queue, and a listener thread hands the records to the
+real handlers in batches, flushing each handler once per batch instead of
+once per record.
+
+Two filters keep high-volume loggers in check before anything is queued:
+    - RateLimitFilter: a token bucket per logger name (records per second
+      plus a burst allowance).
+    - SamplingFilter: keeps one record in every N per logger name.
+Warnings and errors always pass both, and when the queue is full records
+are dropped rather than blocking the caller; the number of records dropped
+for any of these reasons is logged when the pipeline stops.
+
+Functions:
+    - install_queue_logging: Put the root logger's handlers behind a queue.
+    - uninstall_queue_logging: Stop the listener and restore the handlers.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+
+class RateLimitFilter(logging.Filter):
+    """Passes at most `rate` records per second per logger, plus a burst."""
+
+    def __init__(self, rate, burst=None, always_level=logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst or rate
+        self.always_level = always_level
+        self.dropped = 0
+        self._buckets = {}  # logger name -> [tokens, last refill]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= self.always_level:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(record.name, [self.burst, now])
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                self.dropped += 1
+                return False
+            bucket[0] = tokens - 1
+            return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps one record in every `every`, counted per logger.
+
+    Only loggers named in `loggers` (or their children) are sampled; with
+    no names given every logger is.
+    """
+
+    def __init__(self, every, loggers=None, always_level=logging.WARNING):
+        super().__init__()
+        self.every = max(1, every)
+        self.loggers = tuple(loggers or ())
+        self.always_level = always_level
+        self.dropped = 0
+        self._seen = {}
+
+    def _sampled(self, name):
+        return not self.loggers or any(
+            name == prefix or name.startswith(prefix + ".") for prefix in self.loggers
+        )
+
+    def filter(self, record):
+        if record.levelno >= self.always_level or not self._sampled(record.name):
+            return True
+        seen = self._seen.get(record.name, 0)
+        self._seen[record.name] = seen + 1
+        if seen % self.every:
+            self.dropped += 1
+            return False
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """A QueueHandler that never blocks and formats as little as it can.
+
+    The listener runs in the same process, so records are queued as they
+    are and handler formatting (timestamps, layout) happens on the listener
+    thread. Only the message and exception text are rendered up front: the
+    arguments may change after the call returns, and queued records should
+    not keep frames alive.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _no_flush():
+    pass
+
+
+class BatchingQueueListener(QueueListener):
+    """Drains the queue in batches and flushes each handler once per batch."""
+
+    def __init__(self, log_queue, *handlers, batch_size=500):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.batches = 0
+
+    def _monitor(self):
+        log_queue = self.queue
+        while True:
+            batch = [log_queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not self._sentinel]
+            if records:
+                self.handle_batch(records)
+            if len(records) < len(batch):
+                return
+
+    def handle_batch(self, records):
+        """Emit records to every handler with one flush per handler."""
+        self.batches += 1
+        for handler in self.handlers:
+            wanted = [record for record in records if record.levelno >= handler.level]
+            if not wanted:
+                continue
+            # StreamHandler.emit flushes after every record; hold that off
+            # until the whole batch is written. Only this thread uses the
+            # handlers, so shadowing the method briefly is safe.
+            handler.flush = _no_flush
+            try:
+                for record in wanted:
+                    handler.handle(record)
+            finally:
+                del handler.flush
+                handler.flush()
+
+
+_installed = None  # (logger, queue handler, listener, original handlers, filters)
+
+
+def install_queue_logging(queue_size=10000, batch_size=500, rate=None, burst=None,
+                          sample_every=1, sample_loggers=None):
+    """Put the root logger's handlers behind a queue and a listener thread.
+
+    Returns the running `BatchingQueueListener`.
+    """
+    uninstall_queue_logging()
+    global _installed  # pylint: disable=global-statement
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    log_queue = queue.Queue(queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    filters = []
+    if rate:
+        filters.append(RateLimitFilter(rate, burst))
+    if sample_every > 1:
+        filters.append(SamplingFilter(sample_every, sample_loggers))
+    for log_filter in filters:
+        queue_handler.addFilter(log_filter)
+    root.addHandler(queue_handler)
+
+    listener = BatchingQueueListener(log_queue, *handlers, batch_size=batch_size)
+    listener.start()
+    _installed = (root, queue_handler, listener, handlers, filters)
+    atexit.register(uninstall_queue_logging)
+    return listener
+
+
+def uninstall_queue_logging():
+    """Flush and stop the listener and give the root logger its handlers back."""
+    global _installed  # pylint: disable=global-statement
+    if _installed is None:
+        return
+    root, queue_handler, listener, handlers, filters = _installed
+    _installed = None
+    root.removeHandler(queue_handler)
+    listener.stop()
+    for handler in handlers:
+        root.addHandler(handler)
+    dropped = queue_handler.dropped + sum(f.dropped for f in filters)
+    if dropped:
+        root.warning("Log pipeline dropped %d records (queue full %d, filtered %d).",
+                     dropped, queue_handler.dropped, dropped - queue_handler.dropped)
+    atexit.unregister(uninstall_queue_logging)
@@ -0,0 +1,206 @@
+"""
+metrics_exporter.py
+
+This module publishes the application's metrics in the Prometheus text
+exposition format (version 0.0.4, which OpenMetrics scrapers also accept).
+The figures are read straight from the live objects — `CommandHandler`'s
+metrics, executor and result cache, `HistoryManager`'s write histogram and
+queue, plugin import times and start-up phases — never from the logs.
+
+Two ways to publish them:
+    - `MetricsTextfile`: rewrites a file for node_exporter's textfile
+      collector every METRICS_INTERVAL seconds (15 by default) when
+      METRICS_TEXTFILE is set, atomically so a scrape never sees half a
+      file.
+    - `/metrics` over HTTP: served by the HTTP API (`main.py --http`), or by
+      `start_metrics_server` next to any other mode (`--metrics-port`).
+
+Functions:
+    - render(app): The exposition text for one `App`.
+"""
+
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.command_metrics import BUCKETS, STAGES
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(**labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Exposition:
+    """Collects metric families and renders them in exposition order."""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, kind, help_text):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name, value, **labels):
+        self.lines.append(f"{name}{_labels(**labels)} {float(value)!r}")
+
+    def histogram(self, name, histogram, **labels):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, histogram.counts):
+            cumulative += count
+            self.sample(f"{name}_bucket", cumulative, **labels, le=repr(bound))
+        self.sample(f"{name}_bucket", histogram.count, **labels, le="+Inf")
+        self.sample(f"{name}_sum", histogram.total, **labels)
+        self.sample(f"{name}_count", histogram.count, **labels)
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def render(app):
+    """Render every metric of `app` in the Prometheus text format."""
+    handler = app.command_handler
+    history = app.history_manager
+    out = _Exposition()
+    snapshot = handler.metrics.snapshot()
+
+    out.family("calculator_command_calls_total", "counter", "Commands run, by command.")
+    for name, entry in sorted(snapshot.items()):
+        out.sample("calculator_command_calls_total", entry['calls'], command=name)
+    out.family("calculator_command_errors_total", "counter", "Commands that failed, by command.")
+    for name, entry in sorted(snapshot.items()):
+        out.sample("calculator_command_errors_total", entry['errors'], command=name)
+    out.family("calculator_command_latency_seconds", "histogram",
+               "Time spent per call parsing arguments, executing and saving to history.")
+    for name, entry in sorted(snapshot.items()):
+        for stage in STAGES:
+            if entry[stage].count:
+                out.histogram("calculator_command_latency_seconds", entry[stage],
+                              command=name, stage=stage)
+
+    out.family("calculator_history_entries", "gauge",
+               "Entries in the calculation history (once it has been loaded).")
+    if history.is_loaded:
+        out.sample("calculator_history_entries", history.count(), backend=history.backend)
+    out.family("calculator_history_pending_records", "gauge",
+               "Records queued for the background history writer.")
+    out.sample("calculator_history_pending_records",
+               history.writer.pending if history.writer is not None else 0)
+    out.family("calculator_history_flush_seconds", "histogram",
+               "Duration of each write of records to the history store.")
+    out.histogram("calculator_history_flush_seconds", history.write_latency,
+                  backend=history.backend)
+
+    out.family("calculator_plugin_load_seconds", "gauge",
+               "Time taken to import each plugin command on first use.")
+    for name, seconds in sorted(handler.plugin_load_seconds.items()):
+        out.sample("calculator_plugin_load_seconds", seconds, plugin=name)
+    out.family("calculator_startup_phase_seconds", "gauge",
+               "Time taken by each phase of application start-up.")
+    for phase, seconds in app.startup_timings:
+        out.sample("calculator_startup_phase_seconds", seconds, phase=phase)
+
+    if handler.result_cache is not None:
+        stats = handler.result_cache.stats()
+        for key, kind in (('hits', 'counter'), ('misses', 'counter'),
+                          ('evictions', 'counter'), ('size', 'gauge')):
+            name = f"calculator_result_cache_{key}" + ("_total" if kind == 'counter' else "")
+            out.family(name, kind, f"Result cache {key}.")
+            out.sample(name, stats[key])
+
+    out.family("calculator_worker_busy_seconds_total", "counter",
+               "Time worker pools spent running commands.")
+    for policy, stats in handler.executor.stats().items():
+        out.sample("calculator_worker_busy_seconds_total", stats['busy_seconds'], pool=policy)
+    out.family("calculator_worker_utilization", "gauge",
+               "Share of worker pool capacity spent running commands.")
+    for policy, stats in handler.executor.stats().items():
+        out.sample("calculator_worker_utilization", stats['utilization'], pool=policy)
+    return out.text()
+
+
+class MetricsTextfile:
+    """Keeps a textfile-collector file up to date from a background thread."""
+
+    def __init__(self, app, path, interval=15.0):
+        self.app = app
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def write(self):
+        """Write the current metrics to the file, replacing it atomically."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(render(self.app))
+        os.replace(tmp_path, self.path)
+
+    def start(self):
+        """Write the file now and then every `interval` seconds."""
+        self._thread = threading.Thread(target=self._run, name='metrics-textfile', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                self.write()
+            except OSError as e:
+                logging.error("Could not write metrics to %s: %s", self.path, e)
+            if self._stopped.wait(self.interval):
+                return
+
+    def stop(self):
+        """Stop refreshing, after writing the file one last time."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.write()
+        except OSError as e:
+            logging.error("Could not write metrics to %s: %s", self.path, e)
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics for the server's `App`."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle /metrics."""
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        send_metrics(self, self.server.app)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logging.debug("Metrics %s - %s", self.address_string(), format % args)
+
+
+def send_metrics(request_handler, app):
+    """Write a /metrics response on an `http.server` request handler."""
+    body = render(app).encode('utf-8')
+    request_handler.send_response(200)
+    request_handler.send_header('Content-Type', CONTENT_TYPE)
+    request_handler.send_header('Content-Length', str(len(body)))
+    request_handler.end_headers()
+    request_handler.wfile.write(body)
+
+
+def start_metrics_server(app, host='127.0.0.1', port=9108):
+    """Serve /metrics from a daemon thread; returns the running server."""
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    server.daemon_threads = True
+    server.app = app
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logging.info("Metrics endpoint listening on %s", server.server_address[:2])
+    return server
@@ -0,0 +1,116 @@
+"""
+plugin_registry.py
+
+This module discovers plugin commands without importing them. Each plugin
+under `app/plugins` (a package, or a single module) is scanned with `ast`
+for classes deriving from `Command`; the resulting command names are kept
+in a manifest file keyed on a hash of the plugin files' names, sizes and
+modification times, so unchanged plugin directories are never re-scanned.
+
+Classes:
+    - PluginRegistry: Builds or reuses the manifest of plugin commands.
+
+Usage:
+    registry = PluginRegistry(plugins_path, 'app.plugins')
+    for name, entry in registry.discover().items():
+        handler.register_command(name, LazyCommand(entry['module'], entry['class']))
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pkgutil
+
+
+class PluginRegistry:
+    """Caches which commands each plugin provides."""
+    MANIFEST_FILE = "data/plugin_manifest.json"
+
+    def __init__(self, plugins_path, plugins_package):
+        self.plugins_path = plugins_path
+        self.plugins_package = plugins_package
+
+    def signature(self):
+        """Hash of every plugin source file's path, size and mtime."""
+        digest = hashlib.sha1()
+        for root, dirs, files in os.walk(self.plugins_path):
+            dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+            for name in sorted(files):
+                if not name.endswith('.py'):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                rel_path = os.path.relpath(path, self.plugins_path)
+                digest.update(f"{rel_path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()
+
+    def discover(self, signature=None):
+        """Return {command name: {'module': ..., 'class': ...}} for all plugins.
+
+        `signature` may be passed in when the caller has already computed it.
+        """
+        signature = signature or self.signature()
+        manifest = self._read_manifest()
+        if manifest.get('signature') == signature:
+            logging.info("Plugin manifest is up to date.")
+            return manifest['commands']
+
+        commands = self.scan()
+        self._write_manifest({'signature': signature, 'commands': commands})
+        logging.info("Plugin manifest rebuilt with %d commands.", len(commands))
+        return commands
+
+    def scan(self):
+        """Find plugin commands by parsing the plugin sources."""
+        commands = {}
+        for _, plugin_name, is_pkg in pkgutil.iter_modules([self.plugins_path]):
+            if is_pkg:
+                source = os.path.join(self.plugins_path, plugin_name, '__init__.py')
+            else:
+                source = os.path.join(self.plugins_path, f'{plugin_name}.py')
+            logging.info("Found plugin: %s (is_pkg=%s)", plugin_name, is_pkg)
+            class_name = self._find_command_class(source)
+            if class_name is None:
+                logging.warning("Plugin %s defines no command.", plugin_name)
+                continue
+            commands[plugin_name] = {
+                'module': f'{self.plugins_package}.{plugin_name}',
+                'class': class_name,
+            }
+        return commands
+
+    @staticmethod
+    def _find_command_class(source):
+        """Name of the last class in `source` that subclasses Command."""
+        import ast  # only needed when the manifest is stale
+        try:
+            with open(source, encoding='utf-8') as f:
+                tree = ast.parse(f.read(), filename=source)
+        except (OSError, SyntaxError) as e:
+            logging.error("Error scanning plugin %s: %s", source, e)
+            return None
+        class_name = None
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            for base in node.bases:
+                base_name = getattr(base, 'id', None) or getattr(base, 'attr', None)
+                if base_name == 'Command':
+                    class_name = node.name
+        return class_name
+
+    def _read_manifest(self):
+        try:
+            with open(self.MANIFEST_FILE, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest):
+        try:
+            os.makedirs(os.path.dirname(self.MANIFEST_FILE) or '.', exist_ok=True)
+            with open(self.MANIFEST_FILE, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+        except OSError as e:
+            logging.warning("Could not write plugin manifest: %s", e)
@@ -1,93 +1,200 @@
 """
 csv_command.py
 
-This module defines the `CsvCommand` class, which demonstrates the process of:
-- Ensuring a directory exists for storing CSV files.
-- Converting a dictionary to a pandas DataFrame and saving it as a CSV file.
-- Reading the CSV back into a DataFrame and logging its content.
+This module defines the `CsvCommand` class, an ingestion command for CSV
+files of any size:
+- `csv load <path>` reads the file into memory with compact dtypes and keeps
+  it for later `stats` and `head` calls while the file is unchanged.
+- `csv stats <path>` summarizes every column (count, missing values, mean,
+  min and max for numbers, distinct values for the rest).
+- `csv head <path> [n]` previews the first rows.
+
+Files are read in chunks of `CHUNK_ROWS` rows. Column dtypes are inferred
+once from the first `SAMPLE_ROWS` rows and then given to the reader
+explicitly, so every chunk parses the same way and pandas never has to
+guess per chunk. Statistics are computed per chunk with vectorized pandas
+reductions and merged, so `stats` on an unloaded file runs in constant
+memory. Output is bounded: previews are capped at `MAX_PREVIEW_ROWS` rows,
+and each call logs one summary line per file.
 
 Classes:
-    - CsvCommand: Implements CSV-related operations including saving and reading state abbreviations.
+    - CsvCommand: Implements `csv load|stats|head`.
 
 Usage:
-    This command is designed to be used within a command execution system.
-    When executed, it logs and processes state data using CSV files.
+    This command is designed to be used within a command execution system,
+    e.g. `csv stats data/gpt_states.csv`.
 """
 
 import logging
 import os
+import time
 import pandas as pd
-from commands import Command
+from app.commands import Command
+from app.command_signature import Signature
 
 
 class CsvCommand(Command):
-    """A command that demonstrates handling CSV files using pandas.
+    """A command that loads, summarizes and previews CSV files with pandas.
 
-    This class ensures a target directory exists, creates a DataFrame from 
-    a dictionary, saves it as a CSV file, and then reads and logs the contents.
+    It runs on the thread pool since it spends its time on file I/O.
     """
-    def execute(self):
-        """Executes the CSV file creation and reading process.
-
-        This function:
-        - Ensures the 'data' directory exists and is writable.
-        - Converts a dictionary of state abbreviations into a pandas DataFrame.
-        - Saves the DataFrame to a CSV file.
-        - Reads the CSV file back into a DataFrame and logs the content.
-
+    signature = Signature(varargs=str)
+    record_history = False
+    execution = "thread"
+    USAGE = "Usage: csv load|stats|head <path> [rows]"
+    CHUNK_ROWS = 100_000
+    SAMPLE_ROWS = 1_000
+    PREVIEW_ROWS = 5
+    MAX_PREVIEW_ROWS = 100
+    DISTINCT_LIMIT = 10_000
+
+    def __init__(self):
+        """Starts with no loaded tables."""
+        self.tables = {}  # path -> (file signature, DataFrame)
+
+    def execute(self, *args):
+        """Executes one CSV action.
+
+        Args:
+            *args (str): The action (`load`, `stats` or `head`), the path of
+                the CSV file and, for `head`, an optional row count.
+        Returns:
+            str: A summary, a statistics table or a preview.
         Raises:
-            OSError: If the 'data' directory is not writable.
+            ValueError: If the file is missing or does not parse.
         """
-        # Ensure the 'data' directory exists and is writable
-        data_dir = './data'
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-            logging.info("The directory '%s' is created", data_dir)
-        elif not os.access(data_dir, os.W_OK):
-            logging.error("The directory '%s' is not writable.", data_dir)
-            return
-
-        # Convert dictionary to DataFrame and save to CSV
-        states_abbreviations = {
-            'CA': 'California',
-            'NJ': 'New Jersey',
-            'TX': 'Texas',
-            'FL': 'Florida',
-            'IL': 'Illinois',
-            'NY': 'New York'  # Newly added state
-        }
-        df_states = pd.DataFrame(list(states_abbreviations.items()), columns=[
-                                 'Abbreviation', 'State'])
-        csv_file_path = os.path.join(data_dir, 'states.csv')
-        df_states.to_csv(csv_file_path, index=False)
-
-        logging.info("States saved to CSV at '%s'.", csv_file_path)
-
-        # This is creating the path for saving the file.
-        csv_file_path = os.path.join(data_dir, 'gpt_states.csv')
-        logging.info("The relative path to save my file is %s", csv_file_path)
-
-        # Read the CSV file back into a DataFrame
-        absolute_path = os.path.abspath(csv_file_path)
-        logging.info("The absolute path to save my file is %s", absolute_path)
-
+        if len(args) < 2 or args[0] not in ("load", "stats", "head"):
+            return self.USAGE
+        action, path = args[0], args[1]
+        if not os.path.isfile(path):
+            raise ValueError(f"No such CSV file: {path}")
+        started = time.perf_counter()
+        output, rows, columns = getattr(self, action)(path, *args[2:])
+        logging.info("csv %s %s: %d rows, %d columns in %.3fs",
+                     action, path, rows, columns, time.perf_counter() - started)
+        return output
+
+    def load(self, path):
+        """Read the whole file, keep it in memory and describe it."""
+        frames = list(self.iter_chunks(path))
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        for column in frame.select_dtypes("object"):
+            if frame[column].nunique() <= len(frame) // 2:
+                frame[column] = frame[column].astype("category")
+        self.tables[path] = (self._signature(path), frame)
+        memory = frame.memory_usage(deep=True).sum()
+        columns = ", ".join(f"{name} ({dtype})" for name, dtype in frame.dtypes.items())
+        output = (
+            f"Loaded {len(frame)} rows x {frame.shape[1]} columns from {path} "
+            f"({memory / 1024:.1f} KiB in memory).\nColumns: {columns}"
+        )
+        return output, len(frame), frame.shape[1]
+
+    def stats(self, path):
+        """Summarize every column, merging per-chunk reductions."""
+        table = self._loaded(path)
+        chunks = [table] if table is not None else self.iter_chunks(path)
+        totals = None
+        rows = 0
+        for chunk in chunks:
+            rows += len(chunk)
+            totals = self._merge(totals, self._summarize(chunk))
+        if totals is None:
+            return f"{path} has no rows.", 0, 0
+        summary = pd.DataFrame({
+            "dtype": totals["dtype"],
+            "count": totals["count"],
+            "missing": rows - totals["count"],
+            "mean": totals["sum"] / totals["count"].where(totals["count"] > 0),
+            "min": totals["min"],
+            "max": totals["max"],
+            "distinct": totals["distinct"].map(
+                lambda values: (f">{self.DISTINCT_LIMIT}"
+                                if len(values) > self.DISTINCT_LIMIT else len(values))
+                if isinstance(values, set) else ""
+            ),
+        }).astype(object)
+        summary = summary.where(summary.notna(), "")
+        return f"{path}: {rows} rows\n{summary.to_string()}", rows, len(summary)
+
+    def head(self, path, count=None):
+        """Preview the first rows (at most MAX_PREVIEW_ROWS)."""
+        try:
+            count = int(count) if count is not None else self.PREVIEW_ROWS
+        except ValueError:
+            raise ValueError(f"Invalid row count: {count}")
+        count = max(1, min(count, self.MAX_PREVIEW_ROWS))
+        table = self._loaded(path)
+        frame = table.head(count) if table is not None else pd.read_csv(path, nrows=count)
+        return frame.to_string(max_colwidth=30), len(frame), frame.shape[1]
+
+    def infer_dtypes(self, path):
+        """Column dtypes inferred from the first SAMPLE_ROWS rows.
+
+        Integers become nullable `Int64` so missing values further down do
+        not break them; everything that is not a number stays `object`.
+        """
+        sample = pd.read_csv(path, nrows=self.SAMPLE_ROWS)
+        dtypes = {}
+        for column, dtype in sample.dtypes.items():
+            if pd.api.types.is_bool_dtype(dtype):
+                dtypes[column] = "boolean"
+            elif pd.api.types.is_integer_dtype(dtype):
+                dtypes[column] = "Int64"
+            elif pd.api.types.is_float_dtype(dtype):
+                dtypes[column] = "float64"
+            else:
+                dtypes[column] = "object"
+        return dtypes
+
+    def iter_chunks(self, path):
+        """Yield the file as DataFrames of CHUNK_ROWS rows with fixed dtypes."""
+        dtypes = self.infer_dtypes(path)
         try:
-            df_read_states = pd.read_csv(csv_file_path)
-        except FileNotFoundError:
-            logging.error(
-                "File '%s' not found. Please check if it was created correctly.", csv_file_path)
-            return
-
-        # Print and log each state nicely
-        print("States from CSV:")
-        for index, row in df_read_states.iterrows():
-            # First, print and log the complete record for the state
-            state_info = "%s: %s" % (row['Abbreviation'], row['State'])
-            print("Record %d: %s" % (index, state_info))
-            logging.info("Record %d: %s", index, state_info)
-
-            # Then, iterate through each field in the row to print and log
-            for field in row.index:
-                field_info = "    %s: %s" % (field, row[field])
-                print(field_info)
-                logging.info("Index: %d, %s", index, field_info)
+            with pd.read_csv(path, dtype=dtypes, chunksize=self.CHUNK_ROWS) as reader:
+                yield from reader
+        except (ValueError, TypeError) as e:
+            raise ValueError(
+                f"{path}: a column does not match the type of its first "
+                f"{self.SAMPLE_ROWS} rows: {e}"
+            )
+
+    def _summarize(self, chunk):
+        numbers = chunk.select_dtypes("number")
+        others = chunk.columns.difference(numbers.columns, sort=False)
+        return pd.DataFrame({
+            "dtype": chunk.dtypes.astype(str),
+            "count": chunk.count(),
+            "sum": numbers.sum(),
+            "min": numbers.min(),
+            "max": numbers.max(),
+            "distinct": pd.Series(
+                {column: set(chunk[column].dropna().unique()) for column in others},
+                dtype=object,
+            ),
+        }, index=chunk.columns)
+
+    def _merge(self, totals, part):
+        if totals is None:
+            return part
+        totals["count"] += part["count"]
+        totals["sum"] = totals["sum"].add(part["sum"])
+        totals["min"] = pd.concat([totals["min"], part["min"]], axis=1).min(axis=1)
+        totals["max"] = pd.concat([totals["max"], part["max"]], axis=1).max(axis=1)
+        for column, values in part["distinct"].dropna().items():
+            seen = totals.at[column, "distinct"]
+            if len(seen) <= self.DISTINCT_LIMIT:
+                seen |= values
+        return totals
+
+    def _loaded(self, path):
+        """The loaded table for `path`, if the file has not changed since."""
+        entry = self.tables.get(path)
+        if entry is not None and entry[0] == self._signature(path):
+            return entry[1]
+        return None
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
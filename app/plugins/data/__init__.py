@@ -16,7 +16,10 @@ Usage:
 """
 
 import logging
-from commands import Command
+from app.commands import Command
+from app.command_signature import Signature
+
+logger = logging.getLogger(__name__)
 
 
 class DataCommand(Command):
@@ -28,35 +31,36 @@ class DataCommand(Command):
     Methods:
         execute(): Demonstrates various data structures and logs the output.
     """
+    signature = Signature()
 
     def execute(self):
         """Executes various data structure demonstrations and logs outputs."""
         # Demonstrating Lists
         my_list = ['apple', 'banana', 'cherry']
-        logging.info('List example: %s', my_list)
+        logger.info('List example: %s', my_list)
         # Lists are ordered and mutable, making them ideal for storing a
         # collection of items that may change over time.
-        logging.info('I pick an %s', my_list[0])
+        logger.info('I pick an %s', my_list[0])
         my_list.append('date')  # Adding an item to the list
-        logging.info('List after adding an item: %s', my_list)
+        logger.info('List after adding an item: %s', my_list)
 
         # Demonstrating Tuples
         my_tuple = (1, 2, 3, 4)
-        logging.info('Tuple example: %s', my_tuple)
+        logger.info('Tuple example: %s', my_tuple)
         # Tuples are ordered and immutable, suitable for storing a collection
         # of items that should not change.
-        logging.debug('My Tuple is %s', my_tuple[0])
+        logger.debug('My Tuple is %s', my_tuple[0])
 
         # Demonstrating Sets
         my_set = {1, 2, 3, 4}
         my_set2 = {2, 3, 4, 5}
-        logging.info('Set example: %s', my_set)
-        logging.info('Whats different: %s', my_set.difference(my_set2))
+        logger.info('Set example: %s', my_set)
+        logger.info('Whats different: %s', my_set.difference(my_set2))
         # Sets are unordered, mutable, and do not allow duplicate values,
         # ideal for unique collections without specific order.
 
         my_set.add(5)  # Adding an item to the set
-        logging.info('Set after adding an item: %s', my_set)
+        logger.info('Set after adding an item: %s', my_set)
 
         # Demonstrating Dictionaries
         states_abbreviations = {
@@ -67,21 +71,24 @@ class DataCommand(Command):
             'IL': 'Illinois'
         }
 
-        logging.info('Dictionary example: %s', states_abbreviations)
+        logger.info('Dictionary example: %s', states_abbreviations)
         # Dictionaries store data in key-value pairs. They are mutable and
         # unordered, ideal for fast lookups where each value is associated
         # with a unique key.
 
         states_abbreviations['NY'] = 'New York'  # Adding a new key-value pair
-        logging.info(
+        logger.info(
             'Dictionary after adding a state: %s', states_abbreviations
         )
 
-        # Demonstrating dictionary iteration
-        for abbreviation, full_name in states_abbreviations.items():
-            logging.info(
-                'State Abbreviation: %s for: %s', abbreviation, full_name
-            )
+        # Demonstrating dictionary iteration; checking the level once keeps
+        # the loops cheap when INFO is off
+        log_info = logger.isEnabledFor(logging.INFO)
+        if log_info:
+            for abbreviation, full_name in states_abbreviations.items():
+                logger.info(
+                    'State Abbreviation: %s for: %s', abbreviation, full_name
+                )
 
         # Advanced use case: Nested Dictionaries
         states_info = {
@@ -106,7 +113,8 @@ class DataCommand(Command):
 
         for state, info in states_info.items():
             # Log the state abbreviation
-            logging.info('State: %s', state)
+            if log_info:
+                logger.info('State: %s', state)
             print(f"State: {state}")
 
             # Iterate through each property of the state and print/log it
@@ -115,4 +123,5 @@ class DataCommand(Command):
                     f"{property_name.capitalize()}: {property_value}"
                 )
                 print(property_info)
-                logging.info('%s', property_info)
+                if log_info:
+                    logger.info('%s', property_info)
@@ -10,10 +10,12 @@ Classes:
 """
 import logging
 from app.commands import Command
+from app.command_signature import Signature
 
 
 class GreetCommand(Command):
     """A command that logs and prints a greeting message."""
+    signature = Signature()
 
     def execute(self):
         """Executes the greeting command.
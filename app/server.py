@@ -0,0 +1,172 @@
+"""
+server.py
+
+This module defines the `CalculatorServer`, an asyncio TCP / Unix-socket
+server that lets many clients share one running `App` instead of starting
+a process per call.
+
+Protocol (one request per line, one response per line, in order):
+    - JSON lines: `{"id": 1, "command": "add", "args": [1, 2]}` is answered
+      with `{"id": 1, "ok": true, "result": 3.0}`, or with
+      `{"id": 1, "ok": false, "error": "..."}` on failure.
+    - Plain text: `add 1 2` is answered exactly like the REPL would print
+      it, e.g. `Result: 3.0`.
+
+Backpressure:
+    Each connection handles its requests in order and waits for the socket
+    to drain before reading the next one, the number of connections is
+    capped, and history records go through a bounded queue.
+
+Commands run one at a time on a worker thread, never on the event loop,
+so a slow command does not stall reading from or writing to other clients.
+
+History writes happen off the request path: responses are sent as soon
+as the command has run, and a background task saves the queued records in
+batches on a worker thread. History commands therefore see a result once
+its batch has been written, usually within milliseconds.
+"""
+
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from app import Session
+
+
+class CalculatorServer:
+    """Serves an `App`'s commands over a socket."""
+
+    def __init__(self, app, max_clients=1024, queue_size=10000, batch_size=500):
+        self.app = app
+        self.max_clients = max_clients
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.clients = 0
+        self.requests = 0
+        self._server = None
+        self._queue = None
+        self._writer_task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='history')
+        self._commands = ThreadPoolExecutor(max_workers=1, thread_name_prefix='commands')
+
+    async def start(self, host='127.0.0.1', port=8765, unix_path=None):
+        """Start listening; returns the bound (host, port) or the socket path."""
+        self._queue = asyncio.Queue(self.queue_size)
+        self._writer_task = asyncio.create_task(self._write_history())
+        if unix_path:
+            self._server = await asyncio.start_unix_server(self._handle_client, unix_path)
+            address = unix_path
+        else:
+            self._server = await asyncio.start_server(self._handle_client, host, port)
+            address = self._server.sockets[0].getsockname()[:2]
+        logging.info("Calculator server listening on %s", address)
+        return address
+
+    async def serve_forever(self, host='127.0.0.1', port=8765, unix_path=None,
+                            on_ready=None):
+        """Start the server and run until cancelled, then flush history.
+
+        `on_ready`, if given, is called with the bound address once the
+        server is listening.
+        """
+        address = await self.start(host, port, unix_path)
+        if on_ready is not None:
+            on_ready(address)
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Stop accepting clients and save every queued history record."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._writer_task is not None:
+            await self._queue.join()
+            self._writer_task.cancel()
+            self._writer_task = None
+        self._commands.shutdown(wait=True)
+        self._executor.shutdown(wait=True)
+        logging.info("Calculator server stopped after %d requests.", self.requests)
+
+    async def _handle_client(self, reader, writer):
+        if self.clients >= self.max_clients:
+            writer.write(b'{"ok": false, "error": "Server busy."}\n')
+            await writer.drain()
+            writer.close()
+            return
+        self.clients += 1
+        session = Session()  # `ans` is per connection
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._respond(line.decode('utf-8').strip(), session)
+                if response is None:
+                    continue
+                writer.write(response.encode('utf-8') + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logging.warning("Client connection lost: %s", e)
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def _respond(self, line, session):
+        """Run one request line for a client's session and format its response."""
+        if not line:
+            return None
+        self.requests += 1
+        pending = []
+        loop = asyncio.get_running_loop()
+        if line.startswith('{'):
+            response = await loop.run_in_executor(
+                self._commands, self._execute_json, line, pending, session
+            )
+        else:
+            response = await loop.run_in_executor(
+                self._commands, self.app.process_line, line, pending, session
+            ) or ''
+        for record in pending:
+            await self._queue.put(record)
+        return response
+
+    def _execute_json(self, line, pending, session):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return json.dumps({'ok': False, 'error': f"Invalid JSON: {e}"})
+        return json.dumps(self.app.execute_request(request, pending, session), default=str)
+
+    async def _write_history(self):
+        """Save queued history records in batches on the worker thread."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await loop.run_in_executor(
+                    self._executor, self.app.commit_history, batch
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                # keep the writer alive: a dead task would hang stop() on join()
+                logging.error("Could not save %d history records: %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+def serve(app, host='127.0.0.1', port=8765, unix_path=None):
+    """Run a `CalculatorServer` until interrupted."""
+    server = CalculatorServer(app)
+    try:
+        asyncio.run(server.serve_forever(host, port, unix_path))
+    except KeyboardInterrupt:
+        logging.info("Calculator server interrupted.")
@@ -0,0 +1,94 @@
+"""
+session_snapshot.py
+
+This module stores what start-up would otherwise rebuild — the plugin
+command registry and the parsed history — in a single binary file, so a
+relaunch can restore it instead. It is opt-in: set SESSION_SNAPSHOT to the
+path of the snapshot file (e.g. `data/session.snapshot`); the file is
+written when the application exits, unless nothing in it changed.
+
+The file holds two pickles: a small header with the plugin registry and
+the journal digest, read at start-up, and the history rows, read only when
+the history is first needed.
+
+Nothing in a snapshot is trusted blindly:
+    - the plugin registry is used only if the signature of the plugin
+      files (names, sizes and mtimes, see `PluginRegistry.signature`) is
+      unchanged;
+    - the history is used only if the journal has the same size and
+      SHA-1 hash as when the snapshot was written.
+Anything stale falls back to the usual cold path, as does a snapshot that
+is missing, unreadable or from another version.
+
+The file is a pickle, so SESSION_SNAPSHOT must only ever point at a file
+this application wrote.
+
+Classes:
+    - SessionSnapshot: Reads and writes one snapshot file.
+"""
+
+import logging
+import os
+import pickle
+
+
+class SessionSnapshot:
+    """One snapshot file: a `{'version', 'plugins', 'history_digest'}`
+    header followed by the exported history."""
+    MAGIC = b"CALCSNAP"
+    VERSION = 2
+
+    def __init__(self, path):
+        self.path = path
+        self._history_at = None  # ((inode, mtime), offset) of the history pickle
+
+    def read(self):
+        """The stored header, or None if there is no usable snapshot."""
+        try:
+            with open(self.path, 'rb') as f:
+                if f.read(len(self.MAGIC)) != self.MAGIC:
+                    raise ValueError("not a session snapshot")
+                header = pickle.load(f)
+                stat = os.fstat(f.fileno())
+                self._history_at = ((stat.st_ino, stat.st_mtime_ns), f.tell())
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning("Ignoring session snapshot %s: %s", self.path, e)
+            return None
+        if not isinstance(header, dict) or header.get('version') != self.VERSION:
+            logging.info("Ignoring session snapshot %s from another version.", self.path)
+            return None
+        return header
+
+    def read_history(self):
+        """The history stored after the header `read` returned, or None if
+        there is none or the file has been replaced since."""
+        if self._history_at is None:
+            return None
+        identity, offset = self._history_at
+        try:
+            with open(self.path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if (stat.st_ino, stat.st_mtime_ns) != identity:
+                    return None
+                f.seek(offset)
+                return pickle.load(f)
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning("Ignoring history in session snapshot %s: %s", self.path, e)
+            return None
+
+    def write(self, plugins=None, history=None):
+        """Replace the snapshot atomically with the given state."""
+        header = {
+            'version': self.VERSION,
+            'plugins': plugins,
+            'history_digest': history and history['digest'],
+        }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.MAGIC)
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(history, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the calculator's hot paths: command dispatch, the
+calculator commands, history loading and saving, application start-up and
+plugin discovery. See `benchmarks.runner` for how to run them.
+"""
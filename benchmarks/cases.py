@@ -0,0 +1,180 @@
+"""
+cases.py
+
+The benchmark suites. Each suite is a function taking `quick` and yielding
+(name, timing) pairs, where timing comes from `runner.measure`. Full runs
+cover history sizes of 1k, 100k and 1M rows, 2 to 100k operands and 0 to
+100 plugins; quick runs keep only the smallest sizes.
+
+Every suite works in a temporary directory, so the repository's own
+history file and plugin manifest are never touched.
+"""
+
+import csv
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from benchmarks.runner import measure
+from app.commands import CommandHandler
+from app.commands.calculator import (
+    AddCommand, SubtractCommand, MultiplyCommand, DivideCommand
+)
+from app.history_manager import COLUMNS, HistoryManager
+from app.plugin_registry import PluginRegistry
+
+HISTORY_SIZES = (1_000, 100_000, 1_000_000)
+OPERAND_COUNTS = (2, 100, 10_000, 100_000)
+PLUGIN_COUNTS = (0, 10, 100)
+
+
+@contextmanager
+def isolated():
+    """Point the history and plugin manifest files into a temporary directory."""
+    saved = (HistoryManager.HISTORY_FILE, HistoryManager.HISTORY_DB,
+             PluginRegistry.MANIFEST_FILE)
+    with tempfile.TemporaryDirectory() as directory:
+        HistoryManager.HISTORY_FILE = os.path.join(directory, "history.csv")
+        HistoryManager.HISTORY_DB = os.path.join(directory, "history.db")
+        PluginRegistry.MANIFEST_FILE = os.path.join(directory, "plugin_manifest.json")
+        try:
+            yield directory
+        finally:
+            (HistoryManager.HISTORY_FILE, HistoryManager.HISTORY_DB,
+             PluginRegistry.MANIFEST_FILE) = saved
+
+
+def _calls(operand_count):
+    """Enough calls per repeat to take a measurable time."""
+    return max(1, 20_000 // operand_count)
+
+
+def dispatch(quick):
+    """`CommandHandler.execute_command` overhead, with and without the cache."""
+    from app.result_cache import ResultCache
+
+    plain = CommandHandler()
+    cached = CommandHandler(result_cache=ResultCache(1024))
+    for handler in (plain, cached):
+        handler.register_command("add", AddCommand())
+    number = 2_000 if quick else 20_000
+    yield "add", measure(lambda: plain.execute_command("add", "1", "2"), number)
+    yield "add[cached]", measure(lambda: cached.execute_command("add", "1", "2"), number)
+
+    def missing():
+        try:
+            plain.execute_command("nope")
+        except KeyError:
+            pass
+    yield "unknown", measure(missing, number)
+
+
+def arithmetic(quick):
+    """The four calculator commands, directly and through the handler."""
+    handler = CommandHandler()
+    commands = {
+        "add": AddCommand(), "sub": SubtractCommand(),
+        "mul": MultiplyCommand(), "div": DivideCommand(),
+    }
+    for name, command in commands.items():
+        handler.register_command(name, command)
+    for count in OPERAND_COUNTS[:2] if quick else OPERAND_COUNTS:
+        numbers = tuple(1.0 + i % 7 for i in range(count))
+        strings = tuple(map(str, numbers))
+        for name, command in commands.items():
+            yield f"{name}[{count}]", measure(
+                lambda c=command: c.execute(*numbers), _calls(count))
+        yield f"handler.add[{count}]", measure(
+            lambda: handler.execute_command("add", *strings), _calls(count))
+
+
+def _write_journal(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(
+            ("add", f"{i} 1", float(i + 1), "2025-01-01T00:00:00") for i in range(rows)
+        )
+
+
+def history(quick):
+    """Loading, appending to and paging histories of growing size."""
+    for size in HISTORY_SIZES[:1] if quick else HISTORY_SIZES:
+        repeat = 3 if size >= 1_000_000 else 5
+        with isolated():
+            _write_journal(HistoryManager.HISTORY_FILE, size)
+            yield f"load[{size}]", measure(
+                lambda: HistoryManager().load_history(), repeat=repeat)
+
+            manager = HistoryManager()
+            manager.count()  # parse the journal outside the timed part
+            yield f"save_operation[{size}]", measure(
+                lambda: manager.save_operation("add", [1, 2], 3.0), 200)
+            yield f"save_operations[{size}x100]", measure(
+                lambda: manager.save_operations([("add", [1, 2], 3.0)] * 100), 20)
+            yield f"tail[{size}]", measure(lambda: manager.tail(20), 50)
+            yield f"query[{size}]", measure(
+                lambda: manager.query(operation="sub", limit=20), repeat=repeat)
+
+
+def startup(quick):
+    """Building the `App`, which must not read the history."""
+    from app import App
+
+    with isolated() as directory:
+        _write_journal(HistoryManager.HISTORY_FILE, 1_000 if quick else 100_000)
+        cwd = os.getcwd()
+        os.chdir(directory)  # App creates its logs/ and data/ folders here
+        try:
+            yield "app", measure(App, repeat=5 if quick else 10)
+        finally:
+            os.chdir(cwd)
+
+
+def _write_plugins(directory, count):
+    package = os.path.join(directory, "bench_plugins")
+    os.makedirs(package)
+    open(os.path.join(package, "__init__.py"), "w", encoding="utf-8").close()
+    for i in range(count):
+        with open(os.path.join(package, f"plugin{i}.py"), "w", encoding="utf-8") as f:
+            f.write(
+                "from app.commands import Command\n\n"
+                f"class Plugin{i}Command(Command):\n"
+                "    def execute(self, *args):\n"
+                f"        return {i}\n"
+            )
+    return package
+
+
+def plugins(quick):
+    """Plugin discovery with a cold and a warm manifest, and first imports."""
+    from app.commands import LazyCommand
+
+    for count in PLUGIN_COUNTS[:2] if quick else PLUGIN_COUNTS:
+        with isolated() as directory:
+            registry = PluginRegistry(_write_plugins(directory, count), "bench_plugins")
+            yield f"scan[{count}]", measure(registry.scan)
+            registry.discover()
+            yield f"discover[{count}]", measure(registry.discover, 20)
+
+            sys.path.insert(0, directory)
+            try:
+                entries = registry.discover().values()
+                yield f"import[{count}]", measure(
+                    lambda: [LazyCommand(e["module"], e["class"]).load() for e in entries],
+                    repeat=1,
+                )
+            finally:
+                sys.path.remove(directory)
+                for name in [m for m in sys.modules if m.startswith("bench_plugins")]:
+                    del sys.modules[name]
+
+
+SUITES = {
+    "dispatch": dispatch,
+    "arithmetic": arithmetic,
+    "history": history,
+    "startup": startup,
+    "plugins": plugins,
+}
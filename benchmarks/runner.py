@@ -0,0 +1,133 @@
+"""
+runner.py
+
+Runs the benchmark suites from `benchmarks.cases`, writes their results as
+JSON and compares them with a saved baseline.
+
+Usage:
+    python -m benchmarks [--quick] [--suite NAME ...] [--output FILE]
+                         [--baseline FILE] [--tolerance 0.25]
+    python main.py --bench [same options]
+
+Each result records the median and fastest time per call over several
+repeats. With `--baseline`, every benchmark present in both runs is
+listed with its slowdown ratio; the exit status is 1 when any of them got
+slower than the tolerance allows, so the comparison can gate a review.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+
+def measure(func, number=1, repeat=5):
+    """Time `func`, `number` calls per repeat, and summarize per-call times."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        'median': statistics.median(timings),
+        'min': min(timings),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def run(suites=None, quick=False, progress=None):
+    """Run the selected suites (all by default) and return the JSON report."""
+    from benchmarks.cases import SUITES
+
+    names = suites or list(SUITES)
+    unknown = set(names) - set(SUITES)
+    if unknown:
+        raise ValueError(f"Unknown benchmark suites: {', '.join(sorted(unknown))}")
+    results = {}
+    logging.disable(logging.CRITICAL)
+    try:
+        for suite in names:
+            for name, timing in SUITES[suite](quick):
+                results[f"{suite}/{name}"] = timing
+                if progress is not None:
+                    progress(f"{suite}/{name}", timing)
+    finally:
+        logging.disable(logging.NOTSET)
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, tolerance=0.25):
+    """List (name, baseline median, current median, ratio, regressed) rows."""
+    rows = []
+    for name, timing in report['results'].items():
+        before = baseline['results'].get(name)
+        if before is None or not before['median']:
+            continue
+        ratio = timing['median'] / before['median']
+        rows.append((name, before['median'], timing['median'], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def format_comparison(rows):
+    """Render `compare` rows as a table, regressions marked."""
+    lines = [f"{'benchmark':<44}{'baseline':>12}{'current':>12}{'ratio':>8}"]
+    for name, before, after, ratio, regressed in rows:
+        lines.append(
+            f"{name:<44}{_format_seconds(before):>12}{_format_seconds(after):>12}"
+            f"{ratio:>7.2f}x" + ("  REGRESSION" if regressed else "")
+        )
+    return "\n".join(lines)
+
+
+def _format_seconds(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main(argv=None):
+    """Command-line entry point; returns the process exit status."""
+    parser = argparse.ArgumentParser(prog="benchmarks", description="Calculator benchmarks")
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    parser.add_argument("--suite", action="append", help="run only this suite (repeatable)")
+    parser.add_argument("--output", metavar="FILE", help="write the JSON report to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare with a saved report")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="allowed slowdown before a benchmark counts as regressed (default 0.25)",
+    )
+    options = parser.parse_args(argv)
+
+    report = run(
+        options.suite, options.quick,
+        progress=lambda name, timing: print(
+            f"{name:<44}{_format_seconds(timing['median']):>12}", file=sys.stderr
+        ),
+    )
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if not options.baseline:
+        return 0
+    with open(options.baseline, encoding='utf-8') as f:
+        rows = compare(report, json.load(f), options.tolerance)
+    print(format_comparison(rows), file=sys.stderr)
+    return 1 if any(row[-1] for row in rows) else 0
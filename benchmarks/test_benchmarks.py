@@ -0,0 +1,31 @@
+"""Runs every suite at its quick sizes: `pytest benchmarks`."""
+import json
+
+import pytest
+
+from benchmarks import runner
+from benchmarks.cases import SUITES
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("suite", sorted(SUITES))
+def test_suite_runs(suite):
+    report = runner.run([suite], quick=True)
+    assert report["results"]
+    for name, timing in report["results"].items():
+        assert name.startswith(f"{suite}/")
+        assert 0 < timing["min"] <= timing["median"]
+
+
+def test_comparison_flags_regressions(tmp_path, capsys):
+    baseline = {"results": {"dispatch/add": {"median": 1e-6}, "gone/x": {"median": 1.0}}}
+    report = {"results": {"dispatch/add": {"median": 2e-6}, "new/y": {"median": 1.0}}}
+    rows = runner.compare(report, baseline, tolerance=0.25)
+    assert rows == [("dispatch/add", 1e-6, 2e-6, 2.0, True)]
+    assert "REGRESSION" in runner.format_comparison(rows)
+
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps(runner.run(["dispatch"], quick=True)))
+    assert runner.main(["--quick", "--suite", "dispatch", "--baseline", str(path),
+                        "--tolerance", "100"]) == 0
+    assert '"dispatch/add"' in capsys.readouterr().out
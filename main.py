@@ -1,6 +1,71 @@
 # main.py
-from app import App    
+import argparse
+import sys
+import time
+
+_import_started = time.perf_counter()
+from app import App  # pylint: disable=wrong-import-position
+_import_seconds = time.perf_counter() - _import_started
+
+
+def parse_args(argv=None):
+    """Command-line options for the calculator."""
+    parser = argparse.ArgumentParser(description="Advanced Python calculator")
+    parser.add_argument(
+        "--batch", metavar="FILE",
+        help="run commands from FILE without prompting ('-' reads stdin)",
+    )
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="serve commands over a socket instead of running the REPL",
+    )
+    parser.add_argument(
+        "--http", action="store_true",
+        help="serve a JSON HTTP API instead of running the REPL",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="address for --serve/--http")
+    parser.add_argument(
+        "--port", type=int,
+        help="port for --serve (default 8765) or --http (default 8080)",
+    )
+    parser.add_argument("--unix", metavar="PATH", help="Unix socket for --serve")
+    parser.add_argument(
+        "--metrics-port", type=int, metavar="PORT",
+        help="also serve Prometheus metrics at http://HOST:PORT/metrics",
+    )
+    parser.add_argument(
+        "--bench", nargs=argparse.REMAINDER, metavar="ARGS",
+        help="run the benchmark suites; ARGS go to 'python -m benchmarks'",
+    )
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="print an import and init-phase timing breakdown, then exit",
+    )
+    return parser.parse_args(argv)
+
 
 # You must put this in your main.py because this forces the program to start when you run it from the command line.
 if __name__ == "__main__":
-    app = App().start()  # Instantiate an instance of App
+    options = parse_args()
+    if options.bench is not None:
+        from benchmarks.runner import main as run_benchmarks
+        sys.exit(run_benchmarks(options.bench))
+    app = App()  # Instantiate an instance of App
+    if options.metrics_port is not None:
+        from app.metrics_exporter import start_metrics_server
+        start_metrics_server(app, options.host, options.metrics_port)
+    if options.profile_startup:
+        print(app.startup_report(_import_seconds))
+    elif options.serve:
+        from app.server import serve
+        serve(app, options.host, options.port or 8765, options.unix)
+    elif options.http:
+        from app.http_api import serve_http
+        serve_http(app, options.host, options.port or 8080)
+    elif options.batch == "-":
+        app.run_batch(sys.stdin)
+    elif options.batch:
+        with open(options.batch, encoding="utf-8") as batch_file:
+            app.run_batch(batch_file)
+    else:
+        app.start()
@@ -0,0 +1,21 @@
+import pytest
+
+from app.history_manager import HistoryManager
+from app.plugin_registry import PluginRegistry
+
+
+@pytest.fixture(autouse=True)
+def history_file(tmp_path, monkeypatch):
+    """Point the history journal at a temporary file for every test."""
+    path = tmp_path / "history.csv"
+    monkeypatch.setattr(HistoryManager, "HISTORY_FILE", str(path))
+    monkeypatch.setattr(HistoryManager, "HISTORY_DB", str(tmp_path / "history.db"))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def plugin_manifest(tmp_path, monkeypatch):
+    """Keep the plugin manifest cache out of the repository's data folder."""
+    path = tmp_path / "plugin_manifest.json"
+    monkeypatch.setattr(PluginRegistry, "MANIFEST_FILE", str(path))
+    return path
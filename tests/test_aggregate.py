@@ -0,0 +1,118 @@
+import io
+import math
+import statistics
+
+import pytest
+
+from app import App
+from app.commands.aggregate import (
+    AggregateCommand, ExactSum, MeanReducer, ProductReducer, SumReducer,
+    VarianceReducer, iter_chunks
+)
+
+
+@pytest.fixture
+def numbers_file(tmp_path):
+    values = [0.1] * 1000 + [1e16, 1.0, -1e16] + [float(i) for i in range(-50, 51)]
+    path = tmp_path / "numbers.txt"
+    path.write_text("\n".join(", ".join(map(repr, values[i:i + 7]))
+                              for i in range(0, len(values), 7)))
+    return str(path), values
+
+
+def test_chunks_split_numbers_across_boundaries():
+    stream = io.StringIO("12.5, 3\n-4e2 7")
+    chunks = list(iter_chunks(stream, chunk_size=3))
+    assert [float(x) for chunk in chunks for x in chunk] == [12.5, 3.0, -400.0, 7.0]
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("sum", math.fsum), ("mean", statistics.fmean),
+    ("min", min), ("max", max),
+])
+def test_reductions_match_exact_results(numbers_file, name, expected, monkeypatch):
+    path, values = numbers_file
+    monkeypatch.setattr("app.commands.aggregate.CHUNK_SIZE", 64)
+    result = AggregateCommand(name).execute(path)
+    assert result == pytest.approx(expected(values), rel=1e-15, abs=1e-12)
+
+
+def test_sum_is_compensated_across_chunks():
+    total = ExactSum()
+    for value in (1e16, 1.0, -1e16, 0.1, 0.2):
+        total.add(value)
+    assert total.value() == math.fsum([1e16, 1.0, -1e16, 0.1, 0.2])
+    total.add(math.inf)
+    assert total.value() == math.inf
+
+
+def test_sum_past_the_float_range_does_not_raise():
+    import numpy as np
+
+    reducer = SumReducer()
+    reducer.update(np.array([1e308, 1e308]))
+    assert reducer.result() == math.inf
+    reducer.update(np.array([-1e308, -1e308, -1e308, 5.0]))
+    assert reducer.result() == -1e308 + 5.0  # back in range, still exact
+    reducer = SumReducer()
+    reducer.update(np.array([-1e308, -1e308]))
+    assert reducer.result() == -math.inf
+
+
+def test_mean_and_variance_near_the_float_limit():
+    import numpy as np
+
+    mean = MeanReducer()
+    mean.update(np.array([1e308, 1e308]))
+    assert mean.result() == 1e308
+    mean.update(np.array([1e308] * 3))
+    assert mean.result() == 1e308
+    variance = VarianceReducer()
+    variance.update(np.array([1e308, 1e308]))
+    variance.update(np.array([1e308]))
+    assert variance.result() == 0.0
+
+
+def test_variance_merges_chunks():
+    import numpy as np
+
+    values = [1e9 + x for x in (4.0, 7.0, 13.0, 16.0, 2.0, 9.0)]
+    reducer = VarianceReducer()
+    for chunk in (values[:1], values[1:4], values[4:]):
+        reducer.update(np.array(chunk))
+    assert reducer.result() == pytest.approx(statistics.variance(values))
+
+
+def test_product_keeps_its_exponent_exactly():
+    import numpy as np
+
+    reducer = ProductReducer()
+    reducer.update(np.array([1e200, 1e200, -1e-250, 2.0]))  # 1e400 midway
+    assert reducer.result() == pytest.approx(-2e150)
+    reducer.update(np.array([1.5] * 2000))
+    assert reducer.result() == -math.inf
+    small = ProductReducer()
+    small.update(np.array([1e-300] * 3 + [1e300] * 3 + [7.0]))
+    assert small.result() == pytest.approx(7.0)
+    small.update(np.array([0.0]))
+    assert small.result() == 0.0
+
+
+def test_commands_read_stdin_and_record_history(monkeypatch, numbers_file):
+    path, _ = numbers_file
+    app = App()
+    monkeypatch.setattr("sys.stdin", io.StringIO("1 2 3 4"))
+    assert app.process_line("product -") == "Result: 24.0"
+    assert app.process_line(f"var {path} {path}").startswith("Result: ")
+    history = app.history_manager.get_history()
+    assert list(history["Operation"]) == ["product", "var"]
+    assert history["Operands"][1] == f"{path} {path}"
+
+
+def test_bad_input_is_reported(tmp_path):
+    app = App()
+    bad = tmp_path / "bad.txt"
+    bad.write_text("1 2 three 4")
+    assert app.process_line(f"sum {bad}") == "Error: Invalid input: not a number: 'three'"
+    assert app.process_line("mean missing.txt").startswith("Error: Cannot read missing.txt")
+    assert app.process_line("max") == "Error: Usage: max <path|->..."
@@ -0,0 +1,55 @@
+import io
+
+import pytest
+
+from app import App
+
+
+def test_run_batch_streams_results_and_commits_history(capsys):
+    app = App()
+    script = io.StringIO("add 1 2\n\n# comment\nmul 2 3\nnope\ndiv 1 0\nsub 5 1\n")
+    out = io.StringIO()
+
+    assert app.run_batch(script, out, commit_every=2) == 5
+
+    assert out.getvalue().splitlines() == [
+        "Result: 3.0",
+        "Result: 6.0",
+        "No such command: nope",
+        "Error: Cannot divide by zero.",
+        "Result: 4.0",
+    ]
+    history = app.history_manager.load_history()
+    assert list(history["Operation"]) == ["add", "mul", "sub"]
+    assert "commands/s" in capsys.readouterr().err
+
+
+def test_run_batch_commits_before_history_commands():
+    app = App()
+    out = io.StringIO()
+    app.run_batch(io.StringIO("add 1 1\ndelhis 0\nhistory\nexit\nadd 9 9\n"), out)
+
+    _, deleted, shown = out.getvalue().split("\nResult: ")
+    assert deleted == "Deleted history entry 0."
+    assert "delhis" in shown and "add" not in shown
+
+
+def test_run_batch_keeps_finished_results_when_interrupted():
+    app = App()
+    out = io.StringIO()
+
+    def lines():
+        yield from ["add 1 2\n"] * 50
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        app.run_batch(lines(), out)
+    assert app.history_manager.count() == 50
+    assert out.getvalue().count("Result: 3.0") == 50
+
+
+def test_save_operations_appends_in_one_write(history_file):
+    app = App()
+    app.history_manager.save_operations([("add", [1, 2], 3.0), ("sub", [3, 1], 2.0)])
+    lines = history_file.read_text().splitlines()[1:]
+    assert [line.rsplit(",", 1)[0] for line in lines] == ["add,1 2,3.0", "sub,3 1,2.0"]
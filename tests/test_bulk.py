@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import App
+
+
+@pytest.fixture
+def handler():
+    return App().command_handler
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("add", [9.0, 3.0]),
+    ("sub", [-5.0, -1.0]),
+    ("mul", [24.0, 0.0]),
+])
+def test_execute_many_matches_execute(handler, name, expected):
+    rows = [[2, 3, 4], [1, 2, 0]]
+    results, invalid = handler.execute_many(name, rows)
+    assert results.tolist() == expected
+    assert results.tolist() == [handler.execute_command(name, *row) for row in rows]
+    assert not invalid.any()
+
+
+def test_execute_many_masks_zero_divisors(handler):
+    results, invalid = handler.execute_many("div", [[8, 2, 2], [1, 0, 3], [9, 3, 1]])
+    assert invalid.tolist() == [False, True, False]
+    assert results[0] == 2.0 and results[2] == 3.0
+    assert np.isnan(results[1])
+
+
+def test_execute_many_masks_missing_operands(handler):
+    results, invalid = handler.execute_many("add", [[1, np.nan], [1, 1]])
+    assert invalid.tolist() == [True, False]
+    assert results[1] == 2.0
+
+
+def test_execute_many_unknown_command(handler):
+    with pytest.raises(KeyError):
+        handler.execute_many("nope", [[1, 2]])
+
+
+def test_bulk_command_writes_result_column(handler, tmp_path):
+    path = tmp_path / "ops.csv"
+    pd.DataFrame({"a": [6, 5], "b": [3, 0]}).to_csv(path, index=False)
+
+    summary = handler.execute_command("bulk", "div", str(path))
+
+    assert summary == f"Evaluated 2 rows with div (1 invalid) -> {path}"
+    written = pd.read_csv(path)
+    assert written["Result"].iloc[0] == 2.0
+    assert written["Invalid"].tolist() == [False, True]
+
+
+def test_bulk_command_skips_non_numeric_columns(handler, tmp_path):
+    path = tmp_path / "ops.csv"
+    pd.DataFrame({"id": ["r1", "r2"], "a": [2, 3], "b": [5.0, 4.0]}).to_csv(path, index=False)
+
+    handler.execute_command("bulk", "mul", str(path))
+    handler.execute_command("bulk", "add", str(path))  # again, over its own output
+
+    written = pd.read_csv(path)
+    assert written["id"].tolist() == ["r1", "r2"]
+    assert written["Result"].tolist() == [7.0, 7.0]
+    assert not written["Invalid"].any()
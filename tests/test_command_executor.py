@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from app import App
+from app.commands import Command, CommandHandler
+from app.command_executor import CommandCancelled, CommandExecutor, CommandTimeout
+
+
+class SleepCommand(Command):
+    execution = "thread"
+
+    def execute(self, *args):
+        time.sleep(args[0] if args else 0)
+        return "slept"
+
+
+class ProcessSleepCommand(SleepCommand):
+    execution = "process"
+
+
+class TimedSleepCommand(SleepCommand):
+    execution = "inline"
+    timeout = 0.05
+
+
+@pytest.fixture
+def handler():
+    handler = CommandHandler(executor=CommandExecutor(max_threads=2, max_processes=1))
+    yield handler
+    handler.executor.shutdown(wait=False)
+
+
+def test_thread_policy_runs_off_the_calling_thread(handler):
+    handler.register_command("sleep", SleepCommand())
+    assert handler.execute_command("sleep", "0.01") == "slept"
+    stats = handler.executor.stats()["thread"]
+    assert stats["completed"] == 1 and stats["in_flight"] == 0
+    assert stats["busy_seconds"] >= 0.01
+    assert 0 < stats["utilization"] <= 1
+
+
+def test_inline_command_with_timeout_is_abandoned(handler):
+    handler.register_command("sleep", TimedSleepCommand())
+    started = time.perf_counter()
+    with pytest.raises(CommandTimeout, match="timed out"):
+        handler.execute_command("sleep", "1")
+    assert time.perf_counter() - started < 0.5
+    assert handler.executor.stats()["thread"]["timeouts"] == 1
+
+
+def test_process_timeout_terminates_the_worker(handler):
+    handler.register_command("sleep", ProcessSleepCommand())
+    started = time.perf_counter()
+    with pytest.raises(CommandTimeout):
+        handler.executor.run(ProcessSleepCommand(), (5,), timeout=0.2)
+    assert time.perf_counter() - started < 3
+    # A fresh pool replaces the terminated one.
+    assert handler.execute_command("sleep", "0") == "slept"
+    assert handler.executor.stats()["process"]["timeouts"] == 1
+
+
+def test_app_reports_timeouts_and_worker_stats():
+    app = App()
+    app.command_handler.register_command("nap", TimedSleepCommand())
+    assert app.process_line("nap 1") == "Error: Command timed out after 0.05s."
+    assert app.execute_request({"command": "nap", "args": [1]})["ok"] is False
+    report = app.command_handler.execute_command("workers")
+    assert "thread pool (running)" in report and "timeouts 2" in report
+    assert issubclass(CommandTimeout, CommandCancelled)
+    app.command_handler.executor.shutdown(wait=False)
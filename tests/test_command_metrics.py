@@ -0,0 +1,97 @@
+import io
+import threading
+import time
+
+import pytest
+
+from app import App
+from app.commands import Command, CommandHandler
+from app.command_signature import Signature
+from app.command_metrics import BUCKETS, CommandMetrics, CommandProfiler, LatencyHistogram
+
+
+class NapCommand(Command):
+    signature = Signature(varargs=str)
+
+    def execute(self, *args):
+        time.sleep(float(args[0]) if args else 0)
+        return "done"
+
+
+def test_histogram_percentiles_use_fixed_buckets():
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.observe(0.0002)
+    for _ in range(10):
+        histogram.observe(0.3)
+    assert len(histogram.counts) == len(BUCKETS) + 1
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert 0.0001 <= summary["p50"] <= 0.00025
+    assert 0.25 <= summary["p95"] <= 0.3
+    assert summary["p99"] <= summary["max"] == 0.3
+    assert LatencyHistogram().percentile(0.5) == 0.0
+
+
+def test_handler_records_calls_errors_and_stages():
+    app = App()
+    app.process_line("add 1 2")
+    app.process_line("add 3 4")
+    app.process_line("div 1 0")
+    app.process_line("add x")
+
+    snapshot = app.command_handler.metrics.snapshot()
+    assert (snapshot["add"]["calls"], snapshot["add"]["errors"]) == (3, 1)
+    assert snapshot["add"]["execute"].count == 2
+    assert snapshot["add"]["persist"].count == 2
+    assert snapshot["div"]["errors"] == 1
+
+    report = app.command_handler.execute_command("stats")
+    assert report.splitlines()[0].startswith("command")
+    assert any(line.startswith("add") for line in report.splitlines())
+    assert app.command_handler.execute_command("stats", "reset") == "Command statistics reset."
+    assert "add" not in app.command_handler.metrics.snapshot()
+
+
+def test_batch_commits_charge_persist_time_per_command():
+    app = App()
+    app.run_batch(io.StringIO("add 1 2\nmul 2 3\nadd 5 5\n"), out=io.StringIO())
+    snapshot = app.command_handler.metrics.snapshot()
+    assert snapshot["add"]["persist"].count == 2
+    assert snapshot["mul"]["persist"].count == 1
+
+
+def test_recording_waits_for_a_snapshot_in_progress():
+    metrics = CommandMetrics()
+    metrics.record_call("add", 0.001, 0.001)
+    recorder = threading.Thread(target=metrics.observe, args=("add", "persist", 0.001))
+    with metrics._lock:
+        recorder.start()
+        recorder.join(0.05)
+        assert recorder.is_alive()
+    recorder.join()
+    assert metrics.snapshot()["add"]["persist"].count == 1
+
+
+def test_profiler_samples_commands_after_they_run_slow(tmp_path):
+    handler = CommandHandler()
+    handler.register_command("nap", NapCommand())
+    handler.profiler = CommandProfiler(0.01, str(tmp_path), sample_every=2)
+
+    handler.execute_command("nap", "0.02")  # marks nap as slow
+    assert handler.profiler.saved == []
+    handler.execute_command("nap", "0.02")  # first sample, still slow
+    handler.execute_command("nap", "0.02")  # skipped by sampling
+    handler.execute_command("nap", "0")     # sampled, but fast: not saved
+    assert len(handler.profiler.saved) == 1
+    assert handler.profiler.saved[0].startswith(str(tmp_path / "nap-"))
+
+
+def test_profiler_is_enabled_from_the_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROFILE_SLOW_COMMANDS_MS", "50")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    profiler = App().command_handler.profiler
+    assert profiler.threshold == pytest.approx(0.05)
+    assert profiler.directory == str(tmp_path)
+    monkeypatch.delenv("PROFILE_SLOW_COMMANDS_MS")
+    assert App().command_handler.profiler is None
@@ -0,0 +1,50 @@
+import pytest
+
+from app import App
+from app.command_signature import Signature
+
+
+def test_default_signature_converts_any_number_of_floats():
+    convert = Signature(varargs=float).compile("add")
+    assert convert(("1", "2.5", 3)) == (1.0, 2.5, 3.0)
+    assert convert(()) == ()
+    with pytest.raises(ValueError, match="Arguments must be numbers"):
+        convert(("1", "x"))
+
+
+def test_fixed_and_variadic_arguments_are_checked_in_one_pass():
+    convert = Signature(int, str, varargs=float).compile("demo")
+    assert convert(("3", "name", "1", "2")) == (3, "name", 1.0, 2.0)
+    with pytest.raises(ValueError, match="argument 1 of demo must be an integer. Got: 3.5"):
+        convert(("3.5", "name"))
+    with pytest.raises(ValueError, match="demo takes at least 2 arguments, got 1"):
+        convert(("3",))
+
+
+def test_arity_messages():
+    assert Signature().describe_count() == "no arguments"
+    assert Signature(int).describe_count() == "1 argument"
+    assert Signature(float, float, min_args=1).describe_count() == "1 to 2 arguments"
+    assert Signature(varargs=str).describe_count() == "any number of arguments"
+    with pytest.raises(ValueError, match="greet takes no arguments, got 1"):
+        Signature().compile("greet")(("x",))
+
+
+def test_raw_signature_passes_strings_through():
+    convert = Signature(varargs=str).compile("history")
+    assert convert(("--op", "add")) == ("--op", "add")
+    assert convert((2.5, "x")) == ("2.5", "x")
+
+
+def test_app_commands_get_typed_arguments():
+    app = App()
+    assert app.process_line("sub") == "Error: Invalid input: sub takes at least 1 argument, got 0."
+    assert app.process_line("square 3 4") == (
+        "Error: Invalid input: square takes 1 argument, got 2."
+    )
+    assert app.process_line("delhis x") == (
+        "Error: Invalid input: argument 1 of delhis must be an integer. Got: x"
+    )
+    assert app.process_line("eval sub()").startswith("Error: Invalid input: sub takes")
+    with pytest.raises(ValueError, match="square takes 1 argument, got 2"):
+        app.command_handler.execute_many("square", [[1, 2], [3, 4]])
@@ -0,0 +1,65 @@
+import pytest
+
+from app import App
+from app.commands.expression import compile_expression
+
+
+@pytest.fixture
+def app():
+    return App()
+
+
+def test_eval_collapses_multi_step_calculation(app):
+    assert app.process_line("eval 2*(3+4)/5") == "Result: 2.8"
+    history = app.history_manager.get_history()
+    assert list(history["Operation"]) == ["eval"]
+    assert history["Operands"][0] == "2*(3+4)/5"
+
+
+def test_calc_alias_and_spaces(app):
+    assert app.command_handler.execute_command("calc", "2", "**", "3", "-", "-1") == 9.0
+
+
+def test_variables_reuse_compiled_form(app):
+    compile_expression.cache_clear()
+    handler = app.command_handler
+    assert handler.execute_command("eval", "x*x+y", "x=3", "y=1") == 10.0
+    assert handler.execute_command("eval", "x*x+y", "x=4", "y=0") == 16.0
+    info = compile_expression.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+
+def test_calls_registered_commands(app):
+    assert app.command_handler.execute_command("eval", "square(3)+add(1,2,3)") == 15.0
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("2 +", "Invalid expression"),
+    ("__import__('os')", "Unsupported expression syntax"),
+    ("y+1", "Unbound variable: y"),
+    ("nope(1)", "Unknown function: nope"),
+    ("history()", "cannot be used in an expression"),
+    ("10**10**10", "Result too large"),
+    ("(-8)**0.5", "not a real number"),
+    ("-" * 990 + "1", "nested too deeply"),
+    ("-" * 100000 + "1", "nested too deeply"),
+])
+def test_invalid_expressions_raise_value_error(app, expression, message):
+    with pytest.raises(ValueError, match=message):
+        app.command_handler.execute_command("eval", expression)
+
+
+def test_impure_commands_are_not_run_from_expressions(app, capsys):
+    app.process_line("add 1 2")
+    assert app.process_line("eval clrhis()") == (
+        "Error: Function clrhis cannot be used in an expression."
+    )
+    assert app.process_line("eval greet()").startswith("Error: Function greet")
+    assert "Hello" not in capsys.readouterr().out
+    assert app.history_manager.count() == 1
+
+
+def test_calls_use_the_result_cache_and_metrics(app):
+    app.command_handler.execute_command("eval", "square(4)+square(4)")
+    assert app.command_handler.result_cache.stats()["hits"] == 1
+    assert app.command_handler.metrics.snapshot()["square"]["calls"] == 2
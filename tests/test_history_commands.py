@@ -0,0 +1,100 @@
+import pytest
+
+from app import App
+from app.history_manager import HistoryManager
+
+
+def test_history_commands_share_app_history_manager():
+    app = App()
+    handler = app.command_handler
+    for name in ("history", "clrhis", "delhis"):
+        assert handler.commands[name].history_manager is app.history_manager
+
+
+def test_history_view_reflects_writes_through_any_command():
+    app = App()
+    handler = app.command_handler
+    assert handler.execute_command("history") == "No history available."
+
+    app.history_manager.save_operation("add", ["2", "4"], 6.0)
+    assert "add" in handler.execute_command("history")
+
+    assert handler.execute_command("delhis", "0") == "Deleted history entry 0."
+    assert handler.execute_command("history") == "No history available."
+
+
+def test_history_view_is_cached_until_write(monkeypatch):
+    app = App()
+    app.history_manager.save_operation("add", ["1", "1"], 2.0)
+    history_command = app.command_handler.commands["history"]
+    first = history_command.execute()
+
+    def fail():
+        raise AssertionError("history re-rendered without a write")
+    monkeypatch.setattr(app.history_manager, "get_history", fail)
+    assert history_command.execute() is first
+
+
+def test_history_filters():
+    app = App()
+    for line in ("add 1 2", "mul 2 3", "add 3 4"):
+        app.process_line(line)
+    handler = app.command_handler
+
+    output = handler.execute_command("history", "--op", "add", "--limit", "1")
+    assert output.splitlines()[1].startswith("2 ")
+    assert "mul" not in output
+    assert handler.execute_command("history", "--since", "2999-01-01") == \
+        "No matching history entries."
+    with pytest.raises(ValueError, match="Unknown option"):
+        handler.execute_command("history", "--bogus", "1")
+
+
+@pytest.fixture
+def filled_app():
+    app = App()
+    app.history_manager.save_operations(
+        [("add", [i, 1], float(i + 1)) for i in range(25)]
+    )
+    return app
+
+
+def test_history_tail_and_page(filled_app):
+    handler = filled_app.command_handler
+    tail = handler.execute_command("history", "--tail", "2").splitlines()
+    assert [line.split()[0] for line in tail[1:]] == ["23", "24"]
+
+    page = handler.execute_command("history", "--page", "2", "--size", "10").splitlines()
+    assert [int(line.split()[0]) for line in page[1:]] == list(range(10, 20))
+    assert handler.execute_command("history", "--page", "9") == \
+        "No history entries on page 9."
+
+
+def test_history_stream_prints_every_row(filled_app, capsys):
+    assert filled_app.process_line("history --stream --size 10") is None
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 25
+    assert lines[-1].split()[:3] == ["24", "add", "24"]
+
+
+def test_history_output_is_not_recorded(filled_app):
+    filled_app.process_line("history --tail 1")
+    assert filled_app.history_manager.count() == 25
+
+
+def test_large_history_defaults_to_last_page(filled_app, monkeypatch):
+    history = filled_app.command_handler.commands["history"]
+    monkeypatch.setattr(history, "FULL_VIEW_LIMIT", 10)
+    output = history.execute()
+    assert output.startswith("Showing the last 20 of 25 entries")
+    assert len(output.splitlines()) == 22
+
+
+def test_history_view_shows_rows_another_process_appended():
+    app = App()
+    app.history_manager.save_operation("add", ["1", "1"], 2.0)
+    history_command = app.command_handler.commands["history"]
+    assert "mul" not in history_command.execute()
+
+    HistoryManager().save_operation("mul", ["2", "3"], 6.0)
+    assert "mul" in history_command.execute()
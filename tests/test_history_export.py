@@ -0,0 +1,54 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from app import App
+from app.history_manager import HistoryManager
+
+
+@pytest.fixture
+def manager():
+    manager = HistoryManager()
+    manager.store.append([
+        ("add", "2 4", 6.0, "2026-01-01T10:00:00"),
+        ("menu", "", "Available Commands:", ""),
+    ])
+    return manager
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_export_round_trip_with_typed_columns(manager, tmp_path, fmt):
+    path = tmp_path / f"history.{fmt}"
+    assert manager.export_history(str(path)) == 2
+
+    table = HistoryManager.read_export(str(path))
+    assert table.column("Operation").to_pylist() == ["add", "menu"]
+    assert table.column("Operands").to_pylist() == [[2.0, 4.0], []]
+    assert table.schema.field("Operands").type == pa.list_(pa.float64())
+    assert table.column("Result").to_pylist() == [6.0, None]
+    assert table.column("ResultText").to_pylist() == [None, "Available Commands:"]
+    assert table.column("Timestamp").null_count == 1
+
+
+def test_arrow_reload_is_memory_mapped(manager, tmp_path):
+    path = tmp_path / "history.arrow"
+    manager.export_history(str(path), "arrow")
+    table = HistoryManager.read_export(str(path))
+    buffer = table.column("Result").chunk(0).buffers()[1]
+    assert not buffer.is_mutable  # backed by the read-only file mapping
+
+
+def test_history_export_command(tmp_path, monkeypatch):
+    app = App()
+    app.process_line("add 1 2")
+    history = app.command_handler.commands["history"]
+    monkeypatch.setattr(history, "EXPORT_DIR", str(tmp_path))
+
+    assert app.command_handler.execute_command("history", "export", "--format", "arrow") == \
+        f"Exported 1 history entries to {tmp_path}/history.arrow."
+    target = tmp_path / "out.parquet"
+    assert app.command_handler.execute_command("history", "export", str(target)).endswith(
+        f"to {target}."
+    )
+    with pytest.raises(ValueError, match="Unknown export format"):
+        app.command_handler.execute_command("history", "export", "--format", "xml")
@@ -0,0 +1,182 @@
+import pytest
+
+from app.history_manager import CsvHistoryStore, HistoryManager
+
+HEADER = "Operation,Operands,Result,Timestamp"
+
+
+def records(path):
+    """Journal lines without their timestamps."""
+    return [line.rsplit(",", 1)[0] for line in path.read_text().splitlines()[1:]]
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def manager(request):
+    return HistoryManager(request.param)
+
+
+def test_save_operation_appends_single_record(history_file):
+    manager = HistoryManager()
+    manager.save_operation("add", [2, 4], 6.0)
+    manager.save_operation("mul", [3, 3], 9.0)
+
+    assert history_file.read_text().splitlines()[0] == HEADER
+    assert records(history_file) == ["add,2 4,6.0", "mul,3 3,9.0"]
+
+
+def test_history_is_loaded_lazily(history_file):
+    HistoryManager().save_operation("add", [1, 2], 3.0)
+
+    manager = HistoryManager()
+    assert not manager.is_loaded
+    manager.save_operation("sub", [5, 1], 4.0)
+    assert not manager.is_loaded
+
+    history = manager.get_history()
+    assert manager.is_loaded
+    assert list(history["Operation"]) == ["add", "sub"]
+    assert list(history["Result"]) == [3.0, 4.0]
+
+
+def test_delete_appends_tombstone_and_replays(history_file):
+    manager = HistoryManager()
+    for i in range(4):
+        manager.save_operation("add", [i, i], float(2 * i))
+
+    assert manager.delete_history_entry(1)
+    assert "__deleted__,1,," in history_file.read_text()
+
+    reloaded = HistoryManager()
+    assert list(reloaded.get_history()["Result"]) == [0.0, 4.0, 6.0]
+    assert not reloaded.delete_history_entry(3)
+
+
+def test_compaction_drops_tombstones(history_file):
+    manager = HistoryManager()
+    manager.save_operation("add", [1, 1], 2.0)
+    manager.save_operation("add", [2, 2], 4.0)
+    manager.delete_history_entry(0)
+    manager.delete_history_entry(0)
+
+    assert history_file.read_text().splitlines() == [HEADER]
+    assert HistoryManager().get_history().empty
+
+
+def test_clear_history_truncates_journal(history_file):
+    manager = HistoryManager()
+    manager.save_operation("add", [1, 1], 2.0)
+    HistoryManager().clear_history()
+
+    assert history_file.read_text().splitlines() == [HEADER]
+    assert manager.load_history().empty
+
+
+def test_legacy_journal_is_migrated_on_first_write(history_file):
+    history_file.write_text("Operation,Operands,Result\nadd,2 4,6.0\n")
+    manager = HistoryManager()
+    manager.save_operation("sub", [4, 1], 3.0)
+
+    assert history_file.read_text().splitlines()[:2] == [HEADER, "add,2 4,6.0,"]
+    assert list(HistoryManager().get_history()["Operation"]) == ["add", "sub"]
+
+
+def test_backends_share_behaviour(manager):
+    manager.save_operations([("add", [1, 2], 3.0), ("mul", [2, 3], 6.0), ("add", [4, 4], 8.0)])
+    assert manager.count() == 3
+    assert manager.delete_history_entry(0)
+    assert not manager.delete_history_entry(5)
+    assert list(manager.get_history()["Result"]) == [6.0, 8.0]
+    manager.clear_history()
+    assert manager.get_history().empty
+
+
+def test_query_filters(manager):
+    manager.store.append([
+        ("add", "1 1", 2.0, "2026-01-01T10:00:00"),
+        ("mul", "2 2", 4.0, "2026-02-01T10:00:00"),
+        ("add", "3 3", 6.0, "2026-03-01T10:00:00"),
+        ("add", "4 4", 8.0, "2026-04-01T10:00:00"),
+    ])
+
+    adds = manager.query(operation="add")
+    assert list(adds.index) == [0, 2, 3]
+    recent = manager.query(operation="add", since="2026-02-15", limit=1)
+    assert list(recent.index) == [3]
+    assert list(recent["Result"]) == [8.0]
+    assert manager.query(since="2027-01-01").empty
+
+    with pytest.raises(ValueError, match="Invalid timestamp"):
+        manager.query(since="yesterday")
+
+
+def test_sqlite_backend_uses_indexes(manager):
+    if manager.backend != "sqlite":
+        pytest.skip("SQLite only")
+    plan = manager.store.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM history WHERE operation = ? ORDER BY id DESC",
+        ("add",),
+    ).fetchall()
+    assert "idx_history_operation" in str(plan)
+    mode = manager.store.connection.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown history backend"):
+        HistoryManager("parquet")
+
+
+def test_sqlite_query_positions_take_a_fixed_number_of_statements():
+    manager = HistoryManager("sqlite")
+    manager.save_operations([(("add", "mul")[i % 3 == 0], [i], float(i)) for i in range(3000)])
+    manager.delete_history_entry(1)
+    statements = []
+    manager.store.connection.set_trace_callback(statements.append)
+
+    adds = manager.query(operation="add")
+    assert len(adds) == 1999
+    assert list(adds.index[:3]) == [1, 3, 4]  # entry 1 was deleted, so positions shift
+    assert list(adds["Result"][:3]) == [2.0, 4.0, 5.0]
+    assert len(statements) <= 3  # not one COUNT per match
+
+    statements.clear()
+    assert list(manager.query(operation="mul", limit=2).index) == [2993, 2996]
+    assert len(statements) <= 3
+
+
+def test_cached_views_pick_up_rows_other_processes_wrote(manager):
+    manager.save_operation("add", [1, 2], 3.0)
+    assert list(manager.get_history()["Operation"]) == ["add"]
+    version = manager.refresh()
+    assert manager.refresh() == version  # nothing new, caches stay valid
+
+    other = HistoryManager(manager.backend)  # another process, same file
+    other.save_operation("mul", [2, 3], 6.0)
+    assert manager.refresh() > version
+    assert list(manager.get_history()["Operation"]) == ["add", "mul"]
+
+
+def test_paging_an_unloaded_journal_does_not_parse_it(history_file, monkeypatch):
+    writer = HistoryManager()
+    writer.save_operations([("add", [i, 1], i + 1.0) for i in range(50)])
+    for index in (3, 10, 47):
+        writer.delete_history_entry(index)
+    writer.save_operation("eval", ["x*2,1", "x=3"], 6.0)  # needs CSV quoting
+    writer.save_operation("menu", [], 'Commands:\n - add\n - "delhis"\n')
+    writer.save_operation("add", [1, 1], 2.0)
+    loaded = HistoryManager()
+    loaded.count()
+    expected = loaded.store.slice(0, 100)
+    assert len(expected) == 50 and expected[48][1] == "menu"
+
+    # tiny blocks, so block edges fall inside the multi-line result
+    monkeypatch.setattr(CsvHistoryStore, "SCAN_BLOCK", 16)
+    reader = HistoryManager()
+    assert reader.page_rows(2, 5) == expected[5:10]
+    assert reader.page_rows(10, 5) == expected[45:]
+    assert list(reader.tail(4).itertuples(index=False)) == [row[1:] for row in expected[-4:]]
+    assert list(reader.tail(4).index) == [46, 47, 48, 49]
+    assert reader.store.tail(60) == expected
+    assert [row for batch in reader.iter_rows(7) for row in batch] == expected
+    assert not reader.is_loaded
+    assert reader.count() == 50 and reader.is_loaded  # a full read still loads
@@ -0,0 +1,60 @@
+import pytest
+
+from app.history_manager import HistoryManager
+from app.history_rows import CompactRows
+
+
+def filled(count=6):
+    rows = CompactRows()
+    for i in range(count):
+        rows.append(i, ("add", "mul")[i % 2], f"{i} {i + 1}", i * 1.5,
+                    f"2026-01-0{1 + i // 2}T00:00:00")
+    return rows
+
+
+def test_rows_round_trip_through_the_columns():
+    rows = filled()
+    rows.append(6, "history", "", "not a number", "2026-01-04T00:00:00")
+    rows.append(7, "add", "", 10 ** 30, "2026-01-04T00:00:00")
+    assert len(rows) == 8
+    assert rows.rows(0, 2) == [
+        ("add", "0 1", 0.0, "2026-01-01T00:00:00"),
+        ("mul", "1 2", 1.5, "2026-01-01T00:00:00"),
+    ]
+    assert rows.row(6) == ("history", "", "not a number", "2026-01-04T00:00:00")
+    assert rows[-1].result == 10 ** 30
+    record = rows[3]
+    assert (record.operation, record.operands, record.result) == ("mul", "3 4", 4.5)
+    with pytest.raises(AttributeError):
+        record.extra = 1  # views have __slots__
+    assert [r.operation for r in rows][:3] == ["add", "mul", "add"]
+
+
+def test_find_filters_by_interned_operation_and_timestamp():
+    rows = filled()
+    assert rows.find("mul") == [1, 3, 5]
+    assert rows.find("add", since="2026-01-02") == [2, 4]
+    assert rows.find("div") == []
+
+
+def test_pop_and_remove_ids_keep_operand_offsets_consistent():
+    rows = filled()
+    rows.append(6, "sub", "x", "text", "2026-01-04T00:00:00")
+    assert rows.pop(1) == 1
+    assert [row[1] for row in rows.rows()] == ["0 1", "2 3", "3 4", "4 5", "5 6", "x"]
+    rows.remove_ids({0, 4})
+    assert [row[1] for row in rows.rows()] == ["2 3", "3 4", "5 6", "x"]
+    rows.renumber()
+    assert [rows.row_id(i) for i in range(len(rows))] == [0, 1, 2, 3]
+    assert rows.row(3)[2] == "text"
+
+
+def test_csv_store_keeps_its_history_in_compact_rows(history_file):
+    manager = HistoryManager()
+    manager.save_operations([("add", [i, 1], i + 1.0) for i in range(100)])
+    manager.delete_history_entry(0)
+    reloaded = HistoryManager()
+    assert reloaded.store._rows is None  # not parsed until first read
+    assert reloaded.count() == 99
+    assert isinstance(reloaded.store._rows, CompactRows)
+    assert reloaded.page_rows(1, 2)[0][1:4] == ("add", "1 1", 2.0)
@@ -0,0 +1,91 @@
+import csv
+import multiprocessing
+
+import pytest
+
+from app import App
+from app.history_manager import HistoryManager
+
+
+def journal_operations(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row[0] for row in list(csv.reader(f))[1:]]
+
+
+def test_interval_policy_queues_writes_but_reads_see_them(history_file):
+    manager = HistoryManager(durability="interval", flush_interval_ms=60000)
+    manager.save_operation("add", [1, 2], 3.0)
+    manager.save_operation("sub", [5, 1], 4.0)
+    assert not history_file.exists()
+    assert manager.writer.pending == 2
+
+    assert manager.count() == 2  # reads flush the queue first
+    assert journal_operations(history_file) == ["add", "sub"]
+    assert manager.writer.flushes == 1
+    manager.close()
+
+
+def test_exit_policy_commits_everything_as_one_group_on_close(history_file):
+    manager = HistoryManager(durability="exit")
+    manager.save_operations([("mul", [i, 2], i * 2.0) for i in range(500)])
+    manager.save_operation("div", [1, 2], 0.5)
+    assert not history_file.exists()
+
+    manager.close()
+    assert len(journal_operations(history_file)) == 501
+    assert manager.writer.flushes == 1
+    with pytest.raises(ValueError, match="closed"):
+        manager.save_operation("add", [1, 1], 2.0)
+
+
+def test_unknown_durability_policy_is_rejected():
+    with pytest.raises(ValueError, match="durability"):
+        HistoryManager(durability="sometimes")
+
+
+def _append_many(path, name, count):
+    HistoryManager.HISTORY_FILE = path
+    manager = HistoryManager()
+    for i in range(count):
+        manager.save_operation(name, [i], float(i))
+
+
+def test_processes_append_to_a_shared_journal_safely(history_file):
+    observer = HistoryManager()
+    observer.save_operation("first", [0], 0.0)
+    assert observer.count() == 1
+
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_append_many, args=(str(history_file), name, 200))
+        for name in ("left", "right")
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    operations = journal_operations(history_file)
+    assert len(operations) == 401
+    assert operations.count("left") == operations.count("right") == 200
+    # The observer picks up the other processes' rows before touching ids.
+    assert observer.count() == 401
+    assert observer.delete_history_entry(400)
+    assert HistoryManager().count() == 400
+
+
+def test_repl_flushes_queued_history_on_keyboard_interrupt(history_file, monkeypatch):
+    monkeypatch.setenv("HISTORY_DURABILITY", "exit")
+    app = App()
+    inputs = iter(["add 1 2"])
+
+    def fake_input(_prompt):
+        try:
+            return next(inputs)
+        except StopIteration:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr("builtins.input", fake_input)
+    with pytest.raises(SystemExit):
+        app.start()
+    assert journal_operations(history_file) == ["add"]
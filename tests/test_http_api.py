@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from app import App
+from app.http_api import CalculatorHTTPServer
+
+
+@pytest.fixture
+def http_server():
+    """Run a CalculatorHTTPServer on a free port in a background thread."""
+    app = App()
+    server = CalculatorHTTPServer(app, ("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield app, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    thread.join(5)
+
+
+def request(url, payload=None):
+    data = None if payload is None else json.dumps(payload).encode()
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_execute(http_server):
+    _, base = http_server
+    assert request(f"{base}/execute", {"command": "add", "args": [1, 2]}) == (
+        200, {"ok": True, "result": 3.0})
+    status, body = request(f"{base}/execute", {"command": "div", "args": [1, 0]})
+    assert status == 400 and "divide by zero" in body["error"]
+    status, body = request(f"{base}/execute", {"command": "nope"})
+    assert status == 400 and "No such command" in body["error"]
+    assert request(f"{base}/nowhere", {})[0] == 404
+
+
+def test_batch_saves_history_once(http_server, monkeypatch):
+    app, base = http_server
+    calls = []
+    save = app.history_manager.save_operations
+    monkeypatch.setattr(app.history_manager, "save_operations",
+                        lambda records: calls.append(len(records)) or save(records))
+
+    items = [{"command": "mul", "args": [i, 2]} for i in range(100)]
+    items.append({"command": "div", "args": [1, 0]})
+    status, body = request(f"{base}/batch", items)
+
+    assert status == 200
+    assert [r["result"] for r in body["results"][:3]] == [0.0, 2.0, 4.0]
+    assert body["results"][-1]["ok"] is False
+    assert calls == [100]
+    assert request(f"{base}/batch", {"command": "add"})[0] == 400
+
+
+def test_history_paging(http_server):
+    app, base = http_server
+    app.history_manager.save_operations([("add", "1 2", 3.0), ("sub", "5 1", 4.0)])
+    status, body = request(f"{base}/history?page=2&size=1")
+    assert status == 200
+    assert body["total"] == 2
+    assert [(e["Index"], e["Operation"]) for e in body["entries"]] == [(1, "sub")]
+    assert request(f"{base}/history?page=0")[0] == 400
+
+
+def test_history_stream_is_rejected(http_server):
+    _, base = http_server
+    status, body = request(f"{base}/execute", {"command": "history", "args": ["--stream"]})
+    assert status == 400 and "not available here" in body["error"]
+
+
+def test_batch_per_item_cost(http_server):
+    _, base = http_server
+    items = [{"command": "add", "args": [i, 1]} for i in range(5000)]
+    started = time.perf_counter()
+    status, body = request(f"{base}/batch", items)
+    elapsed = time.perf_counter() - started
+    assert status == 200 and len(body["results"]) == 5000
+    assert elapsed / len(items) < 0.001
+
+
+def test_metrics_route(http_server):
+    _, base = http_server
+    request(f"{base}/execute", {"command": "add", "args": [1, 2]})
+    with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+        text = response.read().decode()
+    assert 'calculator_command_calls_total{command="add"} 1.0' in text
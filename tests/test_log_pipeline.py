@@ -0,0 +1,97 @@
+import logging
+
+import pytest
+
+from app import App
+from app.log_pipeline import (
+    RateLimitFilter, SamplingFilter, install_queue_logging, uninstall_queue_logging
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.flushes = 0
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+    def flush(self):
+        self.flushes += 1
+
+
+@pytest.fixture
+def sink():
+    root = logging.getLogger()
+    handler = ListHandler()
+    level = root.level
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    yield handler
+    uninstall_queue_logging()
+    root.removeHandler(handler)
+    root.setLevel(level)
+
+
+def record(name="app.test", level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 0, "message", None, None)
+
+
+def test_records_reach_handlers_in_order_through_the_queue(sink):
+    listener = install_queue_logging()
+    logger = logging.getLogger("app.test")
+    for i in range(1000):
+        logger.info("line %d", i)
+    assert sink not in logging.getLogger().handlers
+    uninstall_queue_logging()
+
+    assert sink in logging.getLogger().handlers
+    assert sink.messages == [f"line {i}" for i in range(1000)]
+    assert listener.batches < 1000
+    assert sink.flushes == listener.batches  # one flush per batch, not per record
+
+
+def test_full_queue_drops_records_instead_of_blocking(sink):
+    listener = install_queue_logging(queue_size=10)
+    listener.stop()  # nothing drains the queue now
+    logger = logging.getLogger("app.test")
+    for i in range(50):
+        logger.info("line %d", i)
+    listener.start()
+    uninstall_queue_logging()
+
+    assert sink.messages[:10] == [f"line {i}" for i in range(10)]
+    assert "dropped 40 records" in sink.messages[-1]
+
+
+def test_rate_limit_keeps_a_burst_per_logger_and_all_warnings():
+    log_filter = RateLimitFilter(rate=0.001, burst=3)
+    passed = [log_filter.filter(record("noisy")) for _ in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    assert log_filter.filter(record("quiet"))
+    assert log_filter.filter(record("noisy", logging.WARNING))
+    assert log_filter.dropped == 7
+
+
+def test_sampling_applies_only_to_the_named_loggers():
+    log_filter = SamplingFilter(every=4, loggers=["app.plugins"])
+    sampled = [log_filter.filter(record("app.plugins.data")) for _ in range(8)]
+    assert sampled == [True, False, False, False] * 2
+    assert all(log_filter.filter(record("app")) for _ in range(8))
+    assert log_filter.filter(record("app.plugins.data", logging.ERROR))
+
+
+def test_app_installs_the_pipeline_from_the_environment(sink, monkeypatch):
+    monkeypatch.setenv("LOG_QUEUE", "1")
+    monkeypatch.setenv("LOG_SAMPLE_EVERY", "1000")
+    monkeypatch.setenv("LOG_SAMPLE_LOGGERS", "app.plugins.data")
+    app = App()  # logging.conf replaces the root handlers, so listen in directly
+    app.log_listener.handlers += (sink,)
+    app.command_handler.execute_command("data")
+    uninstall_queue_logging()
+
+    data_lines = [message for message in sink.messages
+                  if "example" in message or "State" in message]
+    assert data_lines == ["List example: ['apple', 'banana', 'cherry']"]
+    assert "Plugin command data loaded." in sink.messages  # other loggers are not sampled
@@ -0,0 +1,70 @@
+import urllib.request
+
+from app import App
+from app.metrics_exporter import MetricsTextfile, render, start_metrics_server
+
+
+def parse(text):
+    """Map 'name{labels}' to value for every sample line."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            samples[key] = float(value)
+    return samples
+
+
+def test_render_reports_commands_history_and_startup():
+    app = App()
+    app.process_line("add 1 2")
+    app.process_line("div 1 0")
+    app.process_line("history")  # loads the history
+    app.command_handler.plugin_load_seconds["greet"] = 0.25
+
+    text = render(app)
+    samples = parse(text)
+    assert "# TYPE calculator_command_latency_seconds histogram" in text
+    assert samples['calculator_command_calls_total{command="add"}'] == 1
+    assert samples['calculator_command_errors_total{command="div"}'] == 1
+    assert samples['calculator_command_latency_seconds_count{command="add",stage="persist"}'] == 1
+    assert samples['calculator_command_latency_seconds_bucket{command="add",stage="execute",le="+Inf"}'] == 1
+    assert samples['calculator_history_entries{backend="csv"}'] == 1
+    assert samples['calculator_history_flush_seconds_count{backend="csv"}'] == 1
+    assert samples['calculator_plugin_load_seconds{plugin="greet"}'] == 0.25
+    assert 'calculator_startup_phase_seconds{phase="plugins"}' in samples
+
+
+def test_history_size_is_not_loaded_just_for_a_scrape():
+    app = App()
+    render(app)
+    assert not app.history_manager.is_loaded
+
+
+def test_textfile_is_replaced_atomically(tmp_path):
+    app = App()
+    path = tmp_path / "textfile" / "calculator.prom"
+    exporter = MetricsTextfile(app, str(path), interval=60).start()
+    app.process_line("mul 2 3")
+    exporter.stop()  # writes the final numbers
+    samples = parse(path.read_text())
+    assert samples['calculator_command_calls_total{command="mul"}'] == 1
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_metrics_endpoint(monkeypatch, tmp_path):
+    monkeypatch.setenv("METRICS_TEXTFILE", str(tmp_path / "app.prom"))
+    app = App()
+    assert (tmp_path / "app.prom").exists() or app.metrics_textfile is not None
+    app.metrics_textfile.stop()
+
+    server = start_metrics_server(app, port=0)
+    try:
+        app.process_line("sub 3 1")
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            samples = parse(response.read().decode())
+        assert samples['calculator_command_calls_total{command="sub"}'] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
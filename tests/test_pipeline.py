@@ -0,0 +1,50 @@
+import io
+
+from app import App
+
+
+def operations(app):
+    history = app.history_manager.load_history()
+    return list(zip(history["Operation"], history["Operands"], history["Result"]))
+
+
+def test_pipeline_feeds_each_result_into_the_next_stage():
+    app = App()
+    assert app.process_line("add 2 3 | mul 4 | div 2") == "Result: 10.0"
+    assert app.process_line("sub 100 ans | square") == "Result: 8100.0"
+    assert app.process_line("add ans ans") == "Result: 16200.0"
+    assert app.last_result == 16200.0
+
+
+def test_pipeline_is_saved_with_one_write_as_one_entry(monkeypatch):
+    app = App()
+    writes = []
+    save = app.history_manager.save_operations
+    monkeypatch.setattr(app.history_manager, "save_operations",
+                        lambda records: writes.append(list(records)) or save(records))
+    app.process_line("add 2 3 | mul 4 | div 2")
+    assert len(writes) == 1
+    assert operations(app) == [("pipeline", "add 2 3 | mul 4 | div 2", 10.0)]
+
+
+def test_pipeline_can_keep_every_step(monkeypatch):
+    monkeypatch.setenv("PIPELINE_HISTORY", "steps")
+    app = App()
+    out = io.StringIO()
+    app.run_batch(io.StringIO("add 2 3 | mul 4\nsub ans 1\n"), out)
+    assert out.getvalue().splitlines() == ["Result: 20.0", "Result: 19.0"]
+    assert operations(app) == [
+        ("add", "2 3", 5.0), ("mul", "5.0 4", 20.0), ("sub", "20.0 1", 19.0),
+    ]
+
+
+def test_pipeline_errors():
+    app = App()
+    assert app.process_line("add ans 1") == "Error: No previous result for 'ans'."
+    assert app.process_line("add 1 | nope") == "Error: No such command: nope"
+    assert app.process_line("add 1 || mul 2") == "Error: Invalid pipeline: empty stage."
+    assert app.process_line("greet | add 1") == (
+        "Error: Invalid pipeline: greet returned no result."
+    )
+    assert app.process_line("add 1 2 | div 0") == "Error: Cannot divide by zero."
+    assert app.history_manager.count() == 0
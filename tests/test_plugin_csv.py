@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+
+from app import App
+from app.plugins.csv import CsvCommand
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "sales.csv"
+    rows = ["region,units,price,note"]
+    rows += [f"{'north' if i % 2 else 'south'},{i},{i * 0.5},x{i % 3}" for i in range(1, 251)]
+    rows.append("east,,2.0,")  # missing values further down than the sample
+    path.write_text("\n".join(rows) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def command(monkeypatch):
+    command = CsvCommand()
+    monkeypatch.setattr(CsvCommand, "CHUNK_ROWS", 40)
+    monkeypatch.setattr(CsvCommand, "SAMPLE_ROWS", 50)
+    return command
+
+
+def test_stats_merge_chunks_with_explicit_dtypes(command, csv_file):
+    output = command.execute("stats", csv_file)
+    lines = output.splitlines()
+    assert lines[0] == f"{csv_file}: 251 rows"
+    units = next(line for line in lines if line.startswith("units")).split()
+    assert units[1:5] == ["Int64", "250", "1", "125.5"]
+    assert [float(x) for x in units[5:7]] == [1.0, 250.0]
+    region = next(line for line in lines if line.startswith("region")).split()
+    assert region[-1] == "3"
+
+
+def test_load_keeps_a_compact_table_until_the_file_changes(command, csv_file):
+    output = command.execute("load", csv_file)
+    assert output.startswith(f"Loaded 251 rows x 4 columns from {csv_file}")
+    assert "region (category)" in output and "units (Int64)" in output
+    assert command._loaded(csv_file) is not None
+    assert command.execute("head", csv_file, "2").splitlines()[1].split()[1:3] == ["north", "1"]
+
+    with open(csv_file, "a", encoding="utf-8") as f:
+        f.write("west,7,1.0,y\n")
+    assert command._loaded(csv_file) is None
+    assert command.execute("stats", csv_file).splitlines()[0].endswith("252 rows")
+
+
+def test_head_is_bounded(command, csv_file):
+    assert len(command.execute("head", csv_file).splitlines()) == 1 + CsvCommand.PREVIEW_ROWS
+    assert len(command.execute("head", csv_file, "100000").splitlines()) == 1 + CsvCommand.MAX_PREVIEW_ROWS
+
+
+def test_one_log_line_per_file(command, csv_file, caplog):
+    with caplog.at_level(logging.INFO):
+        command.execute("stats", csv_file)
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 1
+    assert messages[0].startswith(f"csv stats {csv_file}: 251 rows, 4 columns")
+
+
+def test_type_drift_and_usage_errors(command, tmp_path):
+    path = tmp_path / "drift.csv"
+    path.write_text("n\n" + "\n".join(str(i) for i in range(60)) + "\noops\n")
+    with pytest.raises(ValueError, match="does not match the type"):
+        command.execute("stats", str(path))
+    assert command.execute("sum", str(path)) == CsvCommand.USAGE
+    with pytest.raises(ValueError, match="No such CSV file"):
+        command.execute("head", str(tmp_path / "missing.csv"))
+
+
+def test_csv_plugin_runs_through_the_app(csv_file):
+    app = App()
+    assert app.process_line(f"csv head {csv_file} 1").startswith("Result:")
+    assert app.history_manager.count() == 0  # previews are not calculations
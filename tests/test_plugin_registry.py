@@ -0,0 +1,78 @@
+import sys
+
+import pytest
+
+from app import App
+from app.commands import CommandHandler, LazyCommand
+from app.plugin_registry import PluginRegistry
+
+
+@pytest.fixture
+def plugins_dir(tmp_path, monkeypatch):
+    """A throwaway plugin package with one package plugin and one module plugin."""
+    package = tmp_path / "lazy_plugins"
+    (package / "hello").mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "hello" / "__init__.py").write_text(
+        "from app.commands import Command\n"
+        "class HelloCommand(Command):\n"
+        "    def execute(self, *args):\n"
+        "        return 'hello'\n"
+    )
+    (package / "double.py").write_text(
+        "from app.commands import Command\n"
+        "class DoubleCommand(Command):\n"
+        "    def execute(self, *args):\n"
+        "        return args[0] * 2\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return package
+
+
+def test_discover_scans_without_importing(plugins_dir):
+    commands = PluginRegistry(str(plugins_dir), "lazy_plugins").discover()
+    assert commands == {
+        "double": {"module": "lazy_plugins.double", "class": "DoubleCommand"},
+        "hello": {"module": "lazy_plugins.hello", "class": "HelloCommand"},
+    }
+    assert "lazy_plugins.hello" not in sys.modules
+
+
+def test_manifest_is_reused_until_plugins_change(plugins_dir):
+    registry = PluginRegistry(str(plugins_dir), "lazy_plugins")
+    scans = []
+    scan = registry.scan
+    registry.scan = lambda: scans.append(1) or scan()
+
+    registry.discover()
+    registry.discover()
+    assert len(scans) == 1
+
+    (plugins_dir / "extra.py").write_text("x = 1\n")
+    assert set(registry.discover()) == {"double", "hello"}
+    assert len(scans) == 2
+
+
+def test_lazy_command_imports_on_first_execute(plugins_dir):
+    handler = CommandHandler()
+    handler.register_command("double", LazyCommand("lazy_plugins.double", "DoubleCommand"))
+    assert "lazy_plugins.double" not in sys.modules
+
+    assert handler.execute_command("double", "4") == 8.0
+    assert "lazy_plugins.double" in sys.modules
+    assert not isinstance(handler.commands["double"], LazyCommand)
+
+
+def test_broken_plugin_reports_value_error():
+    handler = CommandHandler()
+    handler.register_command("broken", LazyCommand("no_such_plugin_module", "X"))
+    with pytest.raises(ValueError, match="could not be loaded"):
+        handler.execute_command("broken")
+
+
+def test_app_registers_plugins_lazily():
+    app = App()
+    commands = app.command_handler.commands
+    assert {"greet", "csv", "data", "square"} <= set(commands)
+    assert isinstance(commands["csv"], LazyCommand)
+    assert app.command_handler.execute_command("square", "3") == 9.0
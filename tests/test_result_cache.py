@@ -0,0 +1,78 @@
+from app import App
+from app.commands import Command, CommandHandler
+from app.result_cache import MISSING, ResultCache
+
+
+class CountingCommand(Command):
+    pure = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def execute(self, *args):
+        self.calls += 1
+        return sum(args)
+
+
+class SideEffectCommand(CountingCommand):
+    pure = False
+
+
+def test_pure_command_results_are_memoized_on_normalized_args():
+    handler = CommandHandler(result_cache=ResultCache(maxsize=8))
+    command = CountingCommand()
+    handler.register_command("count", command)
+
+    assert handler.execute_command("count", "2", "4") == 6.0
+    assert handler.execute_command("count", "2.0", "4e0") == 6.0
+    assert command.calls == 1
+    assert handler.result_cache.stats()["hits"] == 1
+
+
+def test_impure_commands_bypass_cache():
+    handler = CommandHandler(result_cache=ResultCache())
+    command = SideEffectCommand()
+    handler.register_command("effect", command)
+    handler.execute_command("effect", "1")
+    handler.execute_command("effect", "1")
+    assert command.calls == 2
+    assert len(handler.result_cache) == 0
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+    now = [100.0]
+    monkeypatch.setattr("app.result_cache.time.monotonic", lambda: now[0])
+    expiring = ResultCache(maxsize=2, ttl=5)
+    expiring.put("a", 1)
+    now[0] += 6
+    assert expiring.get("a") is MISSING
+    assert expiring.stats()["expirations"] == 1
+
+
+def test_cache_stats_command():
+    app = App()
+    app.process_line("add 2 4")
+    app.process_line("add 2 4")
+    app.process_line("square 3")
+    stats = app.command_handler.execute_command("cache", "stats")
+    assert "hits 1" in stats and "misses 2" in stats and "size 2/" in stats
+    assert app.command_handler.execute_command("cache", "clear") == "Result cache cleared."
+
+    app.process_line("cache stats")
+    assert list(app.history_manager.get_history()["Operation"]) == ["add", "add", "square"]
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("RESULT_CACHE_SIZE", "0")
+    app = App()
+    assert app.command_handler.result_cache is None
+    assert app.command_handler.execute_command("cache") == "Result cache is disabled."
@@ -0,0 +1,123 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from app import App
+from app.client import CalculatorClient, CalculatorError, load_test
+from app.server import CalculatorServer
+
+
+@pytest.fixture
+def running_server():
+    """Run a CalculatorServer on a free port in a background event loop."""
+    app = App()
+    server = CalculatorServer(app)
+    loop = asyncio.new_event_loop()
+    address = {}
+    ready = threading.Event()
+
+    def on_ready(bound):
+        address["port"] = bound[1]
+        ready.set()
+
+    task = loop.create_task(server.serve_forever("127.0.0.1", 0, on_ready=on_ready))
+    thread = threading.Thread(target=lambda: loop.run_until_complete(task), daemon=True)
+    thread.start()
+    ready.wait(5)
+    yield app, server, address["port"]
+
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(5)
+    loop.close()
+
+
+def test_json_and_text_requests(running_server):
+    _, _, port = running_server
+    with CalculatorClient(port=port) as client:
+        assert client.execute("add", 1, 2) == 3.0
+        assert client.execute_many([("mul", [2, 3]), ("div", [9, 3])]) == [6.0, 3.0]
+        with pytest.raises(CalculatorError, match="divide by zero"):
+            client.execute("div", 1, 0)
+        with pytest.raises(CalculatorError, match="No such command"):
+            client.execute("nope")
+
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        sock.sendall(b"sub 5 2\n")
+        assert sock.makefile().readline() == "Result: 3.0\n"
+
+
+def test_concurrent_clients_and_history_flush(running_server):
+    app, server, port = running_server
+    report = load_test(port=port, clients=4, requests=50, pipeline=5)
+    assert report["requests"] == 200 and report["errors"] == 0
+
+    loop = server._server.get_loop()
+    asyncio.run_coroutine_threadsafe(server._queue.join(), loop).result(5)
+    assert app.history_manager.count() == 200
+
+
+def test_ans_is_kept_per_connection(running_server):
+    app, _, port = running_server
+    with socket.create_connection(("127.0.0.1", port)) as first, \
+            socket.create_connection(("127.0.0.1", port)) as second:
+        first_lines, second_lines = first.makefile(), second.makefile()
+        first.sendall(b"add 1 2\n")
+        assert first_lines.readline() == "Result: 3.0\n"
+        second.sendall(b'{"command": "mul", "args": [5, 7]}\n')
+        assert second_lines.readline() == '{"ok": true, "result": 35.0}\n'
+        first.sendall(b"mul ans 10\n")
+        assert first_lines.readline() == "Result: 30.0\n"
+        second.sendall(b"add ans 1 | sub ans 6\n")
+        assert second_lines.readline() == "Result: 30.0\n"
+    assert app.last_result is None  # the REPL's session is untouched
+
+
+def test_commands_run_off_the_event_loop(running_server, monkeypatch):
+    app, _, port = running_server
+    threads = []
+    command = app.command_handler.commands["add"]
+    execute = command.execute
+    monkeypatch.setattr(
+        command, "execute",
+        lambda *args: threads.append(threading.current_thread().name) or execute(*args),
+    )
+    with CalculatorClient(port=port) as client:
+        assert client.execute("add", 1, 2) == 3.0
+    assert threads and threads[0].startswith("commands")
+
+
+def test_history_writer_survives_unexpected_errors(running_server, monkeypatch):
+    app, server, port = running_server
+    commit_history = app.commit_history
+    failures = []
+
+    def flaky(batch):
+        if not failures:
+            failures.append(batch)
+            raise RuntimeError("disk on fire")
+        commit_history(batch)
+    monkeypatch.setattr(app, "commit_history", flaky)
+
+    loop = server._server.get_loop()
+    with CalculatorClient(port=port) as client:
+        client.execute("add", 1, 2)
+        asyncio.run_coroutine_threadsafe(server._queue.join(), loop).result(5)
+        client.execute("add", 3, 4)
+        asyncio.run_coroutine_threadsafe(server._queue.join(), loop).result(5)
+    assert failures
+    assert list(app.history_manager.get_history()["Result"]) == [7.0]
+
+
+def test_history_stream_is_rejected_over_the_socket(running_server, capsys):
+    _, _, port = running_server
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        lines = sock.makefile()
+        sock.sendall(b"history --stream\n")
+        assert lines.readline().startswith("Error: 'history --stream' prints to the server's")
+        sock.sendall(b'{"command": "history", "args": ["--stream", "--size", "5"]}\n')
+        assert '"ok": false' in lines.readline()
+        sock.sendall(b"history --tail 5\n")
+        assert lines.readline() == "Result: No history available.\n"
+    assert capsys.readouterr().out == ""
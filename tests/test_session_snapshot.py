@@ -0,0 +1,94 @@
+import atexit
+
+import pytest
+
+from app import App
+from app.history_manager import CsvHistoryStore
+from app.session_snapshot import SessionSnapshot
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    path = tmp_path / "session.snapshot"
+    monkeypatch.setenv("SESSION_SNAPSHOT", str(path))
+    return path
+
+
+def launch():
+    app = App()
+    atexit.unregister(app.save_session_snapshot)  # the tests save explicitly
+    return app
+
+
+def test_relaunch_restores_history_and_plugins_from_the_snapshot(
+        snapshot_path, plugin_manifest, monkeypatch):
+    app = launch()
+    app.process_line("add 1 2")
+    app.process_line("mul 3 4")
+    app.history_manager.count()
+    app.save_session_snapshot()
+    assert snapshot_path.exists()
+
+    plugin_manifest.unlink()
+    history_reads = []
+    read_history = SessionSnapshot.read_history
+    monkeypatch.setattr(SessionSnapshot, "read_history",
+                        lambda self: history_reads.append(1) or read_history(self))
+    warm = launch()
+    assert not plugin_manifest.exists()  # the manifest was not even consulted
+    assert not history_reads  # the rows wait for the first read
+
+    def fail(self):
+        raise AssertionError("journal parsed despite a current snapshot")
+    monkeypatch.setattr(CsvHistoryStore, "load", fail)
+    assert warm.history_manager.page_rows(1, 5)[1][1:4] == ("mul", "3 4", 12.0)
+    assert warm.history_manager.restored
+    assert "square" in warm.command_handler.commands
+    warm.process_line("sub 9 1")  # appends on top of the restored rows
+    assert warm.history_manager.count() == 3
+
+
+def test_changed_history_file_falls_back_to_parsing_it(snapshot_path, history_file):
+    app = launch()
+    app.process_line("add 1 2")
+    app.history_manager.count()
+    app.save_session_snapshot()
+    with open(history_file, "a", encoding="utf-8") as f:
+        f.write("div,8 2,4.0,2026-01-01T00:00:00\n")
+
+    cold = launch()
+    assert [row[1] for row in cold.history_manager.page_rows(1, 5)] == ["add", "div"]
+    assert not cold.history_manager.restored
+
+
+def test_snapshot_is_only_rewritten_when_something_changed(snapshot_path):
+    app = launch()
+    app.process_line("add 1 2")
+    app.history_manager.count()
+    app.save_session_snapshot()
+    written = snapshot_path.stat().st_mtime_ns
+
+    reader = launch()
+    reader.history_manager.count()
+    reader.save_session_snapshot()  # read only: nothing to write
+    idle = launch()
+    idle.save_session_snapshot()  # never touched the history
+    assert snapshot_path.stat().st_mtime_ns == written
+
+    writer = launch()
+    writer.process_line("sub 5 1")
+    writer.save_session_snapshot()
+    assert snapshot_path.stat().st_mtime_ns != written
+    # the history was never read in that session, so none is stored
+    assert SessionSnapshot(str(snapshot_path)).read()["history_digest"] is None
+
+
+def test_unreadable_or_foreign_snapshots_are_ignored(tmp_path):
+    path = tmp_path / "bad.snapshot"
+    path.write_bytes(b"garbage")
+    assert SessionSnapshot(str(path)).read() is None
+    assert SessionSnapshot(str(tmp_path / "missing")).read() is None
+    SessionSnapshot(str(path)).write()
+    snapshot = SessionSnapshot(str(path))
+    assert snapshot.read()["history_digest"] is None
+    assert snapshot.read_history() is None
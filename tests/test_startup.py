@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+from app import App
+
+
+def test_import_and_init_do_not_load_pandas():
+    code = "import sys; from app import App; App(); print('pandas' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_startup_report_lists_phases():
+    report = App().startup_report(import_seconds=0.01)
+    for phase in ("import app", "logging", "environment", "commands", "plugins", "total"):
+        assert phase in report
+    assert "heavy modules loaded:" in report